@@ -6,6 +6,10 @@ SEC_REQ_HEADERS = {
     "Accept-Encoding": "gzip, deflate", 
     "Host": "www.sec.gov"
     }
+SEC_HEADER_FETCH_BYTES = 64 * 1024 # Header-only fetches (conn/sec_http.py download_file_head_from_sec) read at most this much of a submission. Headers listing many filers can run to tens of KB
+# Filing type -> (low, high) 4 digit SIC code ranges worth fully parsing. Other filings of a listed type are only fetched up to their SEC header
+# and ingested as filing_info. Types not listed are always fully parsed, i.e. { '8-k': [(2800, 2899), (6000, 6799)] }
+FULL_PARSE_SIC_RANGES = {}
 
 STORAGE_DIR = 'data'
 #SQL_DATABASE_URL = f'sqlite:///{STORAGE_DIR}/test.db'
@@ -32,6 +36,18 @@ TOC_SECTIONS_EMBEDDINGS_TABLE = 'toc_sections_embeddings'
 TOC_SECTIONS_EMBEDDINGS_CLASS_NAME = 'HtmlSectionEmbeddings'
 HR_MANAGERS_TABLE = 'hr_managers'
 HOLDINGS_TABLE = 'holdings'
+RAG_ANSWER_CACHE_TABLE = 'rag_answer_cache'
+RAG_ANSWER_CACHE_CLASS_NAME = 'RagAnswerCache'
+TOPICS_TABLE = 'topics'
+TOPICS_CLASS_NAME = 'Topics'
+SECTION_TOPICS_TABLE = 'section_topics'
+SECTION_TOPICS_CLASS_NAME = 'SectionTopics'
+DAILY_TYPE_COUNTS_TABLE = 'daily_type_counts'
+DAILY_TYPE_COUNTS_CLASS_NAME = 'DailyTypeCounts'
+DAILY_FILER_COUNTS_TABLE = 'daily_filer_counts'
+DAILY_FILER_COUNTS_CLASS_NAME = 'DailyFilerCounts'
+DATA_VERSIONS_TABLE = 'data_versions'
+DATA_VERSIONS_CLASS_NAME = 'DataVersions'
 
 # Tables containing text we will embed for analysis, and their corresponding embedding tables.
 TEXT_TYPE_TABLES = { 
@@ -46,5 +62,74 @@ PREFECT_FLOW_NAME = 'full_process_day_flow'
 DEFAULT_TOKENIZER_MODEL = 'ProsusAI/finbert'
 DEFAULT_SUMMARIZER_MODEL = 'facebook/bart-large-cnn'
 DEFAULT_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+DEFAULT_RERANKER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+
+# Semantic answer cache sitting in front of RAG queries
+RAG_CACHE_SIMILARITY_THRESHOLD = 0.92 # Min cosine similarity between questions to reuse an answer
+RAG_CACHE_MAX_AGE_HOURS = 24 # Cached answers older than this are never served
+
+# RAG retrieval: cheap ANN candidate set, re-ranked by the cross-encoder down to a few chunks for summarization + LLM
+RAG_CANDIDATES_PER_TABLE = 12 # ANN candidates kept from each section table
+RAG_CANDIDATE_MIN_SIMILARITY = 0.2 # Loose cosine floor for candidates, the cross-encoder does the real ranking
+RAG_RERANK_TOP_K = 3 # Chunks passed on after re-ranking
+RAG_DEDUP_JACCARD_THRESHOLD = 0.8 # Word shingle overlap above which two chunks count as the same boilerplate
+
+# Full text search over the section text tables (generated tsvector columns + GIN indexes)
+TEXT_SEARCH_CONFIG = 'english'
+TEXT_SEARCH_MAX_CHARS = 500000 # Only the first N chars of a section are indexed, keeps huge sections under the 1MB tsvector limit
+RRF_K = 60 # Reciprocal rank fusion constant, 1 / (RRF_K + rank)
+
+# Topic modelling, run by the ingestion flow over the stored section embeddings. Topics are per SIC division x filing type
+TOPIC_MIN_SECTIONS = 20 # Sections a group (or its outliers) needs before new topics are fit
+TOPIC_MAX_PER_GROUP = 30
+TOPIC_NEW_TOPIC_SIMILARITY = 0.35 # Sections less similar than this to every existing topic are candidates for new topics
+TOPIC_KEYWORDS = 10
+TOPIC_TEXT_CHARS = 20000 # Chars of each section counted towards topic keywords
+TOPIC_BATCH_SIZE = 2000 # Sections (text + embedding) read per query while assigning a group
+TOPIC_FIT_SAMPLE = 20000 # Outlier embeddings kept to fit new topics on, sampled when a group has more
+
+# Per-worker caches of dashboard queries, invalidated by the data version the ingestion flow bumps on every commit of new filings
+SUMMARY_CACHE_MAX_ENTRIES = 256
+SUMMARY_CACHE_TTL_SECONDS = 3600 # Upper bound only, entries are normally invalidated by the data version changing
+DATA_VERSION_POLL_SECONDS = 5 # How stale a worker's view of the data version may be
+
+TRENDS_MAX_PERIODS = 400 # Max periods in one /api/trends/series response, i.e. about a year of days
+
+# RAG agent (SQL / semantic / hybrid routing)
+RAG_AGENT_MAX_SQL_ROWS = 25 # Max grouped rows returned for aggregate questions
+
+# Connection pools per service, see conn/db_engine.py. Each process picks its profile from the DB_POOL_PROFILE env var
+# Web: one gunicorn worker uses at most pool_size + max_overflow connections, scale workers x that against max_connections
+DB_POOL_PROFILES = {
+    'web': {'pool_size': 5, 'max_overflow': 5, 'pool_timeout': 10, 'statement_timeout_ms': 30000},
+    'worker': {'pool_size': 3, 'max_overflow': 2, 'pool_timeout': 60, 'statement_timeout_ms': 1800000}, # Migrations / rollup rebuilds
+    'embedder': {'pool_size': 1, 'max_overflow': 1, 'pool_timeout': 60, 'statement_timeout_ms': 0} # Vector index builds, no limit
+}
+DEFAULT_DB_POOL_PROFILE = 'worker'
+DB_POOL_RECYCLE_SECONDS = 1800
+DB_SLOW_CHECKOUT_SECONDS = 1.0 # Pool checkouts waiting longer than this are logged
+
+# Prefect API access from the web workers (flask_app/services/prefect_bridge.py)
+PREFECT_CLIENT_TIMEOUT_SECONDS = 30
+PREFECT_STATUS_CACHE_TTL_SECONDS = 3 # Flow run status polls within this window share one API call
+PREFECT_STATUS_CACHE_MAX_ENTRIES = 128
+
+# Web responses
+DASHBOARD_TOP_COMPANIES = 25 # Filers rendered on the home page, the rest are paged in on demand
+DASHBOARD_INDUSTRIES_PER_GROUP = 10 # Industries rendered per major group in the industry explorer
+FRAGMENT_CACHE_MAX_ENTRIES = 256 # Rendered template fragments kept per worker
+STATIC_MAX_AGE_SECONDS = 31536000 # Static assets are fingerprinted (?v=<hash>), so they can be cached for a year
+FILING_CACHE_MAX_AGE_SECONDS = 3600 # Browser cache lifetime of filing / section API responses, revalidated by ETag after
+COMPRESSION_MIN_BYTES = 1024 # Smaller responses aren't worth compressing
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5 # 0-11, higher levels cost far more CPU per response for little extra ratio
+
+# Filing parsing (parser/filing_parser.py)
+HTML_SOUP_PARSER = 'html.parser' # BeautifulSoup backend for filing HTML documents. 'lxml' is several times faster but closes a <p> before a <table> inside it, dropping
+# the table and the rest of the paragraph from the p tag strategy's text. Keep it opt-in until python -m parser.parity_check passes on a saved corpus
+HTML_TEXT_ENGINE = 'bs4' # Tidy filing text extraction: 'bs4' (the BeautifulSoup strategies, on the HTML_SOUP_PARSER backend) or 'lxml' (parser/lxml_text.py).
+# 'lxml' always parses with lxml whatever HTML_SOUP_PARSER is, so it has the lxml backend's output (and text loss), only faster
+PDF_EXTRACT_WORKERS = 1 # Processes extracting the page text of one large PDF (parser/pdf_text.py), 1 extracts in the parsing process
+PDF_PARALLEL_MIN_PAGES = 200 # PDFs with fewer pages are always extracted in the parsing process, not worth starting workers for
 
 FLASK_LOGIN_PASSCODE = 'sec123'
\ No newline at end of file
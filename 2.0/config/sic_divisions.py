@@ -0,0 +1,15 @@
+# SIC divisions as inclusive major group (first two digits) ranges: (division code, low, high).
+# Shared by the dashboard's SIC hierarchy (flask_app/services/sic_hierarchy.py) and topic modelling groups (ingest/topic_modeling.py)
+SIC_DIVISION_RANGES = [
+    ("01-09", 1, 9),
+    ("10-14", 10, 14),
+    ("15-17", 15, 17),
+    ("20-39", 20, 39),
+    ("40-49", 40, 49),
+    ("50-51", 50, 51),
+    ("52-59", 52, 59),
+    ("60-67", 60, 67),
+    ("70-89", 70, 89),
+    ("91-97", 91, 97),
+    ("99", 99, 99)
+]
@@ -0,0 +1,62 @@
+import logging
+import threading
+from time import monotonic
+from sqlalchemy import text
+
+import config.settings as settings
+
+FILINGS_DATA = 'filings'
+
+def bump_data_version(engine, name: str = FILINGS_DATA) -> int:
+    '''
+    Increments (creating if needed) the named data version. Call once new data has been committed.
+    '''
+    try:
+        with engine.begin() as conn:
+            version = conn.execute(text(f'''
+                INSERT INTO {settings.DATA_VERSIONS_TABLE} (name, version, updated_at)
+                VALUES (:name, 1, now())
+                ON CONFLICT (name) DO UPDATE
+                SET version = {settings.DATA_VERSIONS_TABLE}.version + 1, updated_at = now()
+                RETURNING version
+            '''), {'name': name}).scalar()
+    except Exception as e:
+        # Caches then only expire by TTL, not worth failing an otherwise successful ingest over
+        logging.error(f'Failed to bump {name} data version: {e}')
+        return None
+
+    logging.info(f'Bumped {name} data version to {version}.')
+    return version
+
+class DataVersionReader:
+    '''
+    Per-worker view of a data version. The version is re-read at most every poll_seconds, so cache lookups keyed on it
+    cost one tiny primary key query every few seconds rather than one per request.
+    '''
+
+    def __init__(self, engine, name: str = FILINGS_DATA, poll_seconds: float = settings.DATA_VERSION_POLL_SECONDS):
+        self.engine = engine
+        self.name = name
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+
+    def current(self) -> int:
+        with self._lock:
+            if self._checked_at is not None and monotonic() - self._checked_at < self.poll_seconds:
+                return self._version
+
+        try:
+            with self.engine.connect() as conn:
+                version = conn.execute(text(f'SELECT version FROM {settings.DATA_VERSIONS_TABLE} WHERE name = :name'), {'name': self.name}).scalar()
+            version = version or 0
+        except Exception as e:
+            logging.error(f'Failed to read {self.name} data version: {e}')
+            # Unknown version: an uncacheable stamp so nothing stale is served
+            return None
+
+        with self._lock:
+            self._version = version
+            self._checked_at = monotonic()
+        return version
@@ -1,6 +1,138 @@
+import os
+import time
+import logging
+import threading
+from collections import deque
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+import config.settings as settings
 from config.settings import SQL_DATABASE_URL
 
-engine = create_engine(SQL_DATABASE_URL) #echo=True FOR DEBUG ONLY
-Session = sessionmaker(bind=engine)
\ No newline at end of file
+'''
+Engine factory. Each service (web / worker / embedder, see settings.DB_POOL_PROFILES) gets its own sized pool with pre-ping
+and a server side statement timeout. Every pool records how long checkouts wait, see PoolMetrics.
+The module level engine uses the profile named by the DB_POOL_PROFILE env var (set per container in docker-compose.yml).
+'''
+
+class PoolMetrics:
+    '''
+    Checkout wait times of one pool (time spent in the pool getting a connection, including opening a new one when under size).
+    Thread safe, kept per process.
+    '''
+
+    def __init__(self, profile, samples=1000):
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=samples)
+        self.checkouts = 0
+        self.failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait, failed=False):
+        with self._lock:
+            self.checkouts += 1
+            self.failures += failed
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+        if wait >= settings.DB_SLOW_CHECKOUT_SECONDS:
+            logging.warning(f'{self.profile} pool checkout waited {wait:.2f}s{" and failed" if failed else ""}.')
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, failures, total_wait, max_wait = self.checkouts, self.failures, self.total_wait, self.max_wait
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] * 1000 if recent else 0.0
+
+        return {
+            'checkouts': checkouts,
+            'failures': failures, # Pool timeouts and connect errors
+            'wait_ms_avg': total_wait / checkouts * 1000 if checkouts else 0.0,
+            'wait_ms_p50': percentile(0.5),
+            'wait_ms_p95': percentile(0.95),
+            'wait_ms_p99': percentile(0.99),
+            'wait_ms_max': max_wait * 1000
+        }
+
+class TimedQueuePool(QueuePool):
+    '''QueuePool recording every checkout's wait into a PoolMetrics.'''
+
+    metrics = None # Set by create_db_engine
+
+    def _do_get(self):
+        started = time.perf_counter()
+        failed = False
+        try:
+            return super()._do_get()
+        except Exception:
+            failed = True # Pool timeout or connect error
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record(time.perf_counter() - started, failed)
+
+    def recreate(self):
+        # Engine.dispose() swaps in a recreated pool, keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+_engines = {}
+_metrics = {}
+_engines_lock = threading.Lock()
+
+def create_db_engine(profile):
+    '''
+    New engine sized and configured for one of settings.DB_POOL_PROFILES.
+    '''
+    config = settings.DB_POOL_PROFILES[profile]
+    metrics = _metrics.setdefault(profile, PoolMetrics(profile))
+    engine = create_engine(
+        SQL_DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=config['pool_size'],
+        max_overflow=config['max_overflow'],
+        pool_timeout=config['pool_timeout'],
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True, # Drops connections killed by a DB restart / idle timeout instead of failing the request using them
+        connect_args={'options': f"-c statement_timeout={config['statement_timeout_ms']}"}
+    ) #echo=True FOR DEBUG ONLY
+    engine.pool.metrics = metrics
+    return engine
+
+def get_engine(profile=None):
+    '''
+    The process wide engine of a profile, created on first use. Defaults to the DB_POOL_PROFILE env var.
+    '''
+    profile = profile or os.getenv('DB_POOL_PROFILE', settings.DEFAULT_DB_POOL_PROFILE)
+    if profile not in settings.DB_POOL_PROFILES:
+        raise ValueError(f'Unknown DB pool profile: {profile}. Must be one of: {", ".join(settings.DB_POOL_PROFILES)}.')
+    with _engines_lock:
+        if profile not in _engines:
+            _engines[profile] = create_db_engine(profile)
+            logging.info(f'Created {profile} DB engine with pool settings: {settings.DB_POOL_PROFILES[profile]}')
+        return _engines[profile]
+
+def pool_metrics():
+    '''
+    Checkout wait metrics and current pool usage of every engine created in this process.
+    '''
+    with _engines_lock:
+        engines = dict(_engines)
+    return {
+        profile: {
+            **_metrics[profile].snapshot(),
+            'pool_size': engine.pool.size(),
+            'checked_out': engine.pool.checkedout(),
+            'overflow': engine.pool.overflow()
+        }
+        for profile, engine in engines.items()
+    }
+
+engine = get_engine()
+Session = sessionmaker(bind=engine)
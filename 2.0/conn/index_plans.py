@@ -0,0 +1,169 @@
+import sys
+import json
+import logging
+from sqlalchemy import text
+
+import config.settings as settings
+from config.log_config import config_logging
+from db_models import Base
+from conn.db_engine import engine
+from conn.migrations import apply_migrations
+from ingest.rollups import rollup_refresh_statements
+
+'''
+EXPLAIN ANALYZE regression check for the indexes in conn/migrations.py.
+Builds the schema in a scratch Postgres schema, fills it with a synthetic dataset, and asserts every hot query's plan
+uses one of the indexes it was built for. Everything runs in one transaction that is rolled back, so nothing is left behind.
+
+Usage (from the project root, against the compose database): python -m conn.index_plans
+'''
+
+SCRATCH_SCHEMA = 'index_plan_check'
+N_FILINGS = 200000
+N_SECTIONS = 400000
+N_HOLDINGS = 500000
+N_EMBEDDINGS = 50000 # 384 floats each, kept smaller
+
+_SYNTHETIC_DATA = [
+    f'''
+    INSERT INTO {settings.FILING_INFO_TABLE} (accession_number, type, date, cik, whole_sic_code, sic_mjr_group_code, sic_ind_group_code, sic_desc, company_name)
+    SELECT
+        'synth-' || i,
+        (ARRAY['10-Q', '10-K', '8-K', 'S-1', 'S-3', 'DEF 14A', '13F-HR', '13F-NT', 'SC 13D', 'SC 13G'])[1 + i % 10],
+        DATE '2020-01-01' + (i % 1800),
+        lpad((i % 20000)::text, 10, '0'),
+        lpad((100 + (i * 7) % 9800)::text, 4, '0'),
+        left(lpad((100 + (i * 7) % 9800)::text, 4, '0'), 2),
+        left(lpad((100 + (i * 7) % 9800)::text, 4, '0'), 3),
+        'Synthetic industry',
+        'Synthetic Co ' || (i % 20000)
+    FROM generate_series(1, {N_FILINGS}) i
+    ''',
+    f'''
+    INSERT INTO {settings.NAMED_SECTIONS_TABLE} (accession_number, section_name, text)
+    SELECT
+        'synth-' || (1 + i % {N_FILINGS}),
+        'Item ' || (i % 10),
+        'Routine disclosure text for section ' || i || CASE WHEN i % 5000 = 0 THEN ' mentioning acmetron' ELSE '' END
+    FROM generate_series(1, {N_SECTIONS}) i
+    ''',
+    f'''
+    INSERT INTO {settings.NAMED_SECTIONS_EMBEDDINGS_TABLE} (section_id, embedding)
+    SELECT s.id, CAST('[' || rtrim(repeat('0.05,', 384), ',') || ']' AS vector)
+    FROM {settings.NAMED_SECTIONS_TABLE} s
+    WHERE s.id <= {N_EMBEDDINGS}
+    ''',
+    f'''
+    INSERT INTO {settings.EXHIBITS_TABLE} (accession_number, exhibit_type, text)
+    SELECT 'synth-' || (1 + i % {N_FILINGS}), 'EX-' || (i % 99), 'Exhibit text ' || i
+    FROM generate_series(1, {N_FILINGS}) i
+    ''',
+    f'''
+    INSERT INTO {settings.HOLDINGS_TABLE} (accession_number, issuer, cusip, value, amount)
+    SELECT 'synth-' || (1 + i % {N_FILINGS}), 'Issuer ' || (i % 5000), lpad((i % 50000)::text, 9, '0'), i, i
+    FROM generate_series(1, {N_HOLDINGS}) i
+    ''',
+    f'''
+    INSERT INTO {settings.HR_MANAGERS_TABLE} (accession_number, mgr_seq, mgr_cik, mgr_name)
+    SELECT 'synth-' || (1 + i % {N_FILINGS}), i % 5, lpad((i % 30000)::text, 10, '0'), 'Manager ' || i
+    FROM generate_series(1, {N_FILINGS // 4}) i
+    ''',
+]
+
+# (description, query, indexes of which at least one must appear in the plan)
+HOT_QUERIES = [
+    ('Rollup refresh for ingested dates',
+     f"SELECT date, type, COUNT(*) FROM {settings.FILING_INFO_TABLE} WHERE date = ANY(ARRAY[DATE '2021-03-01', DATE '2021-03-02']) GROUP BY date, type",
+     {f'ix_{settings.FILING_INFO_TABLE}_date', f'idx_{settings.FILING_INFO_TABLE}_type_date'}),
+    ('RAG agent count by type within a month',
+     f"SELECT COUNT(*) FROM {settings.FILING_INFO_TABLE} WHERE type = '8-K' AND date >= DATE '2021-03-01' AND date < DATE '2021-04-01'",
+     {f'idx_{settings.FILING_INFO_TABLE}_type_date'}),
+    ('Filings of one CIK',
+     f"SELECT accession_number, type, date FROM {settings.FILING_INFO_TABLE} WHERE cik = '0000000042' ORDER BY date DESC",
+     {f'idx_{settings.FILING_INFO_TABLE}_cik_date'}),
+    ('SIC major group within a month',
+     f"SELECT COUNT(*) FROM {settings.FILING_INFO_TABLE} WHERE sic_mjr_group_code = '28' AND date >= DATE '2021-03-01' AND date < DATE '2021-04-01'",
+     {f'idx_{settings.FILING_INFO_TABLE}_mjr_group_date'}),
+    ('SIC industry within a month',
+     f"SELECT COUNT(*) FROM {settings.FILING_INFO_TABLE} WHERE whole_sic_code = '2834' AND date >= DATE '2021-03-01' AND date < DATE '2021-04-01'",
+     {f'idx_{settings.FILING_INFO_TABLE}_sic_date'}),
+    ('Industry drill-down filings page after a keyset cursor',
+     f'''SELECT accession_number, date, type FROM {settings.FILING_INFO_TABLE}
+         WHERE whole_sic_code = '2834' AND date >= DATE '2021-01-01' AND date < DATE '2022-01-01'
+         AND (date, accession_number) < (DATE '2021-06-01', 'synth-42')
+         ORDER BY date DESC, accession_number DESC LIMIT 51''',
+     {f'idx_{settings.FILING_INFO_TABLE}_sic_date'}),
+    ('Named sections of a filing',
+     f"SELECT id, section_name FROM {settings.NAMED_SECTIONS_TABLE} WHERE accession_number = 'synth-42'",
+     {f'idx_{settings.NAMED_SECTIONS_TABLE}_accession_number'}),
+    ('Exhibits of a filing',
+     f"SELECT id, exhibit_type FROM {settings.EXHIBITS_TABLE} WHERE accession_number = 'synth-42'",
+     {f'idx_{settings.EXHIBITS_TABLE}_accession_number'}),
+    ('Filtered vector search join, embeddings -> sections -> filing_info',
+     f'''SELECT e.section_id FROM {settings.NAMED_SECTIONS_EMBEDDINGS_TABLE} e
+         JOIN {settings.NAMED_SECTIONS_TABLE} s ON e.section_id = s.id
+         JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+         WHERE f.cik = '0000000042' AND f.date >= DATE '2021-01-01' ''',
+     {f'idx_{settings.NAMED_SECTIONS_TABLE}_accession_number'}),
+    ('Holders of a CUSIP',
+     f"SELECT accession_number, value FROM {settings.HOLDINGS_TABLE} WHERE cusip = '000012345'",
+     {f'idx_{settings.HOLDINGS_TABLE}_cusip'}),
+    ('Holdings of a 13F filing',
+     f"SELECT cusip, value FROM {settings.HOLDINGS_TABLE} WHERE accession_number = 'synth-42'",
+     {f'idx_{settings.HOLDINGS_TABLE}_accession_number'}),
+    ('13F filings of a manager',
+     f"SELECT accession_number FROM {settings.HR_MANAGERS_TABLE} WHERE mgr_cik = '0000000042'",
+     {f'idx_{settings.HR_MANAGERS_TABLE}_mgr_cik'}),
+    ('Dashboard company breakdown from the rollup',
+     f"SELECT cik, SUM(count) FROM {settings.DAILY_FILER_COUNTS_TABLE} WHERE date >= DATE '2021-03-01' AND date < DATE '2021-03-08' GROUP BY cik",
+     {f'{settings.DAILY_FILER_COUNTS_TABLE}_pkey'}),
+    ('Lexical search',
+     f"SELECT id FROM {settings.NAMED_SECTIONS_TABLE} WHERE text_search @@ websearch_to_tsquery('{settings.TEXT_SEARCH_CONFIG}', 'acmetron')",
+     {f'idx_{settings.NAMED_SECTIONS_TABLE}_text_search_gin'}),
+]
+
+def _plan_indexes(node, found=None):
+    '''Names of all indexes used anywhere in an EXPLAIN (FORMAT JSON) plan tree.'''
+    found = set() if found is None else found
+    if 'Index Name' in node:
+        found.add(node['Index Name'])
+    for child in node.get('Plans', []):
+        _plan_indexes(child, found)
+    return found
+
+def check_query_plans() -> bool:
+    failures = 0
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            conn.execute(text(f'CREATE SCHEMA {SCRATCH_SCHEMA}'))
+            conn.execute(text(f'SET LOCAL search_path TO {SCRATCH_SCHEMA}, public')) # public for the vector type
+
+            # checkfirst would find the real tables through the search path and skip creating them
+            Base.metadata.create_all(bind=conn, checkfirst=False)
+            apply_migrations(conn)
+
+            logging.info(f'Loading synthetic dataset into {SCRATCH_SCHEMA}.')
+            for stmt in _SYNTHETIC_DATA + rollup_refresh_statements('TRUE'):
+                conn.execute(text(stmt))
+            for table_name in Base.metadata.tables:
+                conn.execute(text(f'ANALYZE {table_name}')) # Resolves to the scratch copies through the search path
+
+            for description, query, expected in HOT_QUERIES:
+                plan = conn.execute(text(f'EXPLAIN (ANALYZE, FORMAT JSON) {query}')).scalar()
+                plan = plan[0] if isinstance(plan, list) else json.loads(plan)[0]
+                used = _plan_indexes(plan['Plan'])
+                ok = bool(used & expected)
+                failures += not ok
+                print(f"{'PASS' if ok else 'FAIL'} {plan['Execution Time']:8.2f}ms  {description}")
+                if not ok:
+                    print(f'     expected one of {sorted(expected)}, plan used {sorted(used) or "no indexes"}')
+        finally:
+            trans.rollback()
+
+    print(f'{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} hot queries use their indexes.')
+    return failures == 0
+
+if __name__ == '__main__':
+    config_logging('index_plans')
+    sys.exit(0 if check_query_plans() else 1)
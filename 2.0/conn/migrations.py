@@ -0,0 +1,114 @@
+import logging
+from sqlalchemy import text
+
+import config.settings as settings
+from db_models.text_search import TEXT_SEARCH_COLUMN, TEXT_SEARCH_TITLE_EXPRESSIONS, text_search_expression, text_search_index_name
+
+'''
+Managed schema changes applied on top of Base.metadata.create_all, which only creates missing tables.
+Migrations are applied in order, once each, and recorded in schema_migrations. Every statement is idempotent as well,
+so a database whose tables were created from models that already declare an index is unaffected.
+Indexes are chosen for the queries we actually run, see conn/index_plans.py for the EXPLAIN ANALYZE check of each.
+'''
+
+MIGRATIONS_TABLE = 'schema_migrations'
+
+# (index name, table, columns), columns as SQL
+INDEXES = [
+    # filing_info: rollup refreshes by date, RAG agent / drill-down filters by type, CIK and SIC level within a date range
+    (f'ix_{settings.FILING_INFO_TABLE}_date', settings.FILING_INFO_TABLE, 'date'),
+    (f'idx_{settings.FILING_INFO_TABLE}_type_date', settings.FILING_INFO_TABLE, 'type, date'),
+    (f'idx_{settings.FILING_INFO_TABLE}_cik_date', settings.FILING_INFO_TABLE, 'cik, date'),
+    (f'idx_{settings.FILING_INFO_TABLE}_sic_date', settings.FILING_INFO_TABLE, 'whole_sic_code, date'),
+    (f'idx_{settings.FILING_INFO_TABLE}_mjr_group_date', settings.FILING_INFO_TABLE, 'sic_mjr_group_code, date'),
+    (f'idx_{settings.FILING_INFO_TABLE}_ind_group_date', settings.FILING_INFO_TABLE, 'sic_ind_group_code, date'),
+] + [
+    # Child tables are always reached through their filing (section fetches, embedding -> section -> filing_info joins)
+    (f'idx_{table}_accession_number', table, 'accession_number')
+    for table in [
+        settings.NAMED_SECTIONS_TABLE,
+        settings.TOC_SECTIONS_TABLE,
+        settings.PDF_SECTIONS_TABLE,
+        settings.EXHIBITS_TABLE,
+        settings.SUBJECT_COS_TABLE,
+        settings.HR_MANAGERS_TABLE,
+        settings.HOLDINGS_TABLE
+    ]
+] + [
+    # 13F lookups: who holds a security, what a manager reported
+    (f'idx_{settings.HOLDINGS_TABLE}_cusip', settings.HOLDINGS_TABLE, 'cusip'),
+    (f'idx_{settings.HR_MANAGERS_TABLE}_mgr_cik', settings.HR_MANAGERS_TABLE, 'mgr_cik'),
+    (f'idx_{settings.SUBJECT_COS_TABLE}_cik', settings.SUBJECT_COS_TABLE, 'cik'),
+]
+
+def _index_statements(indexes):
+    return [f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})' for name, table, columns in indexes]
+
+def _text_search_statements():
+    statements = []
+    for table_name in TEXT_SEARCH_TITLE_EXPRESSIONS:
+        # Adding the column rewrites the table to compute it for existing rows, so the first run on a large database takes a while
+        statements.append(f'''
+            ALTER TABLE {table_name}
+            ADD COLUMN IF NOT EXISTS {TEXT_SEARCH_COLUMN} tsvector
+            GENERATED ALWAYS AS ({text_search_expression(table_name)}) STORED
+        ''')
+        statements.append(f'CREATE INDEX IF NOT EXISTS {text_search_index_name(table_name)} ON {table_name} USING gin ({TEXT_SEARCH_COLUMN})')
+    return statements
+
+def _holdings_numeric_vote_statements():
+    # Vote counts used to be stored as text. Cast through text so the statement also runs on columns that are already bigint
+    return [f'''
+        ALTER TABLE {settings.HOLDINGS_TABLE}
+        ALTER COLUMN {column} TYPE BIGINT
+        USING CASE WHEN btrim({column}::text) ~ '^-?[0-9]+$' THEN btrim({column}::text)::bigint END
+    ''' for column in ['sole_vote', 'shared_vote', 'no_vote']]
+
+# Ordered. Append new migrations, never edit or reorder applied ones
+MIGRATIONS = [
+    ('0001_filing_info_date_index', _index_statements(INDEXES[:1])),
+    ('0002_text_search_columns', _text_search_statements()),
+    ('0003_query_pattern_indexes', _index_statements(INDEXES[1:])),
+    ('0004_holdings_numeric_votes', _holdings_numeric_vote_statements()),
+]
+
+def _ensure_migrations_table(conn):
+    conn.execute(text(f'''
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    '''))
+
+def apply_migrations(conn) -> list:
+    '''
+    Applies pending migrations on an open connection, inside the caller's transaction. Returns the names applied.
+    '''
+    _ensure_migrations_table(conn)
+    applied = {row[0] for row in conn.execute(text(f'SELECT name FROM {MIGRATIONS_TABLE}'))}
+
+    newly_applied = []
+    for name, statements in MIGRATIONS:
+        if name in applied:
+            continue
+        logging.info(f'Applying migration {name} ({len(statements)} statements).')
+        for statement in statements:
+            conn.execute(text(statement))
+        conn.execute(text(f'INSERT INTO {MIGRATIONS_TABLE} (name) VALUES (:name)'), {'name': name})
+        newly_applied.append(name)
+    return newly_applied
+
+def run_migrations(engine) -> list:
+    '''
+    Applies pending migrations in one transaction (Postgres DDL is transactional, so a failure applies none of them).
+    '''
+    with engine.begin() as conn:
+        # Serialize concurrent runners, i.e. the flow and a manual setup starting at once
+        conn.execute(text('SELECT pg_advisory_xact_lock(hashtext(:name))'), {'name': MIGRATIONS_TABLE})
+        newly_applied = apply_migrations(conn)
+
+    if newly_applied:
+        logging.info(f'Applied migrations: {newly_applied}')
+    else:
+        logging.info(f'Database schema is up to date, no migrations to apply.')
+    return newly_applied
@@ -61,3 +61,77 @@ def download_file_from_sec(url, rate_limiter, max_retries=3, base_delay=1.0):
     else:
         logging.error(f'No valid RateLimiter object was provided to download_file_from_sec. Cannot download.')
     return None
+
+def parse_content_range_total(content_range):
+    '''
+    Total size of the file from a Content-Range response header ('bytes 0-65535/1234567'), None if unknown ('*' or missing).
+    '''
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1].strip()
+        if total.isdigit():
+            return int(total)
+    return None
+
+def download_file_head_from_sec(url, rate_limiter, max_bytes=None, end_marker=None, max_retries=3, base_delay=1.0):
+    '''
+    Downloads only the start of the file hosted at the specified SEC URL, abiding by rate limit and header spec rules.
+    Asks for the first max_bytes (default settings.SEC_HEADER_FETCH_BYTES) with an HTTP Range request. If the server ignores the range
+    and answers 200 with the whole file, the body is streamed and the connection closed once max_bytes, or the end_marker bytes, are read.
+
+    Returns (text, complete), complete being True if the text is the whole file. (None, False) if the download failed.
+    '''
+    max_bytes = max_bytes or settings.SEC_HEADER_FETCH_BYTES
+    logging.info(f'Attempting to download first {max_bytes} bytes of SEC file: {url}')
+
+    # Byte ranges apply to the encoded body, so ask for it unencoded
+    headers = dict(settings.SEC_REQ_HEADERS, **{ 'Range': f'bytes=0-{max_bytes - 1}', 'Accept-Encoding': 'identity' })
+
+    if isinstance(rate_limiter, RateLimiter):
+        rate_limiter.acquire()
+
+        for attempt in range(max_retries):
+            try:
+                with requests.get(url, headers=headers, stream=True) as response:
+                    if response.status_code in (200, 206):
+                        chunks = []
+                        size = 0
+                        complete = True
+                        for chunk in response.iter_content(chunk_size=8192):
+                            # Marker search includes the end of the previous chunk, in case the marker straddles two
+                            found_marker = end_marker is not None and end_marker in (chunks[-1][-len(end_marker):] if chunks else b'') + chunk
+                            chunks.append(chunk)
+                            size += len(chunk)
+                            if size >= max_bytes or found_marker:
+                                complete = False
+                                break # Leaving the with block closes the connection, the rest of the body is never read
+
+                        # Size of the whole file, if the server says. Unencoded (see above), so comparable to the bytes read
+                        if response.status_code == 206:
+                            total = parse_content_range_total(response.headers.get('Content-Range'))
+                        else:
+                            content_length = response.headers.get('Content-Length', '')
+                            total = int(content_length) if content_length.isdigit() else None
+                        if total is not None:
+                            complete = total <= size
+                        elif response.status_code == 206:
+                            complete = False
+                        content = b''.join(chunks)
+                        if not complete:
+                            # The last chunk can run past max_bytes. A whole file is kept whole, callers parse it without downloading it again
+                            content = content[:max_bytes]
+
+                        logging.info(f'Successfully fetched {len(content)} bytes from {url} on attempt {attempt+1} (status {response.status_code}, whole file: {complete}).')
+                        return content.decode(response.encoding or 'utf-8', errors='replace'), complete
+                    else:
+                        logging.warning(f"Attempt {attempt+1}: Failed to fetch {url} - Status {response.status_code}. Retrying...")
+
+            except Exception as e:
+                logging.warning(f"Attempt {attempt+1}: Error fetching {url}: {e}. Retrying...")
+
+            if attempt < max_retries - 1:
+                sleep(base_delay * (2 ** attempt))  # Exponential backoff
+
+        logging.error(f"Failed to fetch first {max_bytes} bytes of {url} after {max_retries} attempts.")
+    else:
+        logging.error(f'No valid RateLimiter object was provided to download_file_head_from_sec. Cannot download.')
+    return None, False
@@ -1,6 +1,9 @@
 from db_models import Base
 from .db_engine import engine
+from .migrations import run_migrations
 from sqlalchemy import inspect, text
+from ingest.rollups import rebuild_filing_rollups
+import config.settings as settings
 import logging
 
 def create_db_tables():
@@ -8,7 +11,7 @@ def create_db_tables():
     Enables pgvector (extension must be installed) and creates the model classes found in Base.
     '''
 
-    # TODO: Proper indexing for embedding tables
+    # Embedding ivfflat indexes are (re)built by ingest/text_embedding.py, all other indexes by conn/migrations.py
     
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
@@ -33,4 +36,9 @@ def create_db_tables():
     for table in new_tables:
         logging.info(f' - {table}')
 
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+    # Rollups created on a database that already has filings need backfilling, after that ingestion keeps them current
+    if settings.DAILY_TYPE_COUNTS_TABLE in new_tables or settings.DAILY_FILER_COUNTS_TABLE in new_tables:
+        rebuild_filing_rollups(engine)
@@ -10,4 +10,8 @@ from .pdf_sections import PdfSections
 from .pdf_section_embds import PdfSectionEmbeddings
 from .beneficial_subjects import BeneficialSubjects
 from .hr_managers import HoldingsReportManagers
-from .holdings import HoldingsReportHoldings
\ No newline at end of file
+from .holdings import HoldingsReportHoldings
+from .rag_answer_cache import RagAnswerCache
+from .topics import Topics, SectionTopics
+from .filing_counts import DailyTypeCounts, DailyFilerCounts
+from .data_versions import DataVersions
\ No newline at end of file
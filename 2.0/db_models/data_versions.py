@@ -0,0 +1,14 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, func
+from .base import Base
+import config.settings as settings
+
+class DataVersions(Base):
+    '''
+    Monotonic version stamps, bumped by the ingestion flow whenever it commits new data (see conn/data_version.py).
+    Web workers key their caches on the current version so entries go stale exactly when the data changes.
+    '''
+    __tablename__ = settings.DATA_VERSIONS_TABLE
+
+    name = Column(String(50), primary_key=True) # i.e. 'filings'
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now())
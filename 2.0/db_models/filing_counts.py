@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, Date, Index
+from .base import Base
+import config.settings as settings
+
+'''
+Filing count rollups of filing_info, maintained by the ingestion flow (see ingest/rollups.py) so dashboard summaries never scan filing_info.
+'''
+
+class DailyTypeCounts(Base):
+    '''Filings per day x type. A few rows per day, used for corpus totals and the time series.'''
+    __tablename__ = settings.DAILY_TYPE_COUNTS_TABLE
+
+    date = Column(Date, primary_key=True)
+    type = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False)
+
+class DailyFilerCounts(Base):
+    '''Filings per day x type x SIC code x CIK, used for company / industry breakdowns within a date range.'''
+    __tablename__ = settings.DAILY_FILER_COUNTS_TABLE
+
+    date = Column(Date, primary_key=True)
+    type = Column(String(20), primary_key=True)
+    whole_sic_code = Column(String(4), primary_key=True) # '' when the filer has no SIC code, NULLs can't be part of the key
+    cik = Column(String(10), primary_key=True)
+    sic_mjr_group_code = Column(String(2))
+    sic_desc = Column(String(255))
+    company_name = Column(String(255))
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index(f'idx_{settings.DAILY_FILER_COUNTS_TABLE}_sic_date', 'whole_sic_code', 'date'),
+        Index(f'idx_{settings.DAILY_FILER_COUNTS_TABLE}_cik_date', 'cik', 'date'),
+    )
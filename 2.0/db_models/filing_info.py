@@ -20,7 +20,7 @@ class FilingInfo(Base):
 
     accession_number = Column(String(20), primary_key=True)
     type = Column(String(20))
-    date = Column(Date)  
+    date = Column(Date, index=True)
     cik = Column(String(10), nullable=False)
     whole_sic_code = Column(String(4))
     sic_mjr_group_code = Column(String(2))
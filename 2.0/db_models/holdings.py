@@ -17,9 +17,9 @@ class HoldingsReportHoldings(Base):
     amount = Column(BigInteger)
     amt_type = Column(Text)
     discretion = Column(Text)
-    sole_vote = Column(Text)
-    shared_vote = Column(Text)
-    no_vote = Column(Text)
+    sole_vote = Column(BigInteger)
+    shared_vote = Column(BigInteger)
+    no_vote = Column(BigInteger)
     figi = Column(String(12))
     other_mgr = Column(Text)
     manager_name = Column(Text)
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from .base import Base
+from .text_search import text_search_column, text_search_index
 import config.settings as settings
 
 class PdfSections(Base):
@@ -17,4 +18,11 @@ class PdfSections(Base):
     start_page = Column(Integer)
     end_page = Column(Integer)
     section_name = Column(Text)
-    text = Column(Text)
\ No newline at end of file
+    text = Column(Text)
+
+    # Generated, not written by ingestion. See text_search.py
+    text_search = text_search_column(settings.PDF_SECTIONS_TABLE)
+
+    __table_args__ = (
+        text_search_index(settings.PDF_SECTIONS_TABLE),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, Float, String, Text, Date, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import JSON
+from pgvector.sqlalchemy import Vector
+from .base import Base
+import config.settings as settings
+
+class RagAnswerCache(Base):
+    __tablename__ = settings.RAG_ANSWER_CACHE_TABLE
+
+    id = Column(Integer, primary_key=True)
+
+    # The question asked, and its embedding (384 dimensions for all-MiniLM-L6-v2)
+    query_text = Column(Text, nullable=False)
+    query_embedding = Column(Vector(384), nullable=False)
+
+    # The cached RAG response
+    answer = Column(Text)
+    sources = Column(JSON)
+    context = Column(Text)
+
+    # Filing date range the answer was drawn from. NULL bounds are unbounded, meaning any newly ingested filings invalidate the entry
+    date_range_start = Column(Date, nullable=True)
+    date_range_end = Column(Date, nullable=True)
+
+    # Bookkeeping for hit rate / saved LLM time reporting
+    llm_seconds = Column(Float, default=0.0)  # Time it took to generate the answer originally
+    hit_count = Column(Integer, default=0)
+    last_hit_at = Column(DateTime, nullable=True)
+
+    embedding_model = Column(String(50), default=settings.DEFAULT_EMBEDDING_MODEL)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index(f'idx_{settings.RAG_ANSWER_CACHE_TABLE}_embedding_hnsw_cosine',
+              query_embedding,
+              postgresql_using='hnsw',
+              postgresql_ops={'query_embedding': 'vector_cosine_ops'}),
+    )
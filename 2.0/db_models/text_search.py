@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+import config.settings as settings
+
+'''
+Generated tsvector columns for full text search over the section text tables. Section titles are weighted above the body text.
+The same expressions are used by the models (new databases) and conn/setup_db.py (adding the column to existing tables).
+'''
+
+TEXT_SEARCH_COLUMN = 'text_search'
+
+# Table -> SQL expression for the section title
+TEXT_SEARCH_TITLE_EXPRESSIONS = {
+    settings.NAMED_SECTIONS_TABLE: "coalesce(section_name, '')",
+    settings.TOC_SECTIONS_TABLE: "coalesce(section_name, '')",
+    settings.PDF_SECTIONS_TABLE: "coalesce(section_name, '')",
+    settings.EXHIBITS_TABLE: "coalesce(exhibit_type, '') || ' ' || coalesce(exhibit_meaning, '')"
+}
+
+def text_search_expression(table_name: str) -> str:
+    return (
+        f"setweight(to_tsvector('{settings.TEXT_SEARCH_CONFIG}', {TEXT_SEARCH_TITLE_EXPRESSIONS[table_name]}), 'A') || "
+        f"setweight(to_tsvector('{settings.TEXT_SEARCH_CONFIG}', left(coalesce(text, ''), {settings.TEXT_SEARCH_MAX_CHARS})), 'B')"
+    )
+
+def text_search_index_name(table_name: str) -> str:
+    return f'idx_{table_name}_{TEXT_SEARCH_COLUMN}_gin'
+
+def text_search_column(table_name: str) -> Column:
+    return Column(TEXT_SEARCH_COLUMN, TSVECTOR, Computed(text_search_expression(table_name), persisted=True))
+
+def text_search_index(table_name: str) -> Index:
+    return Index(text_search_index_name(table_name), TEXT_SEARCH_COLUMN, postgresql_using='gin')
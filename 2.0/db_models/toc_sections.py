@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from .base import Base
+from .text_search import text_search_column, text_search_index
 import config.settings as settings
 
 class HtmlSections(Base):
@@ -15,4 +16,11 @@ class HtmlSections(Base):
 
     section_name = Column(Text)
     section_type = Column(Text)
-    text = Column(Text)
\ No newline at end of file
+    text = Column(Text)
+
+    # Generated, not written by ingestion. See text_search.py
+    text_search = text_search_column(settings.TOC_SECTIONS_TABLE)
+
+    __table_args__ = (
+        text_search_index(settings.TOC_SECTIONS_TABLE),
+    )
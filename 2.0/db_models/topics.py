@@ -0,0 +1,45 @@
+from sqlalchemy import Column, Integer, Float, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import relationship
+from pgvector.sqlalchemy import Vector
+from .base import Base
+import config.settings as settings
+
+class Topics(Base):
+    __tablename__ = settings.TOPICS_TABLE
+
+    id = Column(Integer, primary_key=True)
+    section_topics = relationship(settings.SECTION_TOPICS_CLASS_NAME, back_populates=settings.TOPICS_TABLE, cascade='all, delete-orphan')
+
+    # Topics are fit separately for each SIC division (i.e. '20-39', 'none' for filers without a SIC code) and filing type
+    sic_division = Column(String(10), nullable=False)
+    filing_type = Column(String(20), nullable=False)
+
+    # Unit length mean of the member section embeddings (384 dimensions for all-MiniLM-L6-v2), updated incrementally
+    centroid = Column(Vector(384), nullable=False)
+    size = Column(Integer, default=0)
+
+    label = Column(Text)
+    keywords = Column(JSON) # Top c-TF-IDF terms
+    term_counts = Column(JSON) # Running term counts of member sections, kept so keywords can be recomputed without re-reading text
+
+    embedding_model = Column(String(50), default=settings.DEFAULT_EMBEDDING_MODEL)
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index(f'idx_{settings.TOPICS_TABLE}_group', 'sic_division', 'filing_type'),
+    )
+
+class SectionTopics(Base):
+    __tablename__ = settings.SECTION_TOPICS_TABLE
+
+    # Sections live in any of the text tables in settings.TEXT_TYPE_TABLES, so (source table, section id) is the key
+    source = Column(String(50), primary_key=True)
+    section_id = Column(Integer, primary_key=True)
+
+    topic_id = Column(Integer, ForeignKey(f'{settings.TOPICS_TABLE}.id'), nullable=False, index=True)
+    topics = relationship(settings.TOPICS_CLASS_NAME, back_populates=settings.SECTION_TOPICS_TABLE)
+
+    similarity = Column(Float) # Cosine similarity to the topic centroid at assignment time
+    assigned_at = Column(DateTime, server_default=func.now())
@@ -15,3 +15,15 @@ from routes import all_blueprints
 for bp in all_blueprints:
     app.register_blueprint(bp)
     logging.info(f'Registered flask route blueprint: {bp.name}')
+
+# Requests share one pooled DB connection, returned at teardown
+from services.request_db import init_app as init_request_db
+init_request_db(app)
+
+# gzip / brotli compression of text responses
+from services.compression import init_app as init_compression
+init_compression(app)
+
+# Fingerprinted, long lived static asset URLs
+from services.static_assets import init_app as init_static_assets
+init_static_assets(app)
@@ -1,11 +1,19 @@
 from .dashboard import dashboard_bp
+from .filings import filings_bp
 from .flows import flows_bp
 from .industry import industry_bp
+from .metrics import metrics_bp
 from .rag import rag_bp
+from .topics import topics_bp
+from .trends import trends_bp
 
 all_blueprints = [
     dashboard_bp,
+    filings_bp,
     flows_bp,
     industry_bp,
-    rag_bp
+    metrics_bp,
+    rag_bp,
+    topics_bp,
+    trends_bp
 ]
\ No newline at end of file
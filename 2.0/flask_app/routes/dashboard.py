@@ -1,9 +1,12 @@
 from flask import Blueprint, render_template, jsonify, session, redirect, url_for, request
 from datetime import date
+from urllib.parse import urlencode
 from dateutil.relativedelta import relativedelta
 
 from services.db_flask_interface import DBService
-from services.sic_hierarchy import build_sic_hierarchy
+from services.sic_hierarchy import build_sic_hierarchy, division_totals
+from services.industry_service import IndustryService, encode_cursor
+from services.fragment_cache import FragmentCache
 import config.settings as settings
 from config.log_config import config_logging
 config_logging('web') ## TESTING
@@ -11,6 +14,8 @@ config_logging('web') ## TESTING
 dashboard_bp = Blueprint('dashboard', __name__)
 
 db_service = DBService()
+industry_service = IndustryService(data_version=db_service.data_version)
+fragment_cache = FragmentCache(db_service.data_version)
 
 @dashboard_bp.route("/")
 def login():
@@ -46,27 +51,45 @@ def home():
 
         anchor_date = db_service.get_current_anchor_date(timeframe, date.fromisoformat(anchor_str))
         print(f'Calculated anchor_date based on anchor_str argument: {anchor_date}')
-        db_service.refresh_sql_summary(timeframe, anchor_date, filing_type_filter)
+        sql_summary = db_service.get_sql_summary(timeframe, anchor_date, filing_type_filter)
         print(f'Refreshed SQL summary, now constructing hierarchical representation.') 
-        sic_hierarchy = build_sic_hierarchy(db_service.data_cache.get('sql_summary', {}).get('parsed_by_industry', {}))
+        sic_hierarchy = build_sic_hierarchy(sql_summary.get('parsed_by_industry', []), sql_summary.get('parsed_by_major_group'))
 
         # Calculate statistics
-        current_count = sum(item['count'] for item in db_service.data_cache.get('sql_summary', {}).get('parsed_by_industry', {}))
-        total_industries = len(db_service.data_cache.get('sql_summary', {}).get('parsed_by_industry', {}))
+        current_count = sum(division['total_count'] for division in sic_hierarchy.values())
+        total_industries = len(sql_summary.get('parsed_by_industry', {}))
         group_count = sum(len(major_group.get('groups')) for major_group in sic_hierarchy.values())
         division_count = len(sic_hierarchy)
         print(f'current_count for timeframe + filing type selection: {current_count}\nTotal # industries represented: {total_industries}\nIndustry divisions: {division_count}\nMajor groups: {group_count}')
 
-        return render_template("filings_summary.html", 
-                            sql_summary=db_service.data_cache.get('sql_summary', {}),
-                            sic_hierarchy=sic_hierarchy, 
+        # The long lists are rendered once per data version, and truncated, more rows are loaded on demand
+        fragment_key = (timeframe, anchor_date, filing_type_filter)
+        filter_query = urlencode({"timeframe": timeframe, "anchor_date": anchor_date.isoformat(), "filing_type": filing_type_filter})
+        industry_explorer = fragment_cache.render("partials/industry_explorer.html", fragment_key,
+                            sic_hierarchy=sic_hierarchy,
                             timeframe=timeframe,
                             anchor_date=anchor_date,
-                            filing_type=filing_type_filter,
                             current_count=current_count,
                             total_industries=total_industries,
                             division_count=division_count,
-                            total_major_groups=group_count)
+                            total_major_groups=group_count,
+                            industries_per_group=settings.DASHBOARD_INDUSTRIES_PER_GROUP,
+                            filter_query=filter_query)
+        companies = sql_summary.get('parsed_by_company', [])
+        top_companies = fragment_cache.render("partials/top_companies.html", fragment_key,
+                            companies=companies,
+                            filter_query=filter_query,
+                            companies_next_cursor=encode_cursor(companies[-1]['count'], companies[-1]['cik']) if len(companies) >= settings.DASHBOARD_TOP_COMPANIES else None)
+
+        return render_template("filings_summary.html", 
+                            sql_summary=sql_summary,
+                            sic_hierarchy=division_totals(sic_hierarchy), # Treemaps only need division / major group totals
+                            industry_explorer=industry_explorer,
+                            top_companies=top_companies,
+                            timeframe=timeframe,
+                            anchor_date=anchor_date,
+                            filing_type=filing_type_filter,
+                            current_count=current_count)
     else:
         return redirect(url_for("dashboard.login"))
     
@@ -82,4 +105,19 @@ def filing_type_page(filing_type):
 
 @dashboard_bp.route('/industry')
 def industry_page():
-    pass # TODO
\ No newline at end of file
+    pass # TODO
+
+@dashboard_bp.route('/api/companies')
+def get_companies():
+    """Companies by filing count in the home page's timeframe, paged with the cursor from the previous page."""
+    if not session.get("logged_in"):
+        return jsonify({"error": "Not logged in"}), 401
+    try:
+        timeframe = request.args.get("timeframe", "week")
+        anchor_date = db_service.get_current_anchor_date(timeframe, date.fromisoformat(request.args.get("anchor_date", str(date.today()))))
+        start, end = db_service.calculate_query_start_end_date(timeframe, anchor_date)
+        result = industry_service.get_companies('all', None, start, end, request.args.get("filing_type", "all"),
+                                                max(1, min(request.args.get("per_page", 50, type=int), 200)), request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
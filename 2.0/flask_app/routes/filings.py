@@ -0,0 +1,40 @@
+import hashlib
+import logging
+from flask import Blueprint, jsonify, request
+
+import config.settings as settings
+from services.filing_service import FilingService
+
+filings_bp = Blueprint('filings', __name__, url_prefix='/api/filings')
+filing_service = FilingService()
+
+def _cacheable(response):
+    '''Adds a weak ETag of the body and Cache-Control, answering 304 when the client's copy is current.'''
+    response.set_etag(hashlib.md5(response.get_data()).hexdigest(), weak=True)
+    response.headers['Cache-Control'] = f'private, max-age={settings.FILING_CACHE_MAX_AGE_SECONDS}'
+    return response.make_conditional(request)
+
+@filings_bp.route('/<accession_number>')
+def get_filing(accession_number):
+    '''Filing info plus the metadata (not text) of every parsed section, fetch text per section below.'''
+    try:
+        filing = filing_service.get_filing(accession_number)
+    except Exception as e:
+        logging.exception(f'Failed to fetch filing {accession_number}:')
+        return jsonify({'error': str(e)}), 500
+    if filing is None:
+        return jsonify({'error': 'Filing not found'}), 404
+    return _cacheable(jsonify(filing))
+
+@filings_bp.route('/<accession_number>/sections/<source>/<int:section_id>')
+def get_section(accession_number, source, section_id):
+    try:
+        section = filing_service.get_section(accession_number, source, section_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.exception(f'Failed to fetch section {source}/{section_id} of filing {accession_number}:')
+        return jsonify({'error': str(e)}), 500
+    if section is None:
+        return jsonify({'error': 'Section not found'}), 404
+    return _cacheable(jsonify(section))
@@ -1,147 +1,143 @@
-from flask import Blueprint, render_template, request, jsonify
-from datetime import datetime, timedelta
-from dateutil.relativedelta import relativedelta
+from flask import Blueprint, render_template, request, jsonify, abort
+from datetime import date
 
+from services.db_flask_interface import DBService
+from services.industry_service import IndustryService
 from config.log_config import config_logging
 config_logging('web') ## TESTING
 
 # Create the blueprint
 industry_bp = Blueprint('industry', __name__, url_prefix='/industry-analysis')
 
-@industry_bp.route('/division/<division_code>')
-def division_analysis(division_code):
+db_service = DBService()
+industry_service = IndustryService(data_version=db_service.data_version)
+
+MAX_PER_PAGE = 200
+
+def _get_filters():
     """
-    Render the industry analysis page for a specific division (2-digit SIC code)
+    Parse the filters passed from the home page. Returns (timeframe, anchor_date, filing_type, start, end)
     """
-    # Get query parameters (filters passed from home page)
     timeframe = request.args.get('timeframe', 'month')
-    anchor_date = request.args.get('anchor_date', datetime.now().strftime('%Y-%m-%d'))
+    if timeframe not in ('day', 'week', 'month', 'quarter', 'year'):
+        raise ValueError(f'Invalid timeframe: {timeframe}')
+    anchor_date = db_service.get_current_anchor_date(timeframe, date.fromisoformat(request.args.get('anchor_date', str(date.today()))))
     filing_type = request.args.get('filing_type', 'all')
-    
-    # TODO: Query your database for division data
-    # Example structure:
-    # division_data = {
-    #     'code': division_code,
-    #     'name': 'Manufacturing',  # Get from SIC lookup
-    #     'companies': [...],  # List of companies in this division
-    #     'filings': [...],  # List of filings in this division
-    #     'stats': {...}  # Summary statistics
-    # }
-    
-    # For now, pass the parameters to the template
-    context = {
-        'level': 'division',
-        'code': division_code,
-        'timeframe': timeframe,
-        'anchor_date': anchor_date,
-        'filing_type': filing_type,
-        # Add your database query results here
-    }
-    
-    return render_template('industry_analysis.html', **context)
+    start, end = db_service.calculate_query_start_end_date(timeframe, anchor_date)
+    return timeframe, anchor_date, filing_type, start, end
 
+def _render_analysis(level, code):
+    """
+    Render the industry analysis page for one level of the SIC hierarchy, aggregates from the filing count rollups
+    """
+    try:
+        timeframe, anchor_date, filing_type, start, end = _get_filters()
+        overview = industry_service.get_overview(level, code, start, end, timeframe, filing_type)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    return render_template('industry_analysis.html',
+                           level=level,
+                           code=code,
+                           timeframe=timeframe,
+                           anchor_date=anchor_date,
+                           filing_type=filing_type,
+                           sql_summary=overview,
+                           current_count=overview['current_count'])
+
+@industry_bp.route('/division/<division_code>')
+def division_analysis(division_code):
+    """
+    Render the industry analysis page for a specific division (range of 2-digit major groups, i.e. 20-39)
+    """
+    return _render_analysis('division', division_code)
 
 @industry_bp.route('/major-group/<major_group_code>')
 def major_group_analysis(major_group_code):
     """
-    Render the industry analysis page for a specific major group (3-digit SIC code)
+    Render the industry analysis page for a specific major group (2-digit SIC code) or industry group (3-digit SIC code)
     """
-    # Get query parameters
-    timeframe = request.args.get('timeframe', 'month')
-    anchor_date = request.args.get('anchor_date', datetime.now().strftime('%Y-%m-%d'))
-    filing_type = request.args.get('filing_type', 'all')
-    
-    # TODO: Query your database for major group data
-    
-    context = {
-        'level': 'major-group',
-        'code': major_group_code,
-        'timeframe': timeframe,
-        'anchor_date': anchor_date,
-        'filing_type': filing_type,
-        # Add your database query results here
-    }
-    
-    return render_template('industry_analysis.html', **context)
-
+    return _render_analysis('major-group', major_group_code)
 
 @industry_bp.route('/industry/<industry_code>')
 def industry_analysis(industry_code):
     """
     Render the industry analysis page for a specific industry (4-digit SIC code)
     """
-    # Get query parameters
-    timeframe = request.args.get('timeframe', 'month')
-    anchor_date = request.args.get('anchor_date', datetime.now().strftime('%Y-%m-%d'))
-    filing_type = request.args.get('filing_type', 'all')
-    
-    # TODO: Query your database for industry data
-    
-    context = {
-        'level': 'industry',
-        'code': industry_code,
-        'timeframe': timeframe,
-        'anchor_date': anchor_date,
-        'filing_type': filing_type,
-        # Add your database query results here
-    }
-    
-    return render_template('industry_analysis.html', **context)
-
-
-# Optional: API endpoints for dynamic data loading
+    return _render_analysis('industry', industry_code)
+
+# API endpoints for dynamic data loading. Paged with an opaque cursor: pass back next_cursor to get the following page
 @industry_bp.route('/api/<level>/<code>/companies')
 def get_companies(level, code):
     """
-    API endpoint to get companies for a given industry level
+    API endpoint to get companies for a given industry level, most filings first
     """
-    timeframe = request.args.get('timeframe', 'month')
-    anchor_date = request.args.get('anchor_date', datetime.now().strftime('%Y-%m-%d'))
-    filing_type = request.args.get('filing_type', 'all')
-    
-    # TODO: Query database for companies
-    companies = []
-    
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), MAX_PER_PAGE))
+    cursor = request.args.get('cursor')
+    try:
+        timeframe, anchor_date, filing_type, start, end = _get_filters()
+        result = industry_service.get_companies(level, code, start, end, filing_type, per_page, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     return jsonify({
         'level': level,
         'code': code,
-        'companies': companies,
+        'companies': result['companies'],
+        'pagination': {
+            'per_page': per_page,
+            'next_cursor': result['next_cursor'],
+            'has_more': result['next_cursor'] is not None
+        },
         'filters': {
             'timeframe': timeframe,
-            'anchor_date': anchor_date,
+            'anchor_date': anchor_date.isoformat(),
             'filing_type': filing_type
         }
     })
 
+@industry_bp.route('/api/<level>/<code>/industries')
+def get_industries(level, code):
+    """
+    API endpoint to get every industry (4-digit SIC code) within a given industry level, most filings first
+    """
+    try:
+        timeframe, anchor_date, filing_type, start, end = _get_filters()
+        overview = industry_service.get_overview(level, code, start, end, timeframe, filing_type)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'level': level,
+        'code': code,
+        'industries': overview['parsed_by_industry']
+    })
 
 @industry_bp.route('/api/<level>/<code>/filings')
 def get_filings(level, code):
     """
-    API endpoint to get filings for a given industry level
+    API endpoint to get filings for a given industry level, newest first
     """
-    timeframe = request.args.get('timeframe', 'month')
-    anchor_date = request.args.get('anchor_date', datetime.now().strftime('%Y-%m-%d'))
-    filing_type = request.args.get('filing_type', 'all')
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
-    # TODO: Query database for filings with pagination
-    filings = []
-    total = 0
-    
+    per_page = max(1, min(request.args.get('per_page', 50, type=int), MAX_PER_PAGE))
+    cursor = request.args.get('cursor')
+    try:
+        timeframe, anchor_date, filing_type, start, end = _get_filters()
+        result = industry_service.get_filings(level, code, start, end, filing_type, per_page, cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     return jsonify({
         'level': level,
         'code': code,
-        'filings': filings,
+        'filings': result['filings'],
         'pagination': {
-            'page': page,
             'per_page': per_page,
-            'total': total,
-            'pages': (total + per_page - 1) // per_page
+            'next_cursor': result['next_cursor'],
+            'has_more': result['next_cursor'] is not None
         },
         'filters': {
             'timeframe': timeframe,
-            'anchor_date': anchor_date,
+            'anchor_date': anchor_date.isoformat(),
             'filing_type': filing_type
         }
-    })
\ No newline at end of file
+    })
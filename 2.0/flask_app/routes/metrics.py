@@ -0,0 +1,11 @@
+import os
+from flask import Blueprint, jsonify
+
+from conn.db_engine import pool_metrics
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+@metrics_bp.route('/db-pool')
+def db_pool():
+    '''Connection pool checkout waits and usage of this gunicorn worker (each worker has its own pools).'''
+    return jsonify({'pid': os.getpid(), 'pools': pool_metrics()})
@@ -3,9 +3,12 @@ import logging
 
 from config.log_config import config_logging
 from services.llm_service import RAGService
+from services.rag_agent import RAGAgent
+from services.query_filters import extract_query_filters
 
 rag_bp = Blueprint('rag', __name__, url_prefix='/api/rag')
 rag_service = RAGService()
+rag_agent = RAGAgent(rag_service)
 config_logging('web') ### TESTING. Maybe move to routes __init__???
 
 @rag_bp.route('/query', methods=['POST'])
@@ -18,7 +21,38 @@ def handle_rag_query():
         return jsonify({"error": "Query too short"}), 400
     
     try:
-        result = rag_service.rag_query(query)
+        result = rag_agent.answer(query)
         return jsonify(result)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@rag_bp.route('/cache/stats')
+def rag_cache_stats():
+    '''Semantic answer cache hit rate and LLM time saved.'''
+    return jsonify(rag_service.answer_cache.stats())
+
+
+@rag_bp.route('/search')
+def rag_search():
+    '''
+    Section search without the LLM. mode=lexical (default) for exact keyword lookups, or hybrid for lexical + vector fused by RRF.
+    '''
+    query = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'lexical')
+    top_k = max(1, min(request.args.get('top_k', 10, type=int), 50))
+    if len(query) < 2:
+        return jsonify({"error": "Query too short"}), 400
+
+    filters = extract_query_filters(query)
+    if mode == 'hybrid':
+        query_embedding = rag_service.vector_search.get_embedding(query)
+        results = rag_service.lexical_search.search_hybrid(query, query_embedding, filters, top_k=top_k)
+    else:
+        results = rag_service.lexical_search.search(query, filters, top_k=top_k)
+
+    return jsonify({
+        'mode': mode,
+        'filters': filters.describe(),
+        'results': results
+    })
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, jsonify
+
+from services.bertopic import TopicService
+
+topics_bp = Blueprint('topics', __name__, url_prefix='/api/topics')
+topic_service = TopicService()
+
+@topics_bp.route('/')
+def list_topics():
+    '''Precomputed topics, optionally for one SIC division (i.e. 20-39) and/or filing type.'''
+    topics = topic_service.list_topics(
+        sic_division=request.args.get('sic_division'),
+        filing_type=request.args.get('filing_type'),
+        limit=max(1, min(request.args.get('limit', 50, type=int), 200))
+    )
+    return jsonify({'topics': topics})
+
+@topics_bp.route('/<int:topic_id>')
+def get_topic(topic_id):
+    topic = topic_service.get_topic(topic_id, limit=max(1, min(request.args.get('limit', 20, type=int), 100)))
+    if topic is None:
+        return jsonify({'error': 'Topic not found'}), 404
+    return jsonify(topic)
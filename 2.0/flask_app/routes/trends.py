@@ -0,0 +1,57 @@
+from flask import Blueprint, request, jsonify
+from datetime import date, timedelta
+
+from services.db_flask_interface import DBService
+from services.trends_service import TrendsService
+
+trends_bp = Blueprint('trends', __name__, url_prefix='/api/trends')
+
+db_service = DBService()
+trends_service = TrendsService(data_version=db_service.data_version)
+
+@trends_bp.route('/series')
+def time_series():
+    '''
+    Filing counts over [start, end) per granularity period, one series per key of group_by (total / type / major_group /
+    industry / company), optionally within a SIC level (level=division|major-group|industry&code=...).
+    '''
+    try:
+        end = date.fromisoformat(request.args['end']) + timedelta(days=1) if 'end' in request.args else date.today() + timedelta(days=1)
+        start = date.fromisoformat(request.args['start']) if 'start' in request.args else end - timedelta(days=365)
+        result = trends_service.get_time_series(
+            start, end,
+            granularity=request.args.get('granularity', 'month'),
+            dimension=request.args.get('group_by', 'total'),
+            filing_type=request.args.get('filing_type', 'all'),
+            level=request.args.get('level', 'all'),
+            code=request.args.get('code'),
+            max_series=max(1, min(request.args.get('max_series', 10, type=int), 50))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@trends_bp.route('/movers')
+def top_movers():
+    '''
+    Companies / industries / major groups / types with the largest change in filings in the timeframe containing anchor_date,
+    compared with the timeframe before it.
+    '''
+    try:
+        timeframe = request.args.get('timeframe', 'month')
+        if timeframe not in ('day', 'week', 'month', 'quarter', 'year'):
+            raise ValueError(f'Invalid timeframe: {timeframe}')
+        anchor_date = date.fromisoformat(request.args.get('anchor_date', str(date.today())))
+        start, end = db_service.calculate_query_start_end_date(timeframe, anchor_date)
+        prior_start, _ = db_service.calculate_query_start_end_date(timeframe, start - timedelta(days=1))
+        result = trends_service.get_top_movers(
+            start, end, prior_start,
+            dimension=request.args.get('dimension', 'company'),
+            filing_type=request.args.get('filing_type', 'all'),
+            level=request.args.get('level', 'all'),
+            code=request.args.get('code'),
+            limit=max(1, min(request.args.get('limit', 10, type=int), 100))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({**result, 'timeframe': timeframe})
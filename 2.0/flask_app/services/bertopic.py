@@ -0,0 +1,69 @@
+import logging
+from typing import List, Dict, Optional
+from sqlalchemy import text
+
+import config.settings as settings
+from .vector_search import get_section_name_expr
+from .request_db import request_connection
+
+class TopicService:
+    '''
+    Read side of the topic modelling done by the ingestion flow (see ingest/topic_modeling.py).
+    Nothing is fit here, topic pages only read the precomputed topics and section_topics tables.
+    '''
+
+    def list_topics(self, sic_division: Optional[str] = None, filing_type: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        try:
+            with request_connection() as conn:
+                rows = conn.execute(text(f'''
+                    SELECT id, sic_division, filing_type, size, label, keywords, updated_at
+                    FROM {settings.TOPICS_TABLE}
+                    WHERE (CAST(:sic_division AS text) IS NULL OR sic_division = :sic_division)
+                    AND (CAST(:filing_type AS text) IS NULL OR filing_type = :filing_type)
+                    ORDER BY size DESC
+                    LIMIT :limit
+                '''), {'sic_division': sic_division, 'filing_type': filing_type, 'limit': limit}).mappings().all()
+            return [dict(r) for r in rows]
+        except Exception as e:
+            logging.error(f'Failed to list topics: {e}')
+            return []
+
+    def get_topic(self, topic_id: int, limit: int = 20) -> Optional[Dict]:
+        '''
+        A topic with its most representative sections (closest to the centroid).
+        '''
+        section_branches = ' UNION ALL '.join(f'''
+            SELECT
+                st.source,
+                st.section_id,
+                st.similarity,
+                {get_section_name_expr(table_name)} AS section_name,
+                f.accession_number,
+                f.company_name,
+                f.type,
+                f.date
+            FROM {settings.SECTION_TOPICS_TABLE} st
+            JOIN {table_name} s ON st.source = '{table_name}' AND s.id = st.section_id
+            JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+            WHERE st.topic_id = :topic_id''' for table_name in settings.TEXT_TYPE_TABLES)
+
+        try:
+            with request_connection() as conn:
+                topic = conn.execute(text(f'''
+                    SELECT id, sic_division, filing_type, size, label, keywords, updated_at
+                    FROM {settings.TOPICS_TABLE}
+                    WHERE id = :topic_id
+                '''), {'topic_id': topic_id}).mappings().fetchone()
+                if topic is None:
+                    return None
+
+                sections = conn.execute(text(f'''
+                    SELECT * FROM ({section_branches}) sections
+                    ORDER BY similarity DESC
+                    LIMIT :limit
+                '''), {'topic_id': topic_id, 'limit': limit}).mappings().all()
+
+            return {**dict(topic), 'sections': [dict(s) for s in sections]}
+        except Exception as e:
+            logging.error(f'Failed to get topic {topic_id}: {e}')
+            return None
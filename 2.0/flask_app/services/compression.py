@@ -0,0 +1,62 @@
+import gzip
+import logging
+from flask import request
+
+import config.settings as settings
+
+try:
+    import brotli
+except ImportError: # Optional, gzip only without it
+    brotli = None
+
+'''
+Response compression for the app: brotli when the client accepts it (and the package is installed), gzip otherwise.
+Only text-like bodies above a minimum size are compressed, streamed and already encoded responses are left alone.
+'''
+
+_COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript', 'text/javascript')
+
+def _accepted_encodings():
+    accepted = request.accept_encodings
+    encodings = []
+    if brotli is not None and accepted['br']:
+        encodings.append('br')
+    if accepted['gzip']:
+        encodings.append('gzip')
+    return encodings
+
+def compress_response(response):
+    if (response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in _COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encodings = _accepted_encodings()
+    if not encodings:
+        return response
+    body = response.get_data()
+    if len(body) < settings.COMPRESSION_MIN_BYTES:
+        return response
+
+    try:
+        if encodings[0] == 'br':
+            compressed = brotli.compress(body, quality=settings.BROTLI_QUALITY)
+        else:
+            compressed = gzip.compress(body, compresslevel=settings.GZIP_LEVEL)
+    except Exception as e:
+        logging.warning(f'Failed to compress {request.path} response, sending it uncompressed: {str(e)}')
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encodings[0]
+    # Weak ETags set on the uncompressed body still validate, strong ones would now be wrong
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app):
+    app.after_request(compress_response)
@@ -2,14 +2,18 @@ from sqlalchemy import text
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 
+import config.settings as settings
 from conn.db_engine import engine  
+from conn.data_version import DataVersionReader
+from .cache import TTLCache
+from .request_db import request_connection
 
 class DBService:
 
     def __init__(self):
-        self.data_cache = {
-            #'sql_summary': {}
-        }
+        # Keyed by (timeframe, anchor date, filing type filter, filings data version). See get_sql_summary
+        self.summary_cache = TTLCache(settings.SUMMARY_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_TTL_SECONDS)
+        self.data_version = DataVersionReader(engine)
 
     def get_current_anchor_date(self, timeframe, input_date):
         if timeframe == 'day':
@@ -62,142 +66,131 @@ class DBService:
         print(f'Calculated target start and end dates for query: {start}, {end}')
         return start, end
     
-    def get_count_in_current_timeframe(self, anchor_date):
-        for item in self.data_cache['sql_summary']['parsed_by_date']:
+    def get_count_in_current_timeframe(self, sql_summary, anchor_date):
+        for item in sql_summary['parsed_by_date']:
             item_date = date.fromisoformat(item['date'])
             if item_date == anchor_date:
                 print(f"Found target: {item_date}, count: {item['count']}")
                 return item['count']
     
+    def get_sql_summary(self, timeframe, anchor_date, single_filing_type_filter="all"):
+        """
+        Cached refresh_sql_summary. Entries are keyed on the filings data version, which the ingestion flow bumps whenever it commits
+        new filings, so repeat views are served from this worker's memory until the data actually changes.
+        Returned dictionaries are shared between requests and must not be modified.
+        """
+        version = self.data_version.current()
+        if version is None: # Couldn't read the version, don't risk serving or storing stale entries
+            return self.refresh_sql_summary(timeframe, anchor_date, single_filing_type_filter)
+
+        key = (timeframe, anchor_date, single_filing_type_filter, version)
+        sql_summary = self.summary_cache.get(key)
+        if sql_summary is None:
+            sql_summary = self.refresh_sql_summary(timeframe, anchor_date, single_filing_type_filter)
+            if sql_summary: # Failed queries return {}, retry those next time
+                self.summary_cache.set(key, sql_summary)
+        else:
+            print(f'Served sql_summary from cache for {key}.')
+        return sql_summary
+
     def refresh_sql_summary(self, timeframe, anchor_date, single_filing_type_filter="all"):
         """Fetch filing counts by type, filer/company, and industry, for the given time period"""
         print(f'Refreshing sql_summary dictionary, aggregating by: {timeframe}, with anchor date: {anchor_date}. Filtering by filing type: {single_filing_type_filter}')
         # Get dates
         start, end = self.calculate_query_start_end_date(timeframe, anchor_date)
-        
+
+        # All queries read the rollups maintained by ingestion (see ingest/rollups.py) rather than filing_info:
+        # daily_type_counts is a few rows per day, daily_filer_counts is only read within [start, end)
+        params = {
+            'timeframe': timeframe,
+            'start': start,
+            'end': end,
+            'filing_type': single_filing_type_filter,
+            'top_companies': settings.DASHBOARD_TOP_COMPANIES
+        }
+        if single_filing_type_filter == 'all':
+            print(f'No filing type filter specified, targetting all types in given timeframe.')
+            type_clause = ''
+        else:
+            print(f'Filing type filter specified: {single_filing_type_filter}')
+            type_clause = 'AND type = :filing_type'
+
         try:
-            with engine.connect() as conn:
+            with request_connection() as conn:
 
                 # Perform queries
-                result = conn.execute(text("SELECT COUNT(*) FROM filing_info;"))
+                result = conn.execute(text(f"SELECT COALESCE(SUM(count), 0) FROM {settings.DAILY_TYPE_COUNTS_TABLE};"))
                 total_parsed_filings = result.fetchone()[0]
 
-                # No filing type filter
-                if single_filing_type_filter == 'all':
-                    print(f'No filing type filter specified, targetting all types in given timeframe.')
-
-                    sql = text("""
-                        SELECT date_trunc(:timeframe, date)::date AS period, COUNT(*) AS count
-                        FROM filing_info
-                        GROUP BY period
-                        ORDER BY period ASC;
-                    """)
-                    params = {
-                        'timeframe': timeframe
-                    }
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_date = result.fetchall()
-                    
-                    sql = text("""
-                        SELECT type, COUNT(*) AS count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        GROUP BY type
-                        ORDER BY count DESC;
-                    """)
-                    params = {
-                        'start': start,
-                        'end': end
-                    }
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_type = result.fetchall()
-
-                    sql = text("""
-                        SELECT company_name, COUNT(*) AS count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        GROUP BY company_name
-                        ORDER BY count DESC;
-                    """)
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_company = result.fetchall()
-
-                    sql = text("""
-                        SELECT whole_sic_code, sic_desc, COUNT(*) as count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        GROUP BY whole_sic_code, sic_desc
-                        ORDER BY count DESC;
-                    """)
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_industry = result.fetchall()
-
-                # Edit queries to filter by specified filing type
-                else:
-                    print(f'Filing type filter specified: {single_filing_type_filter}')
-                    sql = text("""
-                        SELECT date_trunc(:timeframe, date)::date AS period, COUNT(*) AS count
-                        FROM filing_info
-                        WHERE type = :filing_type
-                        GROUP BY period
-                        ORDER BY period ASC;
-                    """)
-                    params = {
-                        'timeframe': timeframe,
-                        'filing_type': single_filing_type_filter
-                    }
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_date = result.fetchall()
-                    
-                    sql = text("""
-                        SELECT type, COUNT(*) AS count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        AND type = :filing_type
-                        GROUP BY type
-                        ORDER BY count DESC;
-                    """)
-                    params = {
-                        'start': start,
-                        'end': end,
-                        'filing_type': single_filing_type_filter
-                    }
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_type = result.fetchall()
-
-                    sql = text("""
-                        SELECT company_name, COUNT(*) AS count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        AND type = :filing_type
-                        GROUP BY company_name
-                        ORDER BY count DESC;
-                    """)
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_company = result.fetchall()
-
-                    sql = text("""
-                        SELECT whole_sic_code, sic_desc, COUNT(*) as count
-                        FROM filing_info
-                        WHERE date >= :start AND date < :end
-                        AND type = :filing_type
-                        GROUP BY whole_sic_code, sic_desc
-                        ORDER BY count DESC;
-                    """)
-                    result = conn.execute(sql, parameters=params)
-                    parsed_by_industry = result.fetchall()
+                sql = text(f"""
+                    SELECT date_trunc(:timeframe, date)::date AS period, SUM(count) AS count
+                    FROM {settings.DAILY_TYPE_COUNTS_TABLE}
+                    WHERE TRUE {type_clause}
+                    GROUP BY period
+                    ORDER BY period ASC;
+                """)
+                result = conn.execute(sql, parameters=params)
+                parsed_by_date = result.fetchall()
+
+                sql = text(f"""
+                    SELECT type, SUM(count) AS count
+                    FROM {settings.DAILY_TYPE_COUNTS_TABLE}
+                    WHERE date >= :start AND date < :end
+                    {type_clause}
+                    GROUP BY type
+                    ORDER BY count DESC;
+                """)
+                result = conn.execute(sql, parameters=params)
+                parsed_by_type = result.fetchall()
+
+                # Top filers only, the full list is paged through /api/companies
+                sql = text(f"""
+                    SELECT MAX(company_name) AS company_name, SUM(count) AS count, cik
+                    FROM {settings.DAILY_FILER_COUNTS_TABLE}
+                    WHERE date >= :start AND date < :end
+                    {type_clause}
+                    GROUP BY cik
+                    ORDER BY count DESC, cik DESC
+                    LIMIT :top_companies;
+                """)
+                result = conn.execute(sql, parameters=params)
+                parsed_by_company = result.fetchall()
+
+                sql = text(f"""
+                    SELECT NULLIF(whole_sic_code, '') AS whole_sic_code, MAX(sic_desc) AS sic_desc, SUM(count) AS count
+                    FROM {settings.DAILY_FILER_COUNTS_TABLE}
+                    WHERE date >= :start AND date < :end
+                    {type_clause}
+                    GROUP BY whole_sic_code
+                    ORDER BY count DESC;
+                """)
+                result = conn.execute(sql, parameters=params)
+                parsed_by_industry = result.fetchall()
+
+                # ~100 rows, division / major group totals for the SIC hierarchy without summing every industry in Python
+                sql = text(f"""
+                    SELECT NULLIF(LEFT(whole_sic_code, 2), '') AS sic_mjr_group_code, SUM(count) AS count
+                    FROM {settings.DAILY_FILER_COUNTS_TABLE}
+                    WHERE date >= :start AND date < :end
+                    {type_clause}
+                    GROUP BY 1
+                    ORDER BY 1;
+                """)
+                result = conn.execute(sql, parameters=params)
+                parsed_by_major_group = result.fetchall()
                 
                 # Convert results to dictionaries
-                self.data_cache['sql_summary'] = {
-                    'total_filings_parsed': total_parsed_filings,
-                    'parsed_by_date': [{'date': row[0].isoformat(), 'count': row[1]} for row in parsed_by_date],
-                    'parsed_by_type': [{'type': row[0], 'count': row[1]} for row in parsed_by_type],
-                    'parsed_by_company': [{'company_name': row[0], 'count': row[1]} for row in parsed_by_company],
-                    'parsed_by_industry': [{'whole_sic_code': row[0], 'sic_desc': row[1], 'count': row[2]} for row in parsed_by_industry]
+                sql_summary = {
+                    'total_filings_parsed': int(total_parsed_filings),
+                    'parsed_by_date': [{'date': row[0].isoformat(), 'count': int(row[1])} for row in parsed_by_date],
+                    'parsed_by_type': [{'type': row[0], 'count': int(row[1])} for row in parsed_by_type],
+                    'parsed_by_company': [{'company_name': row[0], 'count': int(row[1]), 'cik': row[2]} for row in parsed_by_company],
+                    'parsed_by_industry': [{'whole_sic_code': row[0], 'sic_desc': row[1], 'count': int(row[2])} for row in parsed_by_industry],
+                    'parsed_by_major_group': [{'sic_mjr_group_code': row[0], 'count': int(row[1])} for row in parsed_by_major_group]
                 }
 
-                conn.close()
                 print('Refreshed sql_summary dictionary.')
+                return sql_summary
         except Exception as e:
             print(f"Error fetching SQL summary: {e}.")
-            self.data_cache['sql_summary'] = {}
\ No newline at end of file
+            return {}
\ No newline at end of file
@@ -0,0 +1,69 @@
+from typing import Dict, Optional
+from sqlalchemy import text
+
+import config.settings as settings
+from .vector_search import get_section_name_expr
+from .request_db import request_connection
+
+# Per table extra metadata columns, NULL padded so every branch of the UNION ALL lines up
+_SECTION_EXTRAS = {
+    settings.NAMED_SECTIONS_TABLE: "s.section_meaning AS description, NULL::int AS start_page, NULL::int AS end_page",
+    settings.TOC_SECTIONS_TABLE: "s.section_type AS description, NULL::int AS start_page, NULL::int AS end_page",
+    settings.PDF_SECTIONS_TABLE: "NULL::text AS description, s.start_page, s.end_page",
+    settings.EXHIBITS_TABLE: "s.exhibit_meaning AS description, NULL::int AS start_page, NULL::int AS end_page"
+}
+
+class FilingService:
+    '''
+    Single filing views. get_filing returns filing_info and the metadata of every parsed section, never section text
+    (or the raw filing text), get_section returns one section's text. A client shows the outline and fetches sections as opened.
+    '''
+
+    def get_filing(self, accession_number: str) -> Optional[Dict]:
+        section_branches = ' UNION ALL '.join(f'''
+            SELECT
+                '{table_name}' AS source,
+                s.id,
+                {get_section_name_expr(table_name)} AS section_name,
+                {_SECTION_EXTRAS[table_name]},
+                length(s.text) AS char_count
+            FROM {table_name} s
+            WHERE s.accession_number = :accession_number''' for table_name in settings.TEXT_TYPE_TABLES)
+
+        with request_connection() as conn:
+            filing = conn.execute(text(f'''
+                SELECT
+                    accession_number, type, date, cik, company_name, whole_sic_code, sic_desc, report_period,
+                    state_of_incorp, fiscal_yr_end, business_address, business_phone, name_changes
+                FROM {settings.FILING_INFO_TABLE}
+                WHERE accession_number = :accession_number
+            '''), {'accession_number': accession_number}).mappings().fetchone()
+            if filing is None:
+                return None
+
+            sections = conn.execute(text(f'''
+                SELECT * FROM ({section_branches}) sections
+                ORDER BY source, id
+            '''), {'accession_number': accession_number}).mappings().all()
+
+        return {
+            **dict(filing),
+            'date': filing['date'].isoformat() if filing['date'] else None,
+            'sections': [dict(s) for s in sections]
+        }
+
+    def get_section(self, accession_number: str, source: str, section_id: int) -> Optional[Dict]:
+        '''
+        One section's text. source is the section table, as listed in get_filing's section metadata.
+        '''
+        if source not in settings.TEXT_TYPE_TABLES:
+            raise ValueError(f'Invalid section source: {source}. Must be one of: {", ".join(settings.TEXT_TYPE_TABLES)}.')
+
+        with request_connection() as conn:
+            section = conn.execute(text(f'''
+                SELECT s.id, {get_section_name_expr(source)} AS section_name, s.text
+                FROM {source} s
+                WHERE s.id = :section_id AND s.accession_number = :accession_number
+            '''), {'section_id': section_id, 'accession_number': accession_number}).mappings().fetchone()
+
+        return {**dict(section), 'source': source} if section else None
@@ -0,0 +1,24 @@
+from flask import render_template
+from markupsafe import Markup
+
+import config.settings as settings
+from .cache import TTLCache
+
+class FragmentCache:
+    '''
+    Rendered HTML of expensive template fragments, kept per worker and keyed on the filings data version like the summaries
+    they render, so a fragment is only re-rendered after new data is ingested.
+    '''
+
+    def __init__(self, data_version):
+        self.data_version = data_version
+        self.cache = TTLCache(settings.FRAGMENT_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_TTL_SECONDS)
+
+    def render(self, template_name: str, key: tuple, **context) -> Markup:
+        '''
+        template_name rendered with context, cached under (template_name, key, data version). key must identify everything
+        the context was built from. Rendered uncached when the version can't be read.
+        '''
+        version = self.data_version.current()
+        cache_key = (template_name, key, version) if version is not None else None
+        return self.cache.get_or_compute(cache_key, lambda: Markup(render_template(template_name, **context)))
@@ -0,0 +1,203 @@
+import re
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import text
+
+import config.settings as settings
+from .cache import TTLCache
+from .request_db import request_connection
+
+'''
+Queries behind the industry drill-down pages (division -> major group -> industry).
+Aggregates come from the filing count rollups, filing lists from filing_info, both filtered on the indexed SIC columns
+and paged with keyset cursors so deep pages of a large division cost the same as the first.
+'''
+
+LEVELS = ('all', 'division', 'major-group', 'industry')
+
+_DIVISION_PATTERN = re.compile(r'^(\d{2})(?:-(\d{2}))?$') # i.e. '20-39', or '99'
+_MAJOR_GROUP_PATTERN = re.compile(r'^\d{2,3}$') # 2 digit major group, or 3 digit industry group
+_INDUSTRY_PATTERN = re.compile(r'^\d{4}$')
+
+def sic_filters(level: str, code: str) -> Tuple[str, str, Dict]:
+    '''
+    Returns (filing_info predicate on alias f, rollup predicate on alias r, params) for a drill-down level and SIC code (ignored for 'all').
+    Raises ValueError for unknown levels / malformed codes.
+    '''
+    if level == 'all': # Every filing, i.e. the home page's company list
+        return 'TRUE', 'TRUE', {}
+    elif level == 'division':
+        match = _DIVISION_PATTERN.match(code)
+        if not match:
+            raise ValueError(f'Invalid SIC division: {code}')
+        low, high = match.group(1), match.group(2) or match.group(1)
+        # 2 digit strings compare like the numbers they hold
+        return (
+            'f.sic_mjr_group_code BETWEEN :sic_low AND :sic_high',
+            'r.sic_mjr_group_code BETWEEN :sic_low AND :sic_high',
+            {'sic_low': low, 'sic_high': high}
+        )
+    elif level == 'major-group':
+        if not _MAJOR_GROUP_PATTERN.match(code):
+            raise ValueError(f'Invalid SIC major group: {code}')
+        column = 'sic_mjr_group_code' if len(code) == 2 else 'sic_ind_group_code'
+        # The rollup has no industry group column, match the whole code's prefix instead
+        return (
+            f'f.{column} = :sic_code',
+            'LEFT(r.whole_sic_code, :sic_prefix_len) = :sic_code',
+            {'sic_code': code, 'sic_prefix_len': len(code)}
+        )
+    elif level == 'industry':
+        if not _INDUSTRY_PATTERN.match(code):
+            raise ValueError(f'Invalid SIC code: {code}')
+        return 'f.whole_sic_code = :sic_code', 'r.whole_sic_code = :sic_code', {'sic_code': code}
+    raise ValueError(f'Invalid industry level: {level}. Must be one of: {", ".join(LEVELS)}.')
+
+def type_filter(alias: str, filing_type: str) -> str:
+    return '' if filing_type in (None, '', 'all') else f'AND {alias}.type = :filing_type'
+
+def encode_cursor(*values) -> str:
+    return '|'.join(str(v) for v in values)
+
+def decode_cursor(cursor: Optional[str], parts: int) -> Optional[List[str]]:
+    if not cursor:
+        return None
+    values = cursor.split('|', parts - 1)
+    if len(values) != parts:
+        raise ValueError(f'Invalid cursor: {cursor}')
+    return values
+
+class IndustryService:
+    def __init__(self, data_version=None):
+        # Overviews are cached per worker on the filings data version, like the home page summary
+        self.data_version = data_version
+        self.overview_cache = TTLCache(settings.SUMMARY_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_TTL_SECONDS)
+
+    def get_overview(self, level: str, code: str, start: date, end: date, timeframe: str, filing_type: str = 'all', series_periods: int = 24) -> Dict:
+        '''
+        Rollup aggregates for one division / major group / industry within [start, end): totals (and the corpus wide total, "Total in DB"), counts by type and by industry,
+        and a time series of the last series_periods timeframes up to end. Keys match DBService's sql_summary where they overlap.
+        '''
+        version = self.data_version.current() if self.data_version else None
+        key = (level, code, start, end, timeframe, filing_type, series_periods, version) if version is not None else None
+        return self.overview_cache.get_or_compute(key, lambda: self._query_overview(level, code, start, end, timeframe, filing_type, series_periods))
+
+    def _query_overview(self, level, code, start, end, timeframe, filing_type, series_periods):
+        _, rollup_sic, params = sic_filters(level, code)
+        type_clause = type_filter('r', filing_type)
+        step = {'day': 'days', 'week': 'weeks', 'month': 'months', 'quarter': 'months', 'year': 'years'}[timeframe]
+        params.update({
+            'start': start,
+            'end': end,
+            'filing_type': filing_type,
+            'timeframe': timeframe,
+            # Time series window: series_periods timeframes back from the end of the selected one
+            'series_interval': f'{series_periods * (3 if timeframe == "quarter" else 1)} {step}'
+        })
+
+        with request_connection() as conn:
+            totals = conn.execute(text(f'''
+                SELECT COALESCE(SUM(r.count), 0) AS count, COUNT(DISTINCT r.cik) AS companies
+                FROM {settings.DAILY_FILER_COUNTS_TABLE} r
+                WHERE {rollup_sic} AND r.date >= :start AND r.date < :end {type_clause}
+            '''), params).fetchone()
+
+            # Corpus total, as on the home page. A few rows per day, where the level's whole history in the filer rollup is about a row per filing
+            total = conn.execute(text(f'SELECT COALESCE(SUM(count), 0) FROM {settings.DAILY_TYPE_COUNTS_TABLE}')).scalar()
+
+            by_type = conn.execute(text(f'''
+                SELECT r.type, SUM(r.count) AS count
+                FROM {settings.DAILY_FILER_COUNTS_TABLE} r
+                WHERE {rollup_sic} AND r.date >= :start AND r.date < :end {type_clause}
+                GROUP BY r.type
+                ORDER BY count DESC
+            '''), params).fetchall()
+
+            by_industry = conn.execute(text(f'''
+                SELECT NULLIF(r.whole_sic_code, '') AS whole_sic_code, MAX(r.sic_desc) AS sic_desc, SUM(r.count) AS count
+                FROM {settings.DAILY_FILER_COUNTS_TABLE} r
+                WHERE {rollup_sic} AND r.date >= :start AND r.date < :end {type_clause}
+                GROUP BY r.whole_sic_code
+                ORDER BY count DESC
+            '''), params).fetchall()
+
+            by_date = conn.execute(text(f'''
+                SELECT date_trunc(:timeframe, r.date)::date AS period, SUM(r.count) AS count
+                FROM {settings.DAILY_FILER_COUNTS_TABLE} r
+                WHERE {rollup_sic} AND r.date >= CAST(:end AS date) - CAST(:series_interval AS interval) AND r.date < :end {type_clause}
+                GROUP BY period
+                ORDER BY period ASC
+            '''), params).fetchall()
+
+        return {
+            'level': level,
+            'code': code,
+            'total_filings_parsed': int(total),
+            'current_count': int(totals.count),
+            'company_count': int(totals.companies),
+            'parsed_by_date': [{'date': row.period.isoformat(), 'count': int(row.count)} for row in by_date],
+            'parsed_by_type': [{'type': row.type, 'count': int(row.count)} for row in by_type],
+            'parsed_by_industry': [{'whole_sic_code': row.whole_sic_code, 'sic_desc': row.sic_desc, 'count': int(row.count)} for row in by_industry]
+        }
+
+    def get_companies(self, level: str, code: str, start: date, end: date, filing_type: str = 'all', limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        '''
+        Companies ranked by filing count within [start, end), from the rollup. Keyset paged on (count, cik) descending.
+        '''
+        _, rollup_sic, params = sic_filters(level, code)
+        params.update({'start': start, 'end': end, 'filing_type': filing_type, 'limit': limit + 1})
+
+        after = decode_cursor(cursor, 2)
+        having = ''
+        if after:
+            having = 'HAVING (SUM(r.count), r.cik) < (:after_count, :after_cik)'
+            params.update({'after_count': int(after[0]), 'after_cik': after[1]})
+
+        with request_connection() as conn:
+            rows = conn.execute(text(f'''
+                SELECT r.cik, MAX(r.company_name) AS company_name, MAX(r.whole_sic_code) AS whole_sic_code, SUM(r.count) AS count
+                FROM {settings.DAILY_FILER_COUNTS_TABLE} r
+                WHERE {rollup_sic} AND r.date >= :start AND r.date < :end {type_filter('r', filing_type)}
+                GROUP BY r.cik
+                {having}
+                ORDER BY count DESC, r.cik DESC
+                LIMIT :limit
+            '''), params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'companies': [{'cik': r.cik, 'company_name': r.company_name, 'whole_sic_code': r.whole_sic_code or None, 'count': int(r.count)} for r in rows],
+            'next_cursor': encode_cursor(rows[-1].count, rows[-1].cik) if has_more else None
+        }
+
+    def get_filings(self, level: str, code: str, start: date, end: date, filing_type: str = 'all', limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        '''
+        Filings within [start, end), newest first, from filing_info. Keyset paged on (date, accession_number) descending,
+        so the database seeks straight to the next page instead of counting past OFFSET rows.
+        '''
+        sic_filter, _, params = sic_filters(level, code)
+        params.update({'start': start, 'end': end, 'filing_type': filing_type, 'limit': limit + 1})
+
+        after = decode_cursor(cursor, 2)
+        keyset = ''
+        if after:
+            keyset = 'AND (f.date, f.accession_number) < (:after_date, :after_accession)'
+            params.update({'after_date': date.fromisoformat(after[0]), 'after_accession': after[1]})
+
+        with request_connection() as conn:
+            rows = conn.execute(text(f'''
+                SELECT f.accession_number, f.date, f.type, f.cik, f.company_name, f.whole_sic_code, f.sic_desc
+                FROM {settings.FILING_INFO_TABLE} f
+                WHERE {sic_filter} AND f.date >= :start AND f.date < :end {type_filter('f', filing_type)}
+                {keyset}
+                ORDER BY f.date DESC, f.accession_number DESC
+                LIMIT :limit
+            '''), params).mappings().all()
+
+        has_more = len(rows) > limit
+        rows = [{**r, 'date': r['date'].isoformat()} for r in rows[:limit]]
+        return {
+            'filings': rows,
+            'next_cursor': encode_cursor(rows[-1]['date'], rows[-1]['accession_number']) if has_more else None
+        }
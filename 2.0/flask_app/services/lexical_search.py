@@ -0,0 +1,174 @@
+import logging
+from typing import List, Dict, Optional
+import numpy as np
+from sqlalchemy import text
+
+import config.settings as settings
+from conn.db_engine import engine
+from db_models.text_search import TEXT_SEARCH_COLUMN
+from .query_filters import QueryFilters
+from .vector_search import get_section_name_expr
+
+# ts_rank_cd normalization flags: 1 divides by 1 + log(document length) (BM25-like length normalization), 32 maps to rank / (rank + 1)
+_RANK_NORMALIZATION = 1 | 32
+
+class LexicalSearch:
+    '''
+    Full text search over the generated tsvector columns on the section text tables (see db_models/text_search.py).
+    Exact tokens like tickers, CUSIPs, 'Item 1.05' and company names that MiniLM embeddings blur together match precisely here.
+    Queries use websearch_to_tsquery, so quoted phrases, OR and -exclusions work as they do in a search engine.
+    '''
+
+    def _lexical_branch(self, table_name: str, filter_sql: str, columns: str) -> str:
+        return f"""
+            (SELECT
+                {columns},
+                ts_rank_cd(s.{TEXT_SEARCH_COLUMN}, q.query, {_RANK_NORMALIZATION}) AS rank
+            FROM {table_name} s
+            JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+            CROSS JOIN websearch_to_tsquery('{settings.TEXT_SEARCH_CONFIG}', :query) q(query)
+            WHERE s.{TEXT_SEARCH_COLUMN} @@ q.query
+            AND {filter_sql}
+            ORDER BY rank DESC
+            LIMIT :candidates)"""
+
+    def search(self, query: str, filters: Optional[QueryFilters] = None, top_k: int = 10) -> List[Dict]:
+        '''
+        Top lexical matches for query across all section tables, restricted to filings matching filters.
+        '''
+        filters = filters or QueryFilters()
+        filter_sql, params = filters.to_sql('f')
+
+        branches = [self._lexical_branch(table_name, filter_sql, f"""
+                s.id AS section_id,
+                {get_section_name_expr(table_name)} AS section_name,
+                s.text,
+                f.accession_number,
+                f.date,
+                f.type,
+                f.company_name,
+                '{table_name}' AS source""") for table_name in settings.TEXT_TYPE_TABLES]
+
+        stmt = text(f"""
+            SELECT * FROM ({' UNION ALL '.join(branches)}) matches
+            ORDER BY rank DESC
+            LIMIT :top_k
+        """)
+        params.update({'query': query, 'candidates': top_k, 'top_k': top_k})
+
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(stmt, params).fetchall()
+            logging.info(f'Lexical search found {len(rows)} text sections for query: {query}')
+        except Exception as e:
+            logging.error(f"Lexical search failed: {str(e)}")
+            return []
+
+        return [{
+            'section_id': r.section_id,
+            'text': r.text,
+            'section_name': r.section_name,
+            'accession_number': r.accession_number,
+            'filing_date': r.date,
+            'filing_type': r.type,
+            'company_name': r.company_name,
+            'score': float(r.rank),
+            'source': r.source
+        } for r in rows]
+
+    def search_hybrid(self, query: str, query_embedding: np.ndarray, filters: Optional[QueryFilters] = None, top_k: int = 10,
+                      candidates_per_table: int = 20, threshold: float = 0.2, rrf_k: int = settings.RRF_K) -> List[Dict]:
+        '''
+        Reciprocal rank fusion of the ANN and lexical result lists, computed in a single query.
+        Each list keeps its best candidates_per_table from every section table, is ranked globally, and each section scores
+        sum(1 / (rrf_k + rank)) over the lists it appears in. Only the fused top_k rows have their text fetched.
+        '''
+        filters = filters or QueryFilters()
+        filter_sql, params = filters.to_sql('f')
+
+        vector_branches, lexical_branches, detail_branches = [], [], []
+        for table_name, embed_table_name in settings.TEXT_TYPE_TABLES.items():
+            vector_branches.append(f"""
+                (SELECT
+                    '{table_name}' AS source,
+                    e.section_id,
+                    e.embedding <=> CAST(:embedding AS vector) AS distance
+                FROM {embed_table_name} e
+                JOIN {table_name} s ON e.section_id = s.id
+                JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+                WHERE {filter_sql}
+                ORDER BY distance
+                LIMIT :candidates)""")
+            lexical_branches.append(self._lexical_branch(table_name, filter_sql, f"'{table_name}' AS source, s.id AS section_id"))
+            detail_branches.append(f"""
+                SELECT
+                    fused.*,
+                    {get_section_name_expr(table_name)} AS section_name,
+                    s.text,
+                    f.accession_number,
+                    f.date,
+                    f.type,
+                    f.company_name
+                FROM fused
+                JOIN {table_name} s ON fused.source = '{table_name}' AND s.id = fused.section_id
+                JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number""")
+
+        stmt = text(f"""
+            WITH vector_hits AS (
+                SELECT source, section_id, distance, ROW_NUMBER() OVER (ORDER BY distance) AS rnk
+                FROM ({' UNION ALL '.join(vector_branches)}) v
+                WHERE 1 - distance > :threshold
+            ),
+            lexical_hits AS (
+                SELECT source, section_id, rank, ROW_NUMBER() OVER (ORDER BY rank DESC) AS rnk
+                FROM ({' UNION ALL '.join(lexical_branches)}) l
+            ),
+            fused AS (
+                SELECT
+                    COALESCE(v.source, l.source) AS source,
+                    COALESCE(v.section_id, l.section_id) AS section_id,
+                    COALESCE(1.0 / (:rrf_k + v.rnk), 0) + COALESCE(1.0 / (:rrf_k + l.rnk), 0) AS rrf_score,
+                    1 - v.distance AS cosine_similarity,
+                    l.rank AS lexical_rank_score,
+                    v.rnk AS vector_rank,
+                    l.rnk AS lexical_rank
+                FROM vector_hits v
+                FULL OUTER JOIN lexical_hits l ON v.source = l.source AND v.section_id = l.section_id
+                ORDER BY rrf_score DESC
+                LIMIT :top_k
+            )
+            SELECT * FROM ({' UNION ALL '.join(detail_branches)}) results
+            ORDER BY rrf_score DESC
+        """)
+        params.update({
+            'query': query,
+            'embedding': query_embedding.tolist(),
+            'candidates': candidates_per_table,
+            'threshold': threshold,
+            'rrf_k': rrf_k,
+            'top_k': top_k
+        })
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"SET LOCAL ivfflat.probes = {10 if filters.is_empty() else 30}"))
+                rows = conn.execute(stmt, params).fetchall()
+            logging.info(f'Hybrid search fused {len(rows)} text sections for query: {query}')
+        except Exception as e:
+            logging.error(f"Hybrid search failed: {str(e)}")
+            return []
+
+        return [{
+            'section_id': r.section_id,
+            'text': r.text,
+            'section_name': r.section_name,
+            'accession_number': r.accession_number,
+            'filing_date': r.date,
+            'filing_type': r.type,
+            'company_name': r.company_name,
+            'score': float(r.cosine_similarity) if r.cosine_similarity is not None else 0.0,
+            'rrf_score': float(r.rrf_score),
+            'vector_rank': r.vector_rank,
+            'lexical_rank': r.lexical_rank,
+            'source': r.source
+        } for r in rows]
@@ -1,17 +1,28 @@
 import os
 import requests
 import logging
+from time import time
 from typing import List, Dict
+import numpy as np
 
 from .vector_search import VectorSearch
+from .lexical_search import LexicalSearch
+from .reranker import Reranker
 from .summarization import simple_summarize_text_section
+from .rag_cache import SemanticAnswerCache
+from .query_filters import QueryFilters
 import config.settings as settings
 
+LLM_FAILURE_ANSWER = "I couldn't process that request."
+
 class RAGService:
     def __init__(self):
         self.ollama_url = os.getenv("OLLAMA_ENDPOINT")
         self.ollama_model = os.getenv("OLLAMA_MODEL")
         self.vector_search = VectorSearch()
+        self.lexical_search = LexicalSearch()
+        self.reranker = Reranker()
+        self.answer_cache = SemanticAnswerCache()
     
     def query_ollama(self, prompt: str, context: str) -> str:
         logging.info(f'Querying ollama with prompt: {prompt}\nContext: {context}')
@@ -29,19 +40,37 @@ class RAGService:
             return response.json().get("response", "No answer generated")
         except Exception as e:
             print(f"LLM query failed: {e}")
-            return "I couldn't process that request."
+            return LLM_FAILURE_ANSWER
 
-    def rag_query(self, user_query: str) -> Dict:
-        logging.info(f'Performing RAG query using user query: {user_query}')
-        # 1. Retrieve relevant sections
-        results = []
-        for text_table, embed_table in settings.TEXT_TYPE_TABLES.items():
-            results.extend(self.vector_search.search_sections(user_query, text_table, embed_table))
-            logging.info(f'Found top text section matches for user query in {text_table}.')
-        
-        top_results = sorted(results, key=lambda x: x['score'], reverse=True)[:5]
-        
-        # 2. Generate context string
+    def retrieve(self, user_query: str, filters: QueryFilters = None, query_embedding: np.ndarray = None, top_k: int = settings.RAG_RERANK_TOP_K) -> List[Dict]:
+        '''
+        Top text sections across all section tables for the query, restricted to filings matching filters.
+        A wide candidate set comes cheaply from the ANN and full text indexes, then the cross-encoder picks the best top_k.
+        '''
+        if query_embedding is None:
+            query_embedding = self.vector_search.get_embedding(user_query)
+        # Vector and lexical candidates fused by reciprocal rank, so exact tokens (tickers, 'Item 1.05') are not lost to cosine
+        candidates = self.lexical_search.search_hybrid(
+            user_query,
+            query_embedding,
+            filters,
+            top_k=settings.RAG_CANDIDATES_PER_TABLE * len(settings.TEXT_TYPE_TABLES), # No cross table cut on raw cosine
+            candidates_per_table=settings.RAG_CANDIDATES_PER_TABLE,
+            threshold=settings.RAG_CANDIDATE_MIN_SIMILARITY
+        )
+        if not candidates: # i.e. text_search columns not migrated yet
+            candidates = self.vector_search.search_filtered(
+                query_embedding,
+                filters,
+                top_k=settings.RAG_CANDIDATES_PER_TABLE * len(settings.TEXT_TYPE_TABLES),
+                threshold=settings.RAG_CANDIDATE_MIN_SIMILARITY,
+                candidates_per_table=settings.RAG_CANDIDATES_PER_TABLE
+            )
+        top_results = self.reranker.rerank(user_query, candidates, top_k)
+        logging.info(f'Found {len(top_results)} top text section matches for user query.')
+        return top_results
+
+    def build_context(self, top_results: List[Dict]) -> str:
         context = "\n\n".join(
             f"Filer/filing company: {res['company_name']} ({res['filing_date']})\n"
             f"Filing type: {res['filing_type']}\n"
@@ -52,13 +81,41 @@ class RAGService:
             for res in top_results
         )
         logging.info(f'Built query context string: {context}')
+        return context
+
+    def _cacheable(self, filters: QueryFilters) -> bool:
+        # Cache entries are only keyed by date range, so questions narrowed by company / industry / type bypass the cache
+        # rather than risk matching a near-identical question about a different company
+        return not (filters.ciks or filters.sic_prefixes or filters.filing_types)
+
+    def rag_query(self, user_query: str, filters: QueryFilters = None) -> Dict:
+        logging.info(f'Performing RAG query using user query: {user_query}')
+        filters = filters or QueryFilters()
+        query_embedding = self.vector_search.get_embedding(user_query)
+        cacheable = self._cacheable(filters)
+
+        # 0. Serve from the semantic answer cache if a near-identical question was answered recently
+        if cacheable:
+            cached = self.answer_cache.lookup(query_embedding, filters.date_range())
+            if cached:
+                return cached
+        generation_start = time()
+
+        # 1. Retrieve relevant sections
+        top_results = self.retrieve(user_query, filters, query_embedding)
+        
+        # 2. Generate context string
+        context = self.build_context(top_results)
         
         # 3. Get LLM response
         answer = self.query_ollama(user_query, context)
         logging.info(f'Ollama answered, returning to user.')
         
-        return {
+        result = {
             "answer": answer,
             "sources": top_results,
             "context": context
-        }
\ No newline at end of file
+        }
+        if cacheable and top_results and answer != LLM_FAILURE_ANSWER:
+            self.answer_cache.store(user_query, query_embedding, result, time() - generation_start, filters.date_range())
+        return result
\ No newline at end of file
@@ -0,0 +1,110 @@
+import os
+import asyncio
+import logging
+import threading
+import httpx
+from typing import Dict
+from prefect.client import get_client
+
+import config.settings as settings
+from .cache import TTLCache
+
+class PrefectBridge:
+    '''
+    Sync facade over one long-lived async Prefect client. The client and its pooled HTTP connections live on an event loop
+    running in a background thread (one per gunicorn worker), request threads submit coroutines to it and wait on the result.
+    Flow run status reads are cached briefly, the dashboard polls them.
+    '''
+
+    def __init__(self, timeout: float = settings.PREFECT_CLIENT_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self.status_cache = TTLCache(settings.PREFECT_STATUS_CACHE_MAX_ENTRIES, settings.PREFECT_STATUS_CACHE_TTL_SECONDS)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pid = None
+        self._client = None
+        self._client_lock = None
+        self._deployment_id = None
+
+    def _ensure_loop(self):
+        # Started lazily, and again after a fork: threads don't survive into a forked gunicorn worker
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._client = None
+                self._client_lock = asyncio.Lock()
+                threading.Thread(target=self._loop.run_forever, name='prefect-bridge', daemon=True).start()
+                logging.info(f'Started Prefect client event loop thread in worker {self._pid}.')
+            return self._loop
+
+    async def _get_client(self):
+        async with self._client_lock: # Concurrent first calls would otherwise each open a client
+            if self._client is None:
+                client = get_client()
+                await client.__aenter__()
+                self._client = client
+            return self._client
+
+    async def _reset_client(self, client=None):
+        # With a client given, only reset if it is still the current one: concurrent calls failing on it reset it once
+        if client is not None and client is not self._client:
+            return
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as e:
+                logging.warning(f'Failed to close Prefect client: {str(e)}')
+
+    async def _call(self, method, *args, **kwargs):
+        client = await self._get_client()
+        try:
+            return await getattr(client, method)(*args, **kwargs)
+        except (httpx.TransportError, RuntimeError):
+            # A broken client (server restart, closed transport) is replaced on the next call. Other errors, i.e. ObjectNotFound for
+            # an unknown flow run id, leave the client shared with the other request threads alone
+            await self._reset_client(client)
+            raise
+
+    def call(self, method: str, *args, **kwargs):
+        '''Runs client.<method>(*args, **kwargs) on the bridge's loop, blocking until done.'''
+        future = asyncio.run_coroutine_threadsafe(self._call(method, *args, **kwargs), self._ensure_loop())
+        return future.result(self.timeout)
+
+    def trigger_flow_run(self, parameters: Dict) -> str:
+        '''Creates a run of the daily pipeline deployment. Returns the flow run id.'''
+        if self._deployment_id is None:
+            deployment = self.call('read_deployment_by_name', name=f"{settings.PREFECT_FLOW_NAME}/daily-sec-pipeline")
+            self._deployment_id = deployment.id
+        try:
+            flow_run = self.call('create_flow_run_from_deployment', deployment_id=self._deployment_id, parameters=parameters)
+        except Exception:
+            self._deployment_id = None # Deployment may have been recreated, look it up again next time
+            raise
+        return str(flow_run.id)
+
+    def get_flow_run_status(self, flow_run_id: str) -> Dict:
+        return self.status_cache.get_or_compute(flow_run_id, lambda: self._read_flow_run_status(flow_run_id))
+
+    def _read_flow_run_status(self, flow_run_id):
+        flow_run = self.call('read_flow_run', flow_run_id)
+        return {
+            "status": flow_run.state.name,
+            "created": str(flow_run.created),
+            "start_time": str(flow_run.start_time),
+            "end_time": str(flow_run.end_time),
+            "parameters": flow_run.parameters,
+        }
+
+    def close(self):
+        with self._lock:
+            loop, pid = self._loop, self._pid
+            self._loop = None
+        if loop is None or pid != os.getpid():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._reset_client(), loop).result(5)
+        except Exception as e:
+            logging.warning(f'Failed to shut down Prefect client: {str(e)}')
+        loop.call_soon_threadsafe(loop.stop)
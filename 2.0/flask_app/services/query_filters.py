@@ -0,0 +1,159 @@
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from dateutil.relativedelta import relativedelta
+
+import config.settings as settings
+
+'''
+Rule based extraction of structured filing_info filters (CIK, SIC prefix, filing type, date range) from natural language questions.
+The filters are pushed into SQL WHERE clauses against filing_info, both for aggregate queries and for filtered vector search.
+'''
+
+# Longest first so i.e. '13f-hr' wins over a shorter overlapping type
+_FILING_TYPE_PATTERN = re.compile(
+    r'(?<![\w-])(' + '|'.join(re.escape(t).replace(r'\ ', r'\s+') for t in sorted(settings.TARGET_FILING_TYPES, key=len, reverse=True)) + r')(/a)?s?(?![\w-])',
+    re.IGNORECASE
+)
+_CIK_PATTERN = re.compile(r'\bcik\s*(?:#|:|number)?\s*(\d{1,10})\b', re.IGNORECASE)
+_SIC_PATTERN = re.compile(r'\bsic(?:\s+(?:code|group|division))?\s*(?:#|:)?\s*(\d{2,4})\b', re.IGNORECASE)
+_ISO_DATE_PATTERN = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')
+_QUARTER_PATTERN = re.compile(r'\bq([1-4])\s*(\d{4})\b', re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r'\b(?:in|during|for)\s+((?:19|20)\d{2})\b', re.IGNORECASE)
+_RELATIVE_PATTERN = re.compile(r'\b(today|yesterday|this|last|past|previous)\s*(day|week|month|quarter|year)?\b', re.IGNORECASE)
+_PAST_N_PATTERN = re.compile(r'\b(?:past|last)\s+(\d+)\s+(day|week|month)s\b', re.IGNORECASE)
+
+@dataclass
+class QueryFilters:
+    ciks: List[str] = field(default_factory=list)
+    sic_prefixes: List[str] = field(default_factory=list)
+    filing_types: List[str] = field(default_factory=list)
+    start_date: Optional[date] = None # Inclusive
+    end_date: Optional[date] = None # Exclusive
+
+    def is_empty(self) -> bool:
+        return not (self.ciks or self.sic_prefixes or self.filing_types or self.start_date or self.end_date)
+
+    def date_range(self) -> Tuple[Optional[date], Optional[date]]:
+        '''Inclusive (start, end) date bounds, as used by the semantic answer cache.'''
+        return self.start_date, (self.end_date - timedelta(days=1)) if self.end_date else None
+
+    def to_sql(self, alias: str = 'f') -> Tuple[str, Dict]:
+        '''
+        Returns a SQL boolean expression over filing_info (aliased as alias) and its bind parameters.
+        Always returns a valid expression ('TRUE' when there are no filters) so callers can AND it in unconditionally.
+        '''
+        clauses = []
+        params = {}
+        if self.ciks:
+            clauses.append(f'{alias}.cik = ANY(:filter_ciks)')
+            params['filter_ciks'] = self.ciks
+        if self.sic_prefixes:
+            # Prefixes of length 2/3/4 map onto the split SIC columns, which keeps the predicates index friendly
+            prefix_clauses = []
+            for i, prefix in enumerate(self.sic_prefixes):
+                column = {2: 'sic_mjr_group_code', 3: 'sic_ind_group_code'}.get(len(prefix), 'whole_sic_code')
+                prefix_clauses.append(f'{alias}.{column} = :filter_sic_{i}')
+                params[f'filter_sic_{i}'] = prefix
+            clauses.append('(' + ' OR '.join(prefix_clauses) + ')')
+        if self.filing_types:
+            clauses.append(f'{alias}.type = ANY(:filter_types)')
+            params['filter_types'] = self.filing_types
+        if self.start_date:
+            clauses.append(f'{alias}.date >= :filter_start')
+            params['filter_start'] = self.start_date
+        if self.end_date:
+            clauses.append(f'{alias}.date < :filter_end')
+            params['filter_end'] = self.end_date
+
+        return (' AND '.join(clauses) if clauses else 'TRUE'), params
+
+    def describe(self) -> Dict:
+        return {
+            'ciks': self.ciks,
+            'sic_prefixes': self.sic_prefixes,
+            'filing_types': self.filing_types,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None
+        }
+
+def _period_bounds(period, anchor):
+    '''[start, end) of the day/week/month/quarter/year containing anchor.'''
+    if period == 'day':
+        return anchor, anchor + timedelta(days=1)
+    elif period == 'week':
+        start = anchor - timedelta(days=anchor.weekday())
+        return start, start + timedelta(weeks=1)
+    elif period == 'month':
+        start = anchor.replace(day=1)
+        return start, start + relativedelta(months=1)
+    elif period == 'quarter':
+        start = date(anchor.year, 3 * ((anchor.month - 1) // 3) + 1, 1)
+        return start, start + relativedelta(months=3)
+    else:
+        start = date(anchor.year, 1, 1)
+        return start, date(anchor.year + 1, 1, 1)
+
+def _extract_date_range(query, today):
+    iso_dates = sorted(date.fromisoformat(d) for d in _ISO_DATE_PATTERN.findall(query))
+    if len(iso_dates) >= 2:
+        return iso_dates[0], iso_dates[-1] + timedelta(days=1)
+    if len(iso_dates) == 1:
+        if re.search(r'\b(since|after|from)\b', query, re.IGNORECASE):
+            return iso_dates[0], None
+        return iso_dates[0], iso_dates[0] + timedelta(days=1)
+
+    match = _QUARTER_PATTERN.search(query)
+    if match:
+        return _period_bounds('quarter', date(int(match.group(2)), 3 * int(match.group(1)) - 2, 1))
+
+    match = _PAST_N_PATTERN.search(query)
+    if match:
+        n, unit = int(match.group(1)), match.group(2).lower()
+        delta = {'day': relativedelta(days=n), 'week': relativedelta(weeks=n), 'month': relativedelta(months=n)}[unit]
+        return today + timedelta(days=1) - delta, today + timedelta(days=1)
+
+    for match in _RELATIVE_PATTERN.finditer(query):
+        word, period = match.group(1).lower(), (match.group(2) or '').lower()
+        if word == 'today':
+            return _period_bounds('day', today)
+        if word == 'yesterday':
+            return _period_bounds('day', today - timedelta(days=1))
+        if not period:
+            continue # i.e. 'this company'
+        step = {'day': relativedelta(days=1), 'week': relativedelta(weeks=1), 'month': relativedelta(months=1),
+                'quarter': relativedelta(months=3), 'year': relativedelta(years=1)}[period]
+        if word == 'this':
+            return _period_bounds(period, today)
+        if word == 'past':
+            # Rolling window ending today, i.e. 'past week' -> last 7 days
+            return today + timedelta(days=1) - step, today + timedelta(days=1)
+        # last / previous -> the full period before the current one
+        return _period_bounds(period, today - step)
+
+    match = _YEAR_PATTERN.search(query)
+    if match:
+        return _period_bounds('year', date(int(match.group(1)), 1, 1))
+
+    return None, None
+
+def extract_query_filters(query: str, today: Optional[date] = None) -> QueryFilters:
+    '''
+    Extracts CIK, SIC prefix, filing type and date range filters from a natural language question.
+    '''
+    today = today or date.today()
+    filters = QueryFilters()
+
+    filters.ciks = [cik.zfill(10) for cik in _CIK_PATTERN.findall(query)]
+    filters.sic_prefixes = list(dict.fromkeys(_SIC_PATTERN.findall(query)))
+
+    for match in _FILING_TYPE_PATTERN.finditer(query):
+        filing_type = re.sub(r'\s+', ' ', match.group(1)).upper()
+        if match.group(2):
+            filing_type += '/A'
+        if filing_type not in filters.filing_types:
+            filters.filing_types.append(filing_type)
+
+    filters.start_date, filters.end_date = _extract_date_range(query, today)
+    return filters
@@ -0,0 +1,153 @@
+import json
+import logging
+import threading
+from datetime import date
+from typing import Dict, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+
+import config.settings as settings
+from conn.db_engine import engine
+
+class SemanticAnswerCache:
+    '''
+    Semantic cache of previous RAG answers, stored in Postgres so it is shared across gunicorn workers.
+    A question is answered from the cache when a previously answered question embeds within the similarity threshold,
+    the entry is younger than the freshness window, and it was built over the same filing date range.
+    The ingestion flow deletes entries whose date range overlaps newly ingested filings (see ingest_logic.invalidate_rag_answer_cache).
+    '''
+
+    def __init__(self, similarity_threshold: float = settings.RAG_CACHE_SIMILARITY_THRESHOLD, max_age_hours: int = settings.RAG_CACHE_MAX_AGE_HOURS):
+        self.similarity_threshold = similarity_threshold
+        self.max_age_hours = max_age_hours
+
+        # Per-worker counters, see stats()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_llm_seconds = 0.0
+
+    def lookup(self, query_embedding: np.ndarray, date_range: Tuple[Optional[date], Optional[date]] = (None, None)) -> Optional[Dict]:
+        '''
+        Returns the cached RAG result for the most similar previous question, or None on a cache miss.
+        '''
+        start, end = date_range
+        try:
+            with engine.begin() as conn:
+                row = conn.execute(text(f'''
+                    SELECT
+                        id,
+                        query_text,
+                        answer,
+                        sources,
+                        context,
+                        llm_seconds,
+                        1 - (query_embedding <=> CAST(:embedding AS vector)) AS cosine_similarity
+                    FROM {settings.RAG_ANSWER_CACHE_TABLE}
+                    WHERE created_at > now() - make_interval(hours => :max_age_hours)
+                    AND date_range_start IS NOT DISTINCT FROM :start
+                    AND date_range_end IS NOT DISTINCT FROM :end
+                    ORDER BY query_embedding <=> CAST(:embedding AS vector)
+                    LIMIT 1
+                '''), {
+                    'embedding': query_embedding.tolist(),
+                    'max_age_hours': self.max_age_hours,
+                    'start': start,
+                    'end': end
+                }).fetchone()
+
+                if row is None or float(row.cosine_similarity) < self.similarity_threshold:
+                    self._record_miss()
+                    return None
+
+                conn.execute(text(f'''
+                    UPDATE {settings.RAG_ANSWER_CACHE_TABLE}
+                    SET hit_count = hit_count + 1, last_hit_at = now()
+                    WHERE id = :id
+                '''), {'id': row.id})
+
+        except Exception as e:
+            logging.error(f'RAG answer cache lookup failed, treating as a miss: {e}')
+            self._record_miss()
+            return None
+
+        self._record_hit(row.llm_seconds or 0.0)
+        logging.info(f'RAG answer cache hit (similarity {float(row.cosine_similarity):.3f}) on previous question: {row.query_text}')
+        return {
+            'answer': row.answer,
+            'sources': row.sources,
+            'context': row.context,
+            'cached': True,
+            'cached_query': row.query_text
+        }
+
+    def store(self, user_query: str, query_embedding: np.ndarray, result: Dict, llm_seconds: float, date_range: Tuple[Optional[date], Optional[date]] = (None, None)):
+        '''
+        Saves a freshly generated RAG result.
+        '''
+        start, end = date_range
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f'''
+                    INSERT INTO {settings.RAG_ANSWER_CACHE_TABLE}
+                    (query_text, query_embedding, answer, sources, context, date_range_start, date_range_end, llm_seconds, hit_count, embedding_model)
+                    VALUES (:query_text, CAST(:embedding AS vector), :answer, CAST(:sources AS json), :context, :start, :end, :llm_seconds, 0, :embedding_model)
+                '''), {
+                    'query_text': user_query,
+                    'embedding': query_embedding.tolist(),
+                    'answer': result.get('answer'),
+                    'sources': json.dumps(result.get('sources', []), default=str), # Filing dates -> ISO strings
+                    'context': result.get('context'),
+                    'start': start,
+                    'end': end,
+                    'llm_seconds': llm_seconds,
+                    'embedding_model': settings.DEFAULT_EMBEDDING_MODEL
+                })
+            logging.info(f'Stored RAG answer in cache. Generation took {llm_seconds:.1f}s.')
+        except Exception as e:
+            logging.error(f'Failed to store RAG answer in cache: {e}')
+
+    def _record_hit(self, llm_seconds):
+        with self._lock:
+            self.hits += 1
+            self.saved_llm_seconds += llm_seconds
+
+    def _record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> Dict:
+        '''
+        Hit rate and saved LLM time, both for this worker and across all workers (from the hit counts persisted on each entry).
+        '''
+        with self._lock:
+            lookups = self.hits + self.misses
+            worker_stats = {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'saved_llm_seconds': round(self.saved_llm_seconds, 1)
+            }
+
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text(f'''
+                    SELECT
+                        COUNT(*) AS entries,
+                        COALESCE(SUM(hit_count), 0) AS hits,
+                        COALESCE(SUM(hit_count * llm_seconds), 0) AS saved_llm_seconds
+                    FROM {settings.RAG_ANSWER_CACHE_TABLE}
+                ''')).fetchone()
+            all_workers_stats = {
+                'entries': row.entries,
+                'hits': row.hits,
+                'saved_llm_seconds': round(float(row.saved_llm_seconds), 1)
+            }
+        except Exception as e:
+            logging.error(f'Failed to read RAG answer cache stats: {e}')
+            all_workers_stats = {}
+
+        return {
+            'worker': worker_stats,
+            'all_workers': all_workers_stats
+        }
@@ -0,0 +1,36 @@
+from contextlib import contextmanager
+from flask import g, has_request_context
+
+from conn.db_engine import engine
+
+'''
+One pooled connection per request, shared by every query the request runs (one checkout instead of one per query).
+Outside a request, i.e. in the flow or a shell, each use gets its own connection as before.
+Connections can't be shared across threads, code fanning out to a thread pool (the RAG agent) keeps using engine directly.
+'''
+
+@contextmanager
+def request_connection():
+    if not has_request_context():
+        with engine.connect() as conn:
+            yield conn
+        return
+
+    conn = g.get('db_connection')
+    if conn is None:
+        conn = g.db_connection = engine.connect()
+    try:
+        yield conn
+    except Exception:
+        # A failed statement aborts the transaction, reset it for the request's later queries
+        conn.rollback()
+        raise
+
+def close_request_connection(exception=None):
+    '''Returns the request's connection to the pool, registered as an app teardown.'''
+    conn = g.pop('db_connection', None)
+    if conn is not None:
+        conn.close()
+
+def init_app(app):
+    app.teardown_appcontext(close_request_connection)
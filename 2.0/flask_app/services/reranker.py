@@ -0,0 +1,87 @@
+import re
+import logging
+import hashlib
+from typing import List, Dict
+from sentence_transformers import CrossEncoder
+
+import config.settings as settings
+
+_WORD_PATTERN = re.compile(r'[a-z]+')
+
+def _shingles(text: str, size: int = 5) -> set:
+    # Letters only, so boilerplate differing only in dates / amounts / share counts still collides
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return {' '.join(words)}
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class Reranker:
+    '''
+    Second retrieval stage. Takes the ANN candidate set, drops duplicate chunks, scores every (query, chunk) pair with a small
+    CPU cross-encoder in one batched call and keeps the best few. Cosine scores from different section tables are not comparable,
+    the cross-encoder scores are.
+    '''
+
+    def __init__(self, model_name: str = settings.DEFAULT_RERANKER_MODEL, max_chars: int = 2000):
+        self.model_name = model_name
+        self.max_chars = max_chars # The model truncates at 512 tokens anyway, no point tokenizing whole sections
+        self.model = None
+        self._initialize()
+
+    def _initialize(self):
+        try:
+            self.model = CrossEncoder(self.model_name, max_length=512)
+            logging.info("Cross-encoder re-ranker initialized successfully")
+        except Exception as e:
+            # Retrieval still works without it, keeping the retrieval stage's ordering
+            logging.error(f"Re-ranker initialization failed, falling back to retrieval ordering: {str(e)}")
+
+    def _drop_exact_duplicates(self, candidates: List[Dict]) -> List[Dict]:
+        seen = set()
+        unique = []
+        for candidate in candidates:
+            digest = hashlib.md5(' '.join(candidate['text'].split()).lower().encode()).hexdigest()
+            if digest not in seen:
+                seen.add(digest)
+                unique.append(candidate)
+        return unique
+
+    def rerank(self, query: str, candidates: List[Dict], top_k: int = settings.RAG_RERANK_TOP_K,
+               dedup_threshold: float = settings.RAG_DEDUP_JACCARD_THRESHOLD) -> List[Dict]:
+        '''
+        Returns up to top_k candidates ordered by cross-encoder score (rerank_score), with near-duplicates removed.
+        '''
+        candidates = self._drop_exact_duplicates([c for c in candidates if c.get('text')])
+        if not candidates:
+            return []
+
+        if self.model is not None:
+            try:
+                scores = self.model.predict([(query, c['text'][:self.max_chars]) for c in candidates], batch_size=len(candidates))
+                for candidate, score in zip(candidates, scores):
+                    candidate['rerank_score'] = float(score)
+                ranked = sorted(candidates, key=lambda c: c['rerank_score'], reverse=True)
+            except Exception as e:
+                logging.error(f"Re-ranking failed, falling back to retrieval ordering: {str(e)}")
+                ranked = candidates
+        else:
+            ranked = candidates # Already ordered by the retrieval stage
+
+        # Greedy near-duplicate removal in rank order, i.e. the same forward-looking statements disclaimer filed by several companies
+        kept, kept_shingles = [], []
+        for candidate in ranked:
+            shingles = _shingles(candidate['text'][:self.max_chars])
+            if any(_jaccard(shingles, other) >= dedup_threshold for other in kept_shingles):
+                continue
+            kept.append(candidate)
+            kept_shingles.append(shingles)
+            if len(kept) == top_k:
+                break
+
+        logging.info(f'Re-ranked {len(candidates)} unique candidates down to {len(kept)} text sections.')
+        return kept
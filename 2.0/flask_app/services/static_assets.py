@@ -0,0 +1,41 @@
+import os
+import hashlib
+from flask import request
+
+import config.settings as settings
+
+'''
+Static asset fingerprinting. url_for('static', ...) gets a ?v=<content hash> argument, so a changed file gets a new URL,
+and those URLs can be cached by browsers for settings.STATIC_MAX_AGE_SECONDS without going stale.
+'''
+
+_fingerprints = {} # (path, mtime) -> hash, a file is only hashed again after it changes
+
+def _fingerprint(app, filename):
+    path = os.path.join(app.static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None # Let the static route 404 as usual
+    key = (path, mtime)
+    if key not in _fingerprints:
+        with open(path, 'rb') as f:
+            _fingerprints[key] = hashlib.md5(f.read()).hexdigest()[:12]
+    return _fingerprints[key]
+
+def init_app(app):
+    @app.url_defaults
+    def add_static_fingerprint(endpoint, values):
+        if endpoint == 'static' and 'filename' in values and 'v' not in values:
+            fingerprint = _fingerprint(app, values['filename'])
+            if fingerprint:
+                values['v'] = fingerprint
+
+    @app.after_request
+    def mark_static_immutable(response):
+        if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+            response.cache_control.public = True
+            response.cache_control.no_cache = None
+            response.cache_control.max_age = settings.STATIC_MAX_AGE_SECONDS
+            response.cache_control.immutable = True
+        return response
@@ -0,0 +1,211 @@
+from datetime import date, timedelta
+from typing import Dict, Optional
+from sqlalchemy import text
+
+import config.settings as settings
+from .cache import TTLCache
+from .request_db import request_connection
+from .industry_service import sic_filters, type_filter
+from .sic_hierarchy import SIC_MAJOR_GROUPS
+
+'''
+Time series and top movers over the filing count rollups. Period over period comparisons are done in SQL with window
+functions (LAG / running SUM / RANK), so only the finished series or the top N rows leave the database.
+'''
+
+GRANULARITIES = {'day': '1 day', 'week': '1 week', 'month': '1 month', 'quarter': '3 months', 'year': '1 year'}
+_APPROX_DAYS = {'day': 1, 'week': 7, 'month': 30, 'quarter': 91, 'year': 365}
+
+# Dimension -> (key expression, label aggregate) over the rollup alias r
+DIMENSIONS = {
+    'total': ("'total'", "CAST(NULL AS text)"),
+    'type': ("r.type", "CAST(NULL AS text)"),
+    'major_group': ("NULLIF(LEFT(r.whole_sic_code, 2), '')", "CAST(NULL AS text)"),
+    'industry': ("NULLIF(r.whole_sic_code, '')", "MAX(r.sic_desc)"),
+    'company': ("r.cik", "MAX(r.company_name)")
+}
+
+def _validate(granularity=None, dimension=None):
+    if granularity is not None and granularity not in GRANULARITIES:
+        raise ValueError(f'Invalid granularity: {granularity}. Must be one of: {", ".join(GRANULARITIES)}.')
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise ValueError(f'Invalid dimension: {dimension}. Must be one of: {", ".join(DIMENSIONS)}.')
+
+def _source_table(dimension, level):
+    # daily_type_counts is a few rows per day, usable whenever no SIC / company detail is needed
+    if level == 'all' and dimension in ('total', 'type'):
+        return settings.DAILY_TYPE_COUNTS_TABLE
+    return settings.DAILY_FILER_COUNTS_TABLE
+
+def _label(dimension, key, label):
+    if dimension == 'major_group' and key:
+        return SIC_MAJOR_GROUPS.get(key)
+    return label
+
+class TrendsService:
+    def __init__(self, data_version=None):
+        # Cached per worker on the filings data version, like the dashboard summaries
+        self.data_version = data_version
+        self.cache = TTLCache(settings.SUMMARY_CACHE_MAX_ENTRIES, settings.SUMMARY_CACHE_TTL_SECONDS)
+
+    def _cached(self, key, compute):
+        version = self.data_version.current() if self.data_version else None
+        return self.cache.get_or_compute(key + (version,) if version is not None else None, compute)
+
+    def get_time_series(self, start: date, end: date, granularity: str = 'month', dimension: str = 'total',
+                        filing_type: str = 'all', level: str = 'all', code: Optional[str] = None,
+                        max_series: int = 10) -> Dict:
+        '''
+        Filing counts per granularity period in [start, end) for the max_series largest keys of dimension (type,
+        industry, ...), optionally within one SIC level. Periods without filings are zero filled. Each point carries the
+        change from the previous period, the running total and the key's share of all filings in the period.
+        '''
+        _validate(granularity, dimension)
+        sic_filters(level, code) # Validates before anything is cached
+        if end <= start:
+            raise ValueError('end must be after start.')
+        if (end - start).days / _APPROX_DAYS[granularity] > settings.TRENDS_MAX_PERIODS:
+            raise ValueError(f'Too many {granularity} periods between {start} and {end}, max {settings.TRENDS_MAX_PERIODS}.')
+
+        key = ('series', start, end, granularity, dimension, filing_type, level, code, max_series)
+        return self._cached(key, lambda: self._query_time_series(start, end, granularity, dimension, filing_type, level, code, max_series))
+
+    def _query_time_series(self, start, end, granularity, dimension, filing_type, level, code, max_series):
+        _, rollup_sic, params = sic_filters(level, code)
+        key_expr, label_expr = DIMENSIONS[dimension]
+        params.update({
+            'start': start,
+            'end': end,
+            'granularity': granularity,
+            'step': GRANULARITIES[granularity],
+            'filing_type': filing_type,
+            'max_series': max_series
+        })
+
+        with request_connection() as conn:
+            rows = conn.execute(text(f'''
+                WITH counts AS (
+                    SELECT date_trunc(:granularity, r.date)::date AS period, {key_expr} AS key, {label_expr} AS label, SUM(r.count) AS count
+                    FROM {_source_table(dimension, level)} r
+                    WHERE {rollup_sic}
+                    AND r.date >= date_trunc(:granularity, CAST(:start AS timestamp)) AND r.date < :end
+                    {type_filter('r', filing_type)}
+                    GROUP BY 1, 2
+                ),
+                top_keys AS (
+                    SELECT key, MAX(label) AS label, ROW_NUMBER() OVER (ORDER BY SUM(count) DESC, key) AS rank
+                    FROM counts
+                    GROUP BY key
+                    ORDER BY rank
+                    LIMIT :max_series
+                ),
+                period_totals AS (
+                    SELECT period, SUM(count) AS total FROM counts GROUP BY period
+                ),
+                periods AS (
+                    SELECT generate_series(
+                        date_trunc(:granularity, CAST(:start AS timestamp)),
+                        CAST(:end AS timestamp) - interval '1 day',
+                        CAST(:step AS interval)
+                    )::date AS period
+                ),
+                filled AS (
+                    SELECT p.period, k.key, k.label, k.rank, COALESCE(c.count, 0) AS count, COALESCE(t.total, 0) AS period_total
+                    FROM periods p
+                    CROSS JOIN top_keys k
+                    LEFT JOIN counts c ON c.period = p.period AND c.key IS NOT DISTINCT FROM k.key
+                    LEFT JOIN period_totals t ON t.period = p.period
+                )
+                SELECT
+                    period,
+                    key,
+                    label,
+                    count,
+                    count - LAG(count) OVER by_key AS change,
+                    SUM(count) OVER by_key AS cumulative,
+                    count::float / NULLIF(period_total, 0) AS share
+                FROM filled
+                WINDOW by_key AS (PARTITION BY key ORDER BY period)
+                ORDER BY rank, period
+            '''), params).fetchall()
+
+        series, labels = {}, {}
+        for row in rows:
+            labels[row.key] = row.label
+            series.setdefault(row.key, []).append({
+                'period': row.period.isoformat(),
+                'count': int(row.count),
+                'change': int(row.change) if row.change is not None else None,
+                'cumulative': int(row.cumulative),
+                'share': round(row.share, 4) if row.share is not None else None
+            })
+
+        return {
+            'granularity': granularity,
+            'dimension': dimension,
+            'series': [{'key': k, 'label': _label(dimension, k, labels[k]), 'points': points} for k, points in series.items()]
+        }
+
+    def get_top_movers(self, start: date, end: date, prior_start: date, dimension: str = 'company', filing_type: str = 'all',
+                       level: str = 'all', code: Optional[str] = None, limit: int = 10) -> Dict:
+        '''
+        Keys of dimension with the largest increase and decrease in filings in [start, end) compared with the prior period
+        [prior_start, start). Both periods come from one scan of the rollup, ranked in SQL.
+        '''
+        _validate(dimension=dimension)
+        sic_filters(level, code)
+        if dimension == 'total':
+            raise ValueError('Top movers need a dimension other than total.')
+
+        key = ('movers', start, end, prior_start, dimension, filing_type, level, code, limit)
+        return self._cached(key, lambda: self._query_top_movers(start, end, prior_start, dimension, filing_type, level, code, limit))
+
+    def _query_top_movers(self, start, end, prior_start, dimension, filing_type, level, code, limit):
+        _, rollup_sic, params = sic_filters(level, code)
+        key_expr, label_expr = DIMENSIONS[dimension]
+        params.update({'start': start, 'end': end, 'prior_start': prior_start, 'filing_type': filing_type, 'limit': limit})
+
+        with request_connection() as conn:
+            rows = conn.execute(text(f'''
+                WITH changes AS (
+                    SELECT
+                        {key_expr} AS key,
+                        {label_expr} AS label,
+                        COALESCE(SUM(r.count) FILTER (WHERE r.date >= :start), 0) AS current_count,
+                        COALESCE(SUM(r.count) FILTER (WHERE r.date < :start), 0) AS prior_count
+                    FROM {_source_table(dimension, level)} r
+                    WHERE {rollup_sic} AND r.date >= :prior_start AND r.date < :end
+                    {type_filter('r', filing_type)}
+                    GROUP BY 1
+                ),
+                ranked AS (
+                    SELECT
+                        *,
+                        current_count - prior_count AS change,
+                        (current_count - prior_count)::float / NULLIF(prior_count, 0) AS pct_change,
+                        RANK() OVER (ORDER BY current_count - prior_count DESC) AS gain_rank,
+                        RANK() OVER (ORDER BY current_count - prior_count ASC) AS loss_rank
+                    FROM changes
+                )
+                SELECT * FROM ranked
+                WHERE (gain_rank <= :limit AND change > 0) OR (loss_rank <= :limit AND change < 0)
+                ORDER BY change DESC, key
+            '''), params).fetchall()
+
+        def mover(row):
+            return {
+                'key': row.key,
+                'label': _label(dimension, row.key, row.label),
+                'current_count': int(row.current_count),
+                'prior_count': int(row.prior_count),
+                'change': int(row.change),
+                'pct_change': round(row.pct_change, 4) if row.pct_change is not None else None # None when new this period
+            }
+
+        return {
+            'dimension': dimension,
+            'current_period': {'start': start.isoformat(), 'end': (end - timedelta(days=1)).isoformat()},
+            'prior_period': {'start': prior_start.isoformat(), 'end': (start - timedelta(days=1)).isoformat()},
+            'gainers': [mover(r) for r in rows if r.change > 0],
+            'losers': [mover(r) for r in reversed(rows) if r.change < 0]
+        }
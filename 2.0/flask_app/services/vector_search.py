@@ -1,11 +1,24 @@
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 from sentence_transformers import SentenceTransformer
 import numpy as np
 from sqlalchemy import text
 
 import config.settings as settings
 from conn.db_engine import engine  
+from .query_filters import QueryFilters
+
+def get_section_name_expr(table_name):
+    if table_name == 'exhibits':
+        return """
+        CASE 
+            WHEN s.exhibit_meaning IS NOT NULL 
+                THEN s.exhibit_type || ' – ' || s.exhibit_meaning
+            ELSE s.exhibit_type
+        END
+        """
+    else:
+        return "s.section_name"
 
 class VectorSearch:
     def __init__(self, model_name: str = settings.DEFAULT_EMBEDDING_MODEL):
@@ -25,21 +38,13 @@ class VectorSearch:
         return self.model.encode(text)
 
     def _get_section_name_expr(self, table_name):
-        if table_name == 'exhibits':
-            return """
-            CASE 
-                WHEN s.exhibit_meaning IS NOT NULL 
-                    THEN s.exhibit_type || ' – ' || s.exhibit_meaning
-                ELSE s.exhibit_type
-            END
-            """
-        else:
-            return "s.section_name"
-
-    def search_sections(self, query: str, table_name: str, embed_table_name: str, top_k: int = 5, threshold: float = 0.25) -> List[Dict]: # TESTING lowering threshhold from 0.5
+        return get_section_name_expr(table_name)
+
+    def search_sections(self, query: str, table_name: str, embed_table_name: str, top_k: int = 5, threshold: float = 0.25, query_embedding: np.ndarray = None) -> List[Dict]: # TESTING lowering threshhold from 0.5
         try:
             logging.info(f'Searching {table_name} for text sections most relevant to query: {query}\nMinimum similarity threshold: {threshold}.')
-            query_embedding = self.get_embedding(query)
+            if query_embedding is None: # Callers searching several tables can embed the query once and pass it in
+                query_embedding = self.get_embedding(query)
             section_name_expr = self._get_section_name_expr(table_name)
 
             with engine.connect() as conn:
@@ -89,3 +94,69 @@ class VectorSearch:
             logging.error(f"Search failed: {str(e)}")
             return []
 
+    def search_filtered(self, query_embedding: np.ndarray, filters: Optional[QueryFilters] = None, top_k: int = 5, threshold: float = 0.25, candidates_per_table: int = None) -> List[Dict]:
+        '''
+        Single round trip ANN search over every section/embedding table pair in settings.TEXT_TYPE_TABLES, with the filing_info filters
+        (CIK, SIC prefix, type, date range) pushed into each branch's WHERE clause. Each branch keeps its own nearest candidates and the
+        union is re-ranked, so the result matches running search_sections per table and merging, minus three round trips.
+        '''
+        filters = filters or QueryFilters()
+        filter_sql, params = filters.to_sql('f')
+        candidates_per_table = candidates_per_table or top_k
+
+        branches = []
+        for table_name, embed_table_name in settings.TEXT_TYPE_TABLES.items():
+            branches.append(f"""
+                (SELECT
+                    e.section_id,
+                    {self._get_section_name_expr(table_name)} AS section_name,
+                    s.text,
+                    f.accession_number,
+                    f.date,
+                    f.type,
+                    f.company_name,
+                    '{table_name}' AS source,
+                    e.embedding <=> CAST(:embedding AS vector) AS distance
+                FROM {embed_table_name} e
+                JOIN {table_name} s ON e.section_id = s.id
+                JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+                WHERE {filter_sql}
+                ORDER BY distance
+                LIMIT :candidates)""")
+
+        stmt = text(f"""
+            SELECT * FROM ({' UNION ALL '.join(branches)}) candidates
+            WHERE 1 - distance > :threshold
+            ORDER BY distance
+            LIMIT :top_k
+        """)
+        params.update({
+            'embedding': query_embedding.tolist(),
+            'candidates': candidates_per_table,
+            'threshold': threshold,
+            'top_k': top_k
+        })
+
+        try:
+            with engine.begin() as conn:
+                # SET LOCAL so the setting dies with the transaction instead of sticking to the pooled connection.
+                # Filters are applied after the ivfflat scan, so probe more lists when filtering to keep recall up
+                conn.execute(text(f"SET LOCAL ivfflat.probes = {10 if filters.is_empty() else 30}"))
+                rows = conn.execute(stmt, params).fetchall()
+            logging.info(f'Filtered vector search found {len(rows)} text sections. Filters: {filters.describe()}')
+
+        except Exception as e:
+            logging.error(f"Filtered search failed: {str(e)}")
+            return []
+
+        return [{
+            'section_id': r.section_id,
+            'text': r.text,
+            'section_name': r.section_name,
+            'accession_number': r.accession_number,
+            'filing_date': r.date,
+            'filing_type': r.type,
+            'company_name': r.company_name,
+            'score': 1 - float(r.distance),
+            'source': r.source
+        } for r in rows]
@@ -660,4 +660,75 @@ function debugAccordion() {
             iconExpanded: icon ? icon.classList.contains('expanded') : 'N/A'
         });
     });
-}
\ No newline at end of file
+}
+
+// Industry explorer: major groups render their busiest industries only, this replaces them with the group's full list
+function loadAllIndustries(majorCode, filterQuery) {
+    const content = document.getElementById('major-content-' + majorCode);
+    if (!content) {
+        console.error('Major group content not found for code:', majorCode);
+        return;
+    }
+
+    fetch(`/industry-analysis/api/major-group/${majorCode}/industries?${filterQuery}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            content.innerHTML = '';
+            data.industries.forEach(industry => {
+                const sicCode = industry.whole_sic_code || 'Unknown';
+                const item = document.createElement('div');
+                item.className = 'industry-item';
+                item.dataset.searchText = `${sicCode} ${industry.sic_desc || ''}`;
+                item.innerHTML = `
+                    <div class="industry-content">
+                        <div class="industry-link">
+                            <div class="industry-info">
+                                <span class="sic-code"></span>
+                                <span class="industry-desc"></span>
+                            </div>
+                            <div class="industry-count">${industry.count} filings</div>
+                        </div>
+                        <div class="industry-actions">
+                            <button class="analyze-btn industry-analyze" title="Analyze Industry ${sicCode}">
+                                <span class="analyze-icon">📊</span>
+                                Analyze
+                            </button>
+                        </div>
+                    </div>`;
+                item.querySelector('.sic-code').textContent = sicCode;
+                item.querySelector('.industry-desc').textContent = industry.sic_desc || '';
+                item.querySelector('.analyze-btn').addEventListener('click', () => navigateToIndustryAnalysis('industry', sicCode, industry.sic_desc));
+                content.appendChild(item);
+            });
+        })
+        .catch(error => console.error(`Failed to load industries of major group ${majorCode}:`, error));
+}
+
+// Most active filers: appends the next page of companies, the button carries the cursor of the last row shown
+function loadMoreCompanies(button, filterQuery) {
+    const params = new URLSearchParams(filterQuery);
+    params.set('cursor', button.dataset.cursor);
+
+    fetch(`/api/companies?${params.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.error) throw new Error(data.error);
+            const tbody = document.getElementById('companiesTableBody');
+            data.companies.forEach(company => {
+                const tr = document.createElement('tr');
+                [company.company_name, company.cik, company.count].forEach(value => {
+                    const td = document.createElement('td');
+                    td.textContent = value ?? '';
+                    tr.appendChild(td);
+                });
+                tbody.appendChild(tr);
+            });
+            if (data.next_cursor) {
+                button.dataset.cursor = data.next_cursor;
+            } else {
+                button.style.display = 'none';
+            }
+        })
+        .catch(error => console.error('Failed to load more companies:', error));
+}
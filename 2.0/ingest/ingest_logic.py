@@ -1,8 +1,11 @@
 import logging
 import json
 import pandas as pd
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import insert
 
+import config.settings as settings
+
 from db_models.filing_info import FilingInfo
 from db_models.named_sections import NamedSections
 from db_models.named_section_embds import NamedSectionEmbeddings
@@ -65,3 +68,26 @@ def ingest_dataframe(df, table_name, engine):
         df.to_sql(name=table_name, con=engine, if_exists='append', index=False, method='multi')
     except Exception as e:
         logging.error(f'Failed to ingest {table_name} DF into database: {e}.')
+
+def invalidate_rag_answer_cache(engine, start_date, end_date):
+    '''
+    Deletes cached RAG answers which could have drawn on filings dated within [start_date, end_date] (NULL bounds are unbounded),
+    as well as any entries past the cache's max age. Call after new filings have been ingested and embedded.
+    '''
+    try:
+        with engine.begin() as conn:
+            result = conn.execute(text(f'''
+                DELETE FROM {settings.RAG_ANSWER_CACHE_TABLE}
+                WHERE (
+                    (date_range_start IS NULL OR date_range_start <= :end_date)
+                    AND (date_range_end IS NULL OR date_range_end >= :start_date)
+                )
+                OR created_at <= now() - make_interval(hours => :max_age_hours)
+            '''), {
+                'start_date': start_date,
+                'end_date': end_date,
+                'max_age_hours': settings.RAG_CACHE_MAX_AGE_HOURS
+            })
+        logging.info(f'Invalidated {result.rowcount} cached RAG answers covering {start_date} - {end_date}.')
+    except Exception as e:
+        logging.error(f'Failed to invalidate RAG answer cache: {e}.')
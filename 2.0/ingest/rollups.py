@@ -0,0 +1,54 @@
+import logging
+from sqlalchemy import text
+
+import config.settings as settings
+
+'''
+Incremental maintenance of the filing count rollups (see db_models/filing_counts.py).
+Rollup rows for a date are recomputed from that date's filing_info rows only, so refreshing is cheap, exact and idempotent.
+'''
+
+def rollup_refresh_statements(date_filter: str):
+    return [
+        f'DELETE FROM {settings.DAILY_TYPE_COUNTS_TABLE} WHERE {date_filter}',
+        f'''
+        INSERT INTO {settings.DAILY_TYPE_COUNTS_TABLE} (date, type, count)
+        SELECT date, type, COUNT(*)
+        FROM {settings.FILING_INFO_TABLE}
+        WHERE {date_filter}
+        GROUP BY date, type
+        ''',
+        f'DELETE FROM {settings.DAILY_FILER_COUNTS_TABLE} WHERE {date_filter}',
+        f'''
+        INSERT INTO {settings.DAILY_FILER_COUNTS_TABLE} (date, type, whole_sic_code, cik, sic_mjr_group_code, sic_desc, company_name, count)
+        SELECT date, type, COALESCE(whole_sic_code, ''), cik, MAX(sic_mjr_group_code), MAX(sic_desc), MAX(company_name), COUNT(*)
+        FROM {settings.FILING_INFO_TABLE}
+        WHERE {date_filter}
+        GROUP BY date, type, COALESCE(whole_sic_code, ''), cik
+        '''
+    ]
+
+def refresh_filing_rollups(engine, dates):
+    '''
+    Recomputes the rollup rows for the given filing dates. Call after filing_info rows for those dates are ingested.
+    '''
+    dates = sorted(set(d for d in dates if d is not None))
+    if not dates:
+        return
+
+    try:
+        with engine.begin() as conn:
+            for stmt in rollup_refresh_statements('date = ANY(:dates)'):
+                conn.execute(text(stmt), {'dates': dates})
+        logging.info(f'Refreshed filing count rollups for {len(dates)} dates: {dates[0]} - {dates[-1]}.')
+    except Exception as e:
+        logging.error(f'Failed to refresh filing count rollups: {e}.')
+
+def rebuild_filing_rollups(engine):
+    '''
+    Rebuilds the rollups from all of filing_info, i.e. when the rollup tables are first created on an existing database.
+    '''
+    with engine.begin() as conn:
+        for stmt in rollup_refresh_statements('TRUE'):
+            conn.execute(text(stmt))
+    logging.info(f'Rebuilt filing count rollups from {settings.FILING_INFO_TABLE}.')
@@ -0,0 +1,297 @@
+import re
+import json
+import logging
+import numpy as np
+from collections import Counter
+from sqlalchemy import text
+
+import config.settings as settings
+from config.sic_divisions import SIC_DIVISION_RANGES
+
+'''
+Incremental topic modelling over the stored section embeddings, run by the ingestion flow after new sections are embedded.
+Sections are grouped by SIC division and filing type. Each group keeps a set of topic centroids (spherical k-means on the
+MiniLM embeddings, no re-encoding). New sections are assigned to their nearest topic and the centroids updated as running means;
+sections far from every topic stay unassigned until there are enough of them to fit new topics.
+Topic keywords are class-based TF-IDF over running term counts, so past section text never has to be re-read.
+The dashboard only reads the topics / section_topics tables.
+'''
+
+NO_DIVISION = 'none'
+
+_TOKEN_PATTERN = re.compile(r'\b[a-z][a-z\-]{2,}\b')
+_STOPWORDS = set('''
+    the and for that this with from are was were been have has had not but its their they them which will would shall
+    may can could should such any all other than into upon under within without about above also each these those there
+    where when who whom what our ours your you his her him she any per more most less some only over same both between
+    during including includes included include pursuant thereof therein hereby herein hereof hereto whereas section
+    company companies registrant inc corp corporation llc ltd form report filed filing exhibit item page date
+    year years quarter month months period periods fiscal total amount amounts certain related due net
+'''.split())
+
+def sic_division_case(column: str) -> str:
+    '''SQL CASE expression mapping a 2 digit SIC major group column onto its division key.'''
+    whens = '\n'.join(f"WHEN {column}::int BETWEEN {low} AND {high} THEN '{key}'" for key, low, high in SIC_DIVISION_RANGES)
+    return f"""
+        CASE
+            WHEN {column} IS NULL OR {column} !~ '^[0-9]{{2}}$' THEN '{NO_DIVISION}'
+            {whens}
+            ELSE '{NO_DIVISION}'
+        END"""
+
+def _unassigned_sections_sql() -> str:
+    '''UNION ALL over every text table of the keys and groups of embedded sections not yet assigned to a topic.'''
+    branches = []
+    for table_name, embed_table_name in settings.TEXT_TYPE_TABLES.items():
+        branches.append(f'''
+            SELECT
+                '{table_name}' AS source,
+                s.id AS section_id,
+                {sic_division_case('f.sic_mjr_group_code')} AS sic_division,
+                f.type AS filing_type
+            FROM {embed_table_name} e
+            JOIN {table_name} s ON e.section_id = s.id
+            JOIN {settings.FILING_INFO_TABLE} f ON s.accession_number = f.accession_number
+            WHERE NOT EXISTS (
+                SELECT 1 FROM {settings.SECTION_TOPICS_TABLE} st
+                WHERE st.source = '{table_name}' AND st.section_id = s.id
+            )''')
+    return ' UNION ALL '.join(branches)
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _spherical_kmeans(X, k, iterations=25, seed=0):
+    '''
+    k-means on unit vectors with cosine similarity (k-means++ seeding). Returns (centroids, labels).
+    '''
+    rng = np.random.default_rng(seed)
+    n = len(X)
+    centroids = np.empty((k, X.shape[1]), dtype=X.dtype)
+    centroids[0] = X[rng.integers(n)]
+    closest = 1 - X @ centroids[0]
+    for i in range(1, k):
+        weights = np.clip(closest, 0, None) ** 2
+        idx = rng.choice(n, p=weights / weights.sum()) if weights.sum() > 0 else rng.integers(n)
+        centroids[i] = X[idx]
+        closest = np.minimum(closest, 1 - X @ centroids[i])
+
+    labels = np.zeros(n, dtype=int)
+    for iteration in range(iterations):
+        sims = X @ centroids.T
+        new_labels = sims.argmax(axis=1)
+        if iteration and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for i in range(k):
+            members = X[labels == i]
+            if len(members):
+                centroids[i] = members.sum(axis=0)
+            else:
+                # Re-seed an empty cluster on the point worst served by its current centroid
+                centroids[i] = X[sims.max(axis=1).argmin()]
+        centroids = _normalize(centroids)
+
+    return centroids, labels
+
+def _count_terms(texts):
+    counts = Counter()
+    for t in texts:
+        counts.update(w for w in _TOKEN_PATTERN.findall((t or '')[:settings.TOPIC_TEXT_CHARS].lower()) if w not in _STOPWORDS)
+    return counts
+
+def _ctfidf_keywords(topic_term_counts):
+    '''
+    Class-based TF-IDF (as in BERTopic): a topic's term frequency, weighted by how rare the term is across the group's topics.
+    topic_term_counts: {topic_key: Counter}. Returns {topic_key: [keywords]}
+    '''
+    group_counts = Counter()
+    for counts in topic_term_counts.values():
+        group_counts.update(counts)
+    avg_words = sum(group_counts.values()) / max(len(topic_term_counts), 1)
+
+    keywords = {}
+    for key, counts in topic_term_counts.items():
+        total = sum(counts.values()) or 1
+        scores = {term: (count / total) * np.log(1 + avg_words / group_counts[term]) for term, count in counts.items()}
+        keywords[key] = [term for term, _ in sorted(scores.items(), key=lambda x: x[1], reverse=True)[:settings.TOPIC_KEYWORDS]]
+    return keywords
+
+def _load_group_topics(conn, sic_division, filing_type):
+    rows = conn.execute(text(f'''
+        SELECT id, CAST(centroid AS real[]) AS centroid, size, term_counts
+        FROM {settings.TOPICS_TABLE}
+        WHERE sic_division = :sic_division AND filing_type = :filing_type
+        ORDER BY id
+    '''), {'sic_division': sic_division, 'filing_type': filing_type}).fetchall()
+    return [{
+        'id': r.id,
+        'centroid': np.array(r.centroid, dtype=np.float32),
+        'size': r.size or 0,
+        'term_counts': Counter(r.term_counts or {})
+    } for r in rows]
+
+def _section_batches(conn, keys):
+    '''
+    Yields the sections of a list of (source, section_id) keys as (rows, normalized embeddings), settings.TOPIC_BATCH_SIZE at a time,
+    fetched by primary key so memory stays bounded however large the backlog is. Rows have source, section_id and text.
+    '''
+    for start in range(0, len(keys), settings.TOPIC_BATCH_SIZE):
+        ids_by_source = {}
+        for source, section_id in keys[start:start + settings.TOPIC_BATCH_SIZE]:
+            ids_by_source.setdefault(source, []).append(section_id)
+
+        rows = []
+        for source, ids in ids_by_source.items():
+            rows += conn.execute(text(f'''
+                SELECT '{source}' AS source, s.id AS section_id, s.text, CAST(e.embedding AS real[]) AS embedding
+                FROM {settings.TEXT_TYPE_TABLES[source]} e
+                JOIN {source} s ON e.section_id = s.id
+                WHERE s.id = ANY(:ids)
+            '''), {'ids': ids}).fetchall()
+        if rows:
+            yield rows, _normalize(np.array([r.embedding for r in rows], dtype=np.float32))
+
+def _assign(conn, topics, rows, X, members, labels, best):
+    '''
+    Assigns rows[members] to topics[labels]: adds them to the topics' centroid sums, sizes and term counts and stores the assignments.
+    '''
+    if not len(members):
+        return 0
+    for i in np.unique(labels):
+        topic_members = members[labels == i]
+        topic = topics[i]
+        topic['centroid_sum'] = topic['centroid_sum'] + X[topic_members].sum(axis=0)
+        topic['size'] += len(topic_members)
+        topic['term_counts'].update(_count_terms(rows[j].text for j in topic_members))
+        topic['changed'] = True
+
+    conn.execute(text(f'''
+        INSERT INTO {settings.SECTION_TOPICS_TABLE} (source, section_id, topic_id, similarity)
+        VALUES (:source, :section_id, :topic_id, :similarity)
+        ON CONFLICT (source, section_id) DO NOTHING
+    '''), [{
+        'source': rows[j].source,
+        'section_id': rows[j].section_id,
+        'topic_id': topics[label]['id'],
+        'similarity': float(similarity)
+    } for j, label, similarity in zip(members, labels, best)])
+    return len(members)
+
+def _update_group(conn, sic_division, filing_type, keys):
+    '''
+    Assigns a group's unassigned sections, given as (source, section_id) keys, to topics, creating topics as needed. Returns the number
+    of sections assigned. A first pass over the sections assigns those close enough to an existing topic and keeps the keys of the rest
+    (outliers) and a sample of their embeddings. Once there are settings.TOPIC_MIN_SECTIONS outliers new topics are fit on the sample and
+    a second pass assigns the outliers to them, otherwise they stay unassigned (and out of every topic's centroid and term counts) for a
+    later run.
+    '''
+    topics = _load_group_topics(conn, sic_division, filing_type)
+    for topic in topics:
+        topic['centroid_sum'] = topic['centroid'] * topic['size']
+    # Sections are compared with the centroids as loaded, the running means are applied once the whole group is assigned
+    centroids = np.stack([t['centroid'] for t in topics]) if topics else None
+
+    assigned, outlier_keys = 0, []
+    sample = [] # Reservoir sample of the outliers' embeddings, bounded by settings.TOPIC_FIT_SAMPLE
+    rng = np.random.default_rng(0)
+    for rows, X in _section_batches(conn, keys):
+        if centroids is not None:
+            sims = X @ centroids.T
+            labels, best = sims.argmax(axis=1), sims.max(axis=1)
+        else:
+            labels, best = np.full(len(X), -1), np.full(len(X), -np.inf)
+        explained = best >= settings.TOPIC_NEW_TOPIC_SIMILARITY
+
+        for j in np.flatnonzero(~explained):
+            outlier_keys.append((rows[j].source, rows[j].section_id))
+            if len(sample) < settings.TOPIC_FIT_SAMPLE:
+                sample.append(X[j])
+            else:
+                slot = rng.integers(len(outlier_keys))
+                if slot < settings.TOPIC_FIT_SAMPLE:
+                    sample[slot] = X[j]
+
+        members = np.flatnonzero(explained)
+        assigned += _assign(conn, topics, rows, X, members, labels[members], best[members])
+
+    # Fit new topics on the sections no existing topic explains, once there are enough of them
+    room = settings.TOPIC_MAX_PER_GROUP - len(topics)
+    if len(outlier_keys) >= settings.TOPIC_MIN_SECTIONS and room > 0:
+        k = min(room, max(2, int(np.sqrt(len(outlier_keys) / 2))), len(sample))
+        new_centroids, _ = _spherical_kmeans(np.stack(sample), k)
+        first_new = len(topics)
+        for centroid in new_centroids:
+            # Inserted now for their ids, filled in with the other changed topics below
+            topic_id = conn.execute(text(f'''
+                INSERT INTO {settings.TOPICS_TABLE} (sic_division, filing_type, centroid, size, label, keywords, term_counts, embedding_model)
+                VALUES (:sic_division, :filing_type, CAST(:centroid AS vector), 0, '', CAST('[]' AS json), CAST('{{}}' AS json), :embedding_model)
+                RETURNING id
+            '''), {'sic_division': sic_division, 'filing_type': filing_type, 'centroid': centroid.tolist(), 'embedding_model': settings.DEFAULT_EMBEDDING_MODEL}).scalar()
+            topics.append({'id': topic_id, 'centroid': centroid, 'centroid_sum': np.zeros_like(centroid), 'size': 0, 'term_counts': Counter(), 'new': True})
+
+        # Each outlier goes to its nearest new topic
+        for rows, X in _section_batches(conn, outlier_keys):
+            sims = X @ new_centroids.T
+            assigned += _assign(conn, topics, rows, X, np.arange(len(X)), sims.argmax(axis=1) + first_new, sims.max(axis=1))
+    elif outlier_keys:
+        reason = 'the group has its maximum number of topics' if room <= 0 else 'waiting for more before fitting new topics'
+        logging.info(f'Leaving {len(outlier_keys)} {filing_type} sections in SIC division {sic_division} far from every topic unassigned, {reason}.')
+
+    empty = [t['id'] for t in topics if t.get('new') and not t['size']]
+    if empty:
+        conn.execute(text(f'DELETE FROM {settings.TOPICS_TABLE} WHERE id = ANY(:ids)'), {'ids': empty})
+    topics = [t for t in topics if t['size']]
+    if not assigned:
+        return 0
+
+    # Running mean centroids, and keywords from the updated term counts
+    for topic in topics:
+        if topic.get('changed'):
+            topic['centroid'] = _normalize(topic['centroid_sum'])
+            topic['term_counts'] = Counter(dict(topic['term_counts'].most_common(500))) # Bounded storage
+    keywords = _ctfidf_keywords({i: t['term_counts'] for i, t in enumerate(topics)})
+
+    for i, topic in enumerate(topics):
+        if not topic.get('changed'):
+            continue
+        conn.execute(text(f'''
+            UPDATE {settings.TOPICS_TABLE}
+            SET centroid = CAST(:centroid AS vector), size = :size, label = :label, keywords = CAST(:keywords AS json),
+                term_counts = CAST(:term_counts AS json), updated_at = now()
+            WHERE id = :id
+        '''), {
+            'id': topic['id'],
+            'centroid': topic['centroid'].tolist(),
+            'size': topic['size'],
+            'label': ', '.join(keywords[i][:3]),
+            'keywords': json.dumps(keywords[i]),
+            'term_counts': json.dumps(dict(topic['term_counts']))
+        })
+
+    return assigned
+
+def update_section_topics(engine):
+    '''
+    Assigns every embedded but unassigned section to a topic, one SIC division x filing type group (and transaction) at a time.
+    '''
+    # One scan for the keys of every group's unassigned sections, the sections themselves are then fetched by key
+    keys_by_group = {}
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(text(f'''
+            SELECT sic_division, filing_type, source, section_id
+            FROM ({_unassigned_sections_sql()}) unassigned
+            ORDER BY sic_division, filing_type, source, section_id
+        '''))
+        for row in result:
+            keys_by_group.setdefault((row.sic_division, row.filing_type), []).append((row.source, row.section_id))
+
+    logging.info(f'Found {len(keys_by_group)} SIC division x filing type groups with sections awaiting topic assignment.')
+    for (sic_division, filing_type), keys in sorted(keys_by_group.items(), key=lambda item: len(item[1]), reverse=True):
+        try:
+            with engine.begin() as conn:
+                assigned = _update_group(conn, sic_division, filing_type, keys)
+            logging.info(f'Assigned {assigned}/{len(keys)} new {filing_type} sections in SIC division {sic_division} to topics.')
+        except Exception as e:
+            logging.error(f'Failed topic modelling for {filing_type} filings in SIC division {sic_division}: {str(e)}')
@@ -0,0 +1,86 @@
+import os
+import time
+import logging
+import argparse
+
+import config.settings as settings
+from parser.filing_parser import MasterParserClass
+from parser.html_document import HtmlDocument
+
+'''
+Parse time benchmark for saved main HTML documents (10-K, 10-Q, S-1, ...).
+Each document is parsed once per configuration (text engine + BeautifulSoup backend), then the tidy text extraction strategies and
+the TOC walker are run on that same HtmlDocument, as parse_tidy_main_doc does. Reports seconds per stage and the total per filing.
+The lxml engine's parse column is the lxml tree, the soup it needs for the TOC walker is built lazily and counted under toc.
+
+Usage (from the project root): python -m parser.bench_parse data/samples/*.htm [--type 10-k] [--repeat 3]
+'''
+
+# (label, settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER)
+CONFIGURATIONS = [
+    ('bs4/html.parser', 'bs4', 'html.parser'),
+    ('bs4/lxml', 'bs4', 'lxml'),
+    ('lxml', 'lxml', 'lxml')
+]
+
+def _best_of(repeat, func):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _parsed(html, engine):
+    document = HtmlDocument(html)
+    if engine == 'lxml':
+        document.tree
+    else:
+        document.soup
+    return document
+
+def bench_document(parser, html, engine, soup_parser, repeat):
+    settings.HTML_TEXT_ENGINE = engine
+    settings.HTML_SOUP_PARSER = soup_parser
+    parse_s, document = _best_of(repeat, lambda: _parsed(html, engine))
+    text_s, text = _best_of(repeat, lambda: parser.extract_text_from_tidy_doc(document))
+    toc_s, sections = _best_of(repeat, lambda: parser.get_toc_sections(HtmlDocument(html) if engine == 'lxml' else document))
+    return {
+        'parse': parse_s,
+        'text': text_s,
+        'toc': toc_s,
+        'total': parse_s + text_s + toc_s,
+        'chars': len(text),
+        'toc_sections': len(sections)
+    }
+
+def run(paths, form_type, repeat):
+    configured = (settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER)
+    totals = {label: 0.0 for label, _, _ in CONFIGURATIONS}
+
+    logging.disable(logging.CRITICAL) # Per-strategy logging would dominate the timings
+    try:
+        parser = MasterParserClass('', form_type) # No SEC header needed, only the HTML document methods are used
+        print(f'{"document":40} {"engine":16} {"parse":>8} {"text":>8} {"toc":>8} {"total":>8} {"chars":>10} {"sections":>8}')
+        for path in paths:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                html = f.read()
+            for label, engine, soup_parser in CONFIGURATIONS:
+                r = bench_document(parser, html, engine, soup_parser, repeat)
+                totals[label] += r['total']
+                print(f'{os.path.basename(path)[:40]:40} {label:16} {r["parse"]:8.3f} {r["text"]:8.3f} {r["toc"]:8.3f} {r["total"]:8.3f} {r["chars"]:10} {r["toc_sections"]:8}')
+    finally:
+        logging.disable(logging.NOTSET)
+        settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER = configured
+
+    for label, _, _ in CONFIGURATIONS:
+        print(f'{label}: {totals[label]:.3f}s total, {totals[label] / max(len(paths), 1):.3f}s per filing')
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark HTML parse + text extraction time per filing document.')
+    arg_parser.add_argument('paths', nargs='+', help='Saved main HTML documents')
+    arg_parser.add_argument('--type', default='10-k', help='Form type of the documents')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the best is reported')
+    args = arg_parser.parse_args()
+    run(args.paths, args.type, args.repeat)
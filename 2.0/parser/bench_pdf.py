@@ -0,0 +1,128 @@
+import io
+import os
+import re
+import time
+import logging
+import argparse
+import binascii
+import warnings
+import pymupdf
+
+import config.settings as settings
+import parser.pdf_text as pdf_text
+from parser.filing_parser import MasterParserClass
+
+'''
+Benchmark of the PDF documents of filings (parse_pdfs / parse_pdf_to_df), against the previous implementation kept here for reference:
+re.sub of the <PDF> tags + uu.decode between two BytesIO objects, then page text concatenated with += per section and the metadata dict
+in every row. Reports the uudecode and page text extraction seconds of each, plus extraction in settings.PDF_EXTRACT_WORKERS-like
+process counts (--workers) for PDFs of at least settings.PDF_PARALLEL_MIN_PAGES pages, and checks the rows' text and pages are identical.
+
+Paths are saved full submissions (.txt, their PDF documents are used) or plain .pdf files, which are uuencoded in memory first.
+
+Usage (from the project root): python -m parser.bench_pdf data/samples/*.txt data/samples/*.pdf [--workers 4] [--repeat 3]
+'''
+
+_STUB_HEADER = '<SEC-HEADER>\nACCESSION NUMBER:\t\tbench-pdf\nCONFORMED SUBMISSION TYPE:\tS-1\nFILED AS OF DATE:\t\t20000101\n</SEC-HEADER>\n'
+
+def _best_of(repeat, func):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _reference_decode(doc_text):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        import uu # Deprecated, removed in Python 3.13
+    encoded_pdf_content = re.sub(r'</?pdf>', '', doc_text, flags=re.IGNORECASE)
+    pdf_bytes = io.BytesIO()
+    uu.decode(io.BytesIO(encoded_pdf_content.encode('ascii')), pdf_bytes)
+    pdf_bytes.seek(0)
+    return pdf_bytes
+
+def _reference_rows(pdf_file):
+    # Previous parse_pdf_to_df without the logging, for timing and to compare rows with
+    pdf_mu = pymupdf.open(stream=pdf_file, filetype='pdf')
+    metadata = pdf_mu.metadata
+    metadata['num_pages'] = len(pdf_mu)
+    rows = []
+    toc = pdf_mu.get_toc()
+    if toc:
+        for i, (level, title, start_page) in enumerate(toc):
+            start_page -= 1
+            end_page = toc[i + 1][2] - 1 if i + 1 < len(toc) else len(pdf_mu)
+            text = ''
+            for p in range(start_page, end_page):
+                text += pdf_mu.load_page(p).get_text()
+            rows.append({ 'pdf_metadata': metadata, 'start_page': start_page, 'end_page': end_page, 'section_name': title, 'text': text.strip() })
+    else:
+        for i in range(len(pdf_mu)):
+            rows.append({ 'pdf_metadata': metadata, 'start_page': i, 'end_page': i, 'section_name': 'page', 'text': pdf_mu.load_page(i).get_text().strip() })
+    return rows
+
+def load_pdf_documents(path):
+    '''
+    Returns [(name, uuencoded document text)] for a saved submission or a plain PDF file.
+    '''
+    if path.lower().endswith('.pdf'):
+        with open(path, 'rb') as f:
+            data = f.read()
+        lines = [f'begin 644 {os.path.basename(path)}']
+        lines += [binascii.b2a_uu(data[i:i + 45]).decode('ascii').rstrip('\n') for i in range(0, len(data), 45)]
+        lines += ['`', 'end']
+        return [(os.path.basename(path), '<PDF>\n' + '\n'.join(lines) + '\n</PDF>')]
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        parser = MasterParserClass(f.read(), 's-1')
+    return [(doc['doc_filename'], doc.get('doc_text', '')) for doc in parser.split_filing_documents() if doc.get('doc_filename', '').lower().endswith('.pdf')]
+
+def bench_pdf(parser, name, doc_text, workers, repeat):
+    old_decode_s, old_file = _best_of(repeat, lambda: _reference_decode(doc_text))
+    new_decode_s, pdf_bytes = _best_of(repeat, lambda: pdf_text.decode_uu(doc_text))
+    if old_file.getvalue() != pdf_bytes:
+        print(f'DIFF {name}: decoded bytes differ')
+
+    old_pages_s, old_rows = _best_of(repeat, lambda: _reference_rows(io.BytesIO(pdf_bytes)))
+    settings.PDF_EXTRACT_WORKERS = 1
+    new_pages_s, new_df = _best_of(repeat, lambda: parser.parse_pdf_to_df(pdf_bytes))
+    settings.PDF_EXTRACT_WORKERS = workers
+    parallel_s, parallel_df = _best_of(repeat, lambda: parser.parse_pdf_to_df(pdf_bytes))
+
+    columns = ['start_page', 'end_page', 'section_name', 'text']
+    expected = [[row[c] for c in columns] for row in old_rows]
+    for label, df in (('serial', new_df), ('parallel', parallel_df)):
+        if df[columns].values.tolist() != expected:
+            print(f'DIFF {name}: {label} rows differ from the previous implementation')
+
+    pages = new_df['pdf_metadata'].iloc[0]['num_pages'] if not new_df.empty else 0 # Metadata is on the first row only
+    print(f'{name[:36]:36} {len(pdf_bytes) / 1e6:6.2f}MB {pages:5} pages  decode {old_decode_s:6.3f}s -> {new_decode_s:6.3f}s ({old_decode_s / max(new_decode_s, 1e-9):4.1f}x)  '
+          f'pages {old_pages_s:6.3f}s -> {new_pages_s:6.3f}s, {workers} workers {parallel_s:6.3f}s ({old_pages_s / max(parallel_s, 1e-9):4.1f}x)')
+    return old_decode_s + old_pages_s, new_decode_s + min(new_pages_s, parallel_s)
+
+def run(paths, workers, repeat):
+    configured = (settings.PDF_EXTRACT_WORKERS, settings.PDF_PARALLEL_MIN_PAGES)
+    logging.disable(logging.CRITICAL) # Per-page logging would dominate the timings
+    try:
+        parser = MasterParserClass(_STUB_HEADER, 's-1')
+        old_total, new_total = 0.0, 0.0
+        for path in paths:
+            for name, doc_text in load_pdf_documents(path):
+                old_s, new_s = bench_pdf(parser, name, doc_text, workers, repeat)
+                old_total += old_s
+                new_total += new_s
+    finally:
+        logging.disable(logging.NOTSET)
+        settings.PDF_EXTRACT_WORKERS, settings.PDF_PARALLEL_MIN_PAGES = configured
+    print(f'Total {old_total:.3f}s -> {new_total:.3f}s ({old_total / max(new_total, 1e-9):.1f}x)')
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Benchmark uudecoding and page text extraction of filing PDFs.')
+    arg_parser.add_argument('paths', nargs='+', help='Saved full submissions (.txt) or PDF files')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes for the parallel extraction run')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per stage, the best is reported')
+    args = arg_parser.parse_args()
+    run(args.paths, args.workers, args.repeat)
@@ -1,12 +1,18 @@
 import logging
-import unicodedata
 import re
+import bisect
 import pymupdf
-import uu
 import io
 import pandas as pd
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import BeautifulSoup, NavigableString, CData
 import config.settings as settings
+import parser.hr_info_table as hr_info_table
+import parser.lxml_text as lxml_text
+import parser.pdf_text as pdf_text
+import parser.text_normalize as text_normalize
+import parser.tidy_sections as tidy_sections
+import parser.sec_header as sec_header
+from parser.html_document import HtmlDocument
 
 '''
 Breakdown of logic/flow used:
@@ -236,7 +242,8 @@ class MasterParserClass:
 
         self.fulltext = fulltext_cont
         self.type = type
-        self.filing_info = self.parse_sec_header(fulltext_cont)
+        self.sec_header = self.tokenize_sec_header(fulltext_cont) # Shared by filing_info and subject company parsing
+        self.filing_info = self.parse_sec_header(self.sec_header)
 
         self.named_sections = pd.DataFrame()
         self.toc_sections = pd.DataFrame()
@@ -267,9 +274,60 @@ class MasterParserClass:
         else:
             return None  # Return None if no SEC header is found
     
-    def parse_sec_header(self, fulltext_contents):
+    def tokenize_sec_header(self, fulltext_contents):
         '''
-        Parses the filing's SEC header.
+        Extracts and tokenizes the filing's SEC header in one pass (see parser/sec_header.py).
+        Returns a SecHeader, or None if the filing has no SEC header.
+        '''
+        header_text = self.extract_sec_header(fulltext_contents)
+        if not header_text:
+            return None
+        return sec_header.parse_header(header_text)
+
+    def match_header_value(self, pattern, value):
+        '''
+        Helper to the header parsing methods. The part of a header value matching pattern from its start, or None.
+        '''
+        if not value:
+            return None
+        match = re.match(pattern, value)
+        return match.group(0) if match else None
+
+    def parse_header_address(self, entity, block_name, value_patterns=None):
+        '''
+        Helper to the header parsing methods. Joins the street / city / state / zip fields of an address block, or None without the block.
+        '''
+        address = entity.block(block_name)
+        if not address:
+            return None
+
+        components = []
+        for key in ['STREET 1', 'STREET 2', 'CITY', 'STATE', 'ZIP']:
+            value = address.get(key)
+            if value_patterns and key in value_patterns:
+                value = self.match_header_value(value_patterns[key], value)
+            if value:
+                components.append(value)
+            else:
+                logging.warning(f'{block_name} component not found: {key}')
+        return ', '.join(components)
+
+    def parse_header_name_changes(self, entity):
+        '''
+        Helper to the header parsing methods. Former names of an entity, from its FORMER COMPANY (company) or FORMER NAME (owner) blocks.
+        '''
+        name_changes = []
+        for block_name in ['FORMER COMPANY', 'FORMER NAME']:
+            for former in entity.blocks_named(block_name):
+                former_name = former.get('FORMER CONFORMED NAME')
+                date_of_change = self.match_header_value(r'\d{8}', former.get('DATE OF NAME CHANGE'))
+                if former_name and date_of_change:
+                    name_changes.append({ 'former_name': former_name, 'date_of_change': date_of_change })
+        return name_changes
+
+    def parse_sec_header(self, header):
+        '''
+        Parses the filing's tokenized SEC header (see tokenize_sec_header).
          
         Returns a dataframe.
         '''
@@ -293,139 +351,90 @@ class MasterParserClass:
             'header_raw_text': None,
             'filing_raw_text': None
         }
-        header_text = self.extract_sec_header(fulltext_contents)
 
-        if not header_text:
+        if not header:
             logging.error('Failed to extract SEC header from filing content.')
             return filing_info
-        #filing_info['header_raw_text'] = header_text
-        #filing_info['filing_raw_text'] = fulltext_contents
+
+        # Form type is recorded per filer under FILING VALUES, the submission type covers the filing as a whole. A top level FORM TYPE
+        # (which the previous header regex also matched) is the last resort
+        form_types = [entity.field('FORM TYPE', 'FILING VALUES') for entity in header.entities]
+        form_type = next((t for t in form_types if t), None) or header.get('CONFORMED SUBMISSION TYPE') or header.get('FORM TYPE')
 
         # Extract required fields
-        required_patterns = {
-            'accession_number': r'accession number:\s+([^\n]+)',
-            'type': r'form type:\s+([^\n]+)',
-            'date': r'filed as of date:\s+(\d{8})' ######################################################################################### TODO Format as actual date!
+        required_values = {
+            'accession_number': header.get('ACCESSION NUMBER'),
+            'type': form_type,
+            'date': self.match_header_value(r'\d{8}', header.get('FILED AS OF DATE')) ######################################################################################### TODO Format as actual date!
             # (CIK + SIC will be grabbed later on. If they cannot be found, xxxxxxxxxx and xxxx will be used, respectively, for unknowns)
         }
 
-        for key, pattern in required_patterns.items():
-            match = re.search(pattern, header_text, re.IGNORECASE)
-            if match:
-                filing_info[key] = match.group(1).strip()
+        for key, value in required_values.items():
+            if value:
+                filing_info[key] = value
             else:
                 logging.error(f'Failed to parse SEC header required field: {key}.')
                 return filing_info  # Early exit. Something is wrong lol
         
         # Report period if applicable
-        report_period_match = re.search(r'\s*conformed period of report:\s*(.+?)', header_text, re.IGNORECASE)
-        if report_period_match:
-            filing_info['report_period'] = report_period_match.group(1).strip()
-        else:
+        filing_info['report_period'] = header.get('CONFORMED PERIOD OF REPORT')
+        if not filing_info['report_period']:
             logging.warning('Header field not found: report_period')  
-            filing_info['report_period'] = None
         
         # We try to ensure we only grab the filer / filed by / issuer company, not a subject company.
-        # Filings such as 13D/G, hold company data on both subject companies and filer companies.
-        filed_by_match = re.search(r'filed by:', header_text, re.IGNORECASE)
-        filer_match = re.search(r'filer:', header_text, re.IGNORECASE)
-        issuer_match = re.search(r'issuer:', header_text, re.IGNORECASE)
-
-        if filed_by_match:
-            remaining_text = header_text[filed_by_match.end():]  # Extract text after 'filed by:'
-        elif filer_match:
-            remaining_text = header_text[filer_match.end():]  # Extract text after 'filer:'
-        elif issuer_match:
-            remaining_text = header_text[issuer_match.end():]
-        else:
-            remaining_text = header_text  # Fallback in case neither section is present
+        # Filings such as 13D/G, hold company data on both subject companies and filer companies. With several filers, the first one is used
+        company = header.first_entity('FILED BY', 'FILER', 'ISSUER')
+        if not company:
+            company = header.entities[0] if header.entities else sec_header.HeaderEntity(None) # Fallback in case none of those sections are present
         
-        # Some company data patterns
-        company_data_patterns = {
-            'company_name': r'\s*COMPANY CONFORMED NAME:\s*(?P<company_name>.+?)\s*(?:\n|$)',
-            'cik' : r'\s*CENTRAL INDEX KEY:\s*(?P<cik>\d+)\s*(?:\n|$)',
-            'sic_whole' : r'\s*STANDARD INDUSTRIAL CLASSIFICATION:\s*',
-            'state_of_incorp': r'\s*STATE OF INCORPORATION:\s*(?P<state_of_incorp>\w+)\s*(?:\n|$)',
-            'fiscal_yr_end': r'\s*FISCAL YEAR END:\s*(?P<fiscal_yr_end>\d{4})\s*(?:\n|$)',
-            'business_address': r'\s*BUSINESS ADDRESS:\s*',
-            'business_phone': r'\s*BUSINESS PHONE:\s*(?P<business_phone>.+?)\s*(?:\n|$)'
+        # Some company data fields, with the part of the value we keep
+        company_data_fields = {
+            'company_name': ('COMPANY CONFORMED NAME', None),
+            'cik': ('CENTRAL INDEX KEY', r'\d+'),
+            'state_of_incorp': ('STATE OF INCORPORATION', r'\w+'),
+            'fiscal_yr_end': ('FISCAL YEAR END', r'\d{4}'),
+            'business_phone': ('BUSINESS PHONE', None)
         }
 
-        for key, pattern in company_data_patterns.items():
-
-            match = re.search(pattern, remaining_text, re.IGNORECASE)
+        for key, (header_key, pattern) in company_data_fields.items():
+            value = company.field(header_key)
+            if value and pattern:
+                value = self.match_header_value(pattern, value)
 
-            if match:
-
-                # Address field takes some additional processing
-                if key == 'business_address':
-                    
-                    business_address_patterns = {
-                        'street1': r"\s*STREET\s+1:\s*(?P<street1>.*?)\s*(?:\n|$)",
-                        'street2': r"\s*STREET\s+2:\s*(?P<street2>.*?)\s*(?:\n|$)",
-                        'city': r"\s*CITY:\s*(?P<city>.*?)\s*(?:\n|$)",
-                        'state': r"\s*STATE:\s*(?P<state>\w+)\s*(?:\n|$)",
-                        'zip': r"\s*ZIP:\s*(?P<zip>\d+)"
-                    }
-
-                    business_address_info = {}
-
-                    for key, pattern in business_address_patterns.items():
-                        match = re.search(pattern, remaining_text, re.IGNORECASE | re.DOTALL)
-                        if match:
-                            business_address_info[key] = match.group(key).strip()
-                        else:
-                            logging.warning(f'Business address component not found: {key}')
-
-                    # Construct the address
-                    components = [component for component in business_address_info.values() if component]
-                    filing_info['business_address'] = ', '.join(components)
-
-                # SIC needs to be split into code and description
-                elif key == 'sic_whole':
-                    
-                    sic_pattern = r"\s*STANDARD INDUSTRIAL CLASSIFICATION:\s*(?P<sic_description>.+?)\s*\[(?P<sic_code>\d{4})\]"
-
-                    # Search for the SIC
-                    match = re.search(sic_pattern, remaining_text, re.IGNORECASE)
-
-                    if match:
-                        filing_info['sic_desc'] = match.group('sic_description').strip()
-                        filing_info['whole_sic_code'] = match.group('sic_code').strip()
-                        filing_info['sic_div_code'] = filing_info['whole_sic_code'][0]
-                        filing_info['sic_mjr_group_code'] = filing_info['whole_sic_code'][:2]
-                        filing_info['sic_ind_group_code'] = filing_info['whole_sic_code'][:3]
-                    else:
-                        filing_info['sic_desc'] = None
-                        filing_info['whole_sic_code'] = 0000
-                        filing_info['sic_div_code'] = 0
-                        filing_info['sic_mjr_group_code'] = 00
-                        filing_info['sic_ind_group_code'] = 000
-                        logging.warning('Failed to parse sic_code or sic_desc')
-                
-                else:
-                    filing_info[key] = match.group(1).strip()
+            if value:
+                filing_info[key] = value
             else:
                 logging.warning(f'Header field not found: {key}')
                 if key == 'cik':
                     filing_info[key] = 0000000000
-                elif key == 'sic_whole':
-                    filing_info['sic_desc'] = None
-                    filing_info['whole_sic_code'] = 0000
-                    filing_info['sic_mjr_group_code'] = 00
-                    filing_info['sic_ind_group_code'] = 000
 
-        # Lastly, grab any former company names
-        former_name_pattern = r"\s*FORMER COMPANY:\s*FORMER CONFORMED NAME:\s*(?P<former_name>.+?)\s*DATE OF NAME CHANGE:\s*(?P<date_of_change>\d{8})"
+        # SIC needs to be split into code and description
+        sic_whole = company.field('STANDARD INDUSTRIAL CLASSIFICATION')
+        sic_match = re.match(r'(?P<sic_description>.+?)\s*\[(?P<sic_code>\d{4})\]', sic_whole) if sic_whole else None
+        if sic_match:
+            filing_info['sic_desc'] = sic_match.group('sic_description').strip()
+            filing_info['whole_sic_code'] = sic_match.group('sic_code').strip()
+            filing_info['sic_div_code'] = filing_info['whole_sic_code'][0]
+            filing_info['sic_mjr_group_code'] = filing_info['whole_sic_code'][:2]
+            filing_info['sic_ind_group_code'] = filing_info['whole_sic_code'][:3]
+        else:
+            filing_info['sic_desc'] = None
+            filing_info['whole_sic_code'] = 0000
+            filing_info['sic_mjr_group_code'] = 00
+            filing_info['sic_ind_group_code'] = 000
+            if sic_whole:
+                filing_info['sic_div_code'] = 0
+                logging.warning('Failed to parse sic_code or sic_desc')
+            else:
+                logging.warning('Header field not found: sic_whole')
 
-        # Find all matches
-        matches = re.finditer(former_name_pattern, remaining_text, re.IGNORECASE | re.DOTALL)
+        # Address takes some additional processing
+        filing_info['business_address'] = self.parse_header_address(company, 'BUSINESS ADDRESS', { 'STATE': r'\w+', 'ZIP': r'\d+' })
+        if filing_info['business_address'] is None:
+            logging.warning('Header field not found: business_address')
 
-        for match in matches:
-            filing_info['name_changes'].append({
-                'former_name': match.group('former_name').strip(),
-                'date_of_change': match.group('date_of_change').strip()
-            })
+        # Lastly, grab any former company names
+        filing_info['name_changes'] = self.parse_header_name_changes(company)
 
         logging.info('Finished parsing filing SEC header')
         return pd.DataFrame([filing_info])
@@ -482,28 +491,39 @@ class MasterParserClass:
     def extract_text_from_element(self, element):
         """
         Extracts text while converting newlines inside inline tags to spaces.
+        Tables are rendered as simplified text and <br> tags as newlines without modifying the tree, so the same soup can be reused.
         """
-        # Handle tables by converting them to simplified text
-        for table in element.find_all('table'):
-            table_text = []
-            for row in table.find_all('tr'):
-                cells = [''.join(cell.stripped_strings) for cell in row.find_all(['th', 'td'])]
-                table_text.append(' | '.join(cells))
-            table.replace_with('\nTABLE: ' + '\n'.join(table_text) + '\n')
-
-        # Replace <br> tags with newline
-        for br in element.find_all('br'):
-            br.replace_with('\n')
-
-        # Traverse and normalize newline handling in inline contexts
         text_parts = []
-        for desc in element.descendants:
-            if isinstance(desc, NavigableString):
-                parent_tag = desc.parent.name if desc.parent else ''
-                content = str(desc)
-                if '\n' in content and parent_tag in MasterParserClass.inline_element_tags:
-                    content = content.replace('\n', ' ')
-                text_parts.append(content)
+        inline_tags = MasterParserClass.inline_element_tags
+
+        # Walk the tree in document order with an explicit stack of child iterators, tables and <br> tags are emitted in place rather than descended into
+        stack = [iter(element.children)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            if isinstance(node, NavigableString):
+                content = str(node)
+            elif node.name == 'table':
+                # Handle tables by converting them to simplified text
+                table_text = []
+                for row in node.find_all('tr'):
+                    cells = [''.join(cell.stripped_strings) for cell in row.find_all(['th', 'td'])]
+                    table_text.append(' | '.join(cells))
+                content = '\nTABLE: ' + '\n'.join(table_text) + '\n'
+            elif node.name == 'br':
+                content = '\n'
+            else:
+                stack.append(iter(node.children))
+                continue
+
+            # Normalize newline handling in inline contexts
+            parent_tag = node.parent.name if node.parent else ''
+            if '\n' in content and parent_tag in inline_tags:
+                content = content.replace('\n', ' ')
+            text_parts.append(content)
 
         text = ''.join(text_parts)
 
@@ -513,18 +533,17 @@ class MasterParserClass:
 
         return text.strip()
     
-    def tidy_parse_with_p_tags(self, html_content): 
+    def tidy_parse_with_p_tags(self, soup): 
         """
         Parses HTML where paragraphs are in <p> tags with direct text.
         This is the most common structure in SEC filings.
         
         Args:
-            html_content: Raw HTML content
+            soup: BeautifulSoup tree of the document (HtmlDocument.soup)
             
         Returns:
             Extracted text with double newlines between paragraphs
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
         paragraphs = []
         
         for p in soup.find_all('p'):
@@ -538,18 +557,17 @@ class MasterParserClass:
         
         return '\n\n'.join(paragraphs)
 
-    def tidy_parse_with_div_tags(self, html_content):
+    def tidy_parse_with_div_tags(self, soup):
         """
         Parses HTML where paragraphs are in <div> tags instead of <p> tags.
         Some filings use divs with specific classes for paragraphs.
         
         Args:
-            html_content: Raw HTML content
+            soup: BeautifulSoup tree of the document (HtmlDocument.soup)
             
         Returns:
             Extracted text with double newlines between paragraphs
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
         paragraphs = []
         
         # Look for divs that are likely to contain paragraphs
@@ -564,18 +582,17 @@ class MasterParserClass:
         
         return '\n\n'.join(paragraphs)
 
-    def tidy_parse_with_nested_structures(self, html_content: str) -> str:
+    def tidy_parse_with_nested_structures(self, soup) -> str:
         """
         Parses HTML with complex nested structures where text might be
         in children of paragraph tags or in spans within paragraphs.
         
         Args:
-            html_content: Raw HTML content
+            soup: BeautifulSoup tree of the document (HtmlDocument.soup)
             
         Returns:
             Extracted text with double newlines between paragraphs
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
         paragraphs = []
         
         # First try p tags with nested content
@@ -597,43 +614,56 @@ class MasterParserClass:
         
         return '\n\n'.join(paragraphs)
     
-    def tidy_parse_fallback(self, html_content):
+    def tidy_parse_fallback(self, soup):
         """
         Fallback parser that tries to extract text when other methods fail.
         This is more aggressive and might get more noise.
         
         Args:
-            html_content: Raw HTML content
+            soup: BeautifulSoup tree of the document (HtmlDocument.soup)
             
         Returns:
             Extracted text with double newlines between logical sections
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove unwanted elements
-        for element in soup(['script', 'style', 'table', 'footer', 'header', 'nav']):
-            element.decompose()
+        # Skip unwanted elements (rather than decomposing them, the soup is shared)
+        skipped_tags = {'script', 'style', 'table', 'footer', 'header', 'nav'}
         
         # Get all text blocks
-        text = soup.get_text('\n')  # Use single newline for all line breaks
+        strings = []
+        stack = [iter(soup.children)]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+            elif isinstance(node, NavigableString):
+                if type(node) in (NavigableString, CData): # Same strings get_text() would return
+                    strings.append(str(node))
+            elif node.name not in skipped_tags:
+                stack.append(iter(node.children))
         
         # Clean up the text
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        lines = [line.strip() for line in '\n'.join(strings).splitlines() if line.strip()]
         
         # Join non-empty lines with double newlines
         return '\n\n'.join(lines)
     
-    def extract_text_from_tidy_doc(self, html_content): # TODO: Some filings have <table> elements amongst <p> elements, both with text we need... consider more robust fallback logic upon section parsing
+    def extract_text_from_tidy_doc(self, document): # TODO: Some filings have <table> elements amongst <p> elements, both with text we need... consider more robust fallback logic upon section parsing
         """
         Main function to parse SEC filing HTML content of filing types with known section names.
-        Attempts different parsing strategies until one succeeds.
+        Attempts different parsing strategies until one succeeds, all reading the same parsed document.
+        The lxml engine (parser/lxml_text.py) runs the same strategies on the lxml tree, see settings.HTML_TEXT_ENGINE. It always parses with lxml,
+        settings.HTML_SOUP_PARSER only applies to the BeautifulSoup strategies.
         
         Args:
-            html_content: Raw HTML content of the SEC filing
+            document: HtmlDocument of the SEC filing's main document
             
         Returns:
             Text content with paragraphs separated by double newlines
         """
+        if settings.HTML_TEXT_ENGINE == 'lxml':
+            return lxml_text.extract_text_from_tidy_doc(document.tree, self.type)
+
+        soup = document.soup
         strategies = [
             self.tidy_parse_with_p_tags,
             self.tidy_parse_with_div_tags,
@@ -643,7 +673,7 @@ class MasterParserClass:
         
         for strategy in strategies:
             logging.info(f'Attempting to extract tidy {self.type} filing text using: {strategy}')
-            result = strategy(html_content)
+            result = strategy(soup)
             if result.strip():  # If we got meaningful content
                 logging.info(f'Successfully extracted text from tidy {self.type} filing.\nStrategy used: {strategy}')
                 return result
@@ -652,31 +682,9 @@ class MasterParserClass:
 
     def normalize_unicode(self, text: str) -> str:
         """
-        Normalize Unicode text while preserving meaningful punctuation like dashes
+        Normalize Unicode text while preserving meaningful punctuation like dashes (see parser/text_normalize.py)
         """
-        # Normalize Unicode (convert to NFKD form)
-        text = unicodedata.normalize('NFKD', text)
-        
-        # Process each character
-        cleaned_chars = []
-        for ch in text:
-            if ch == '\n':
-                # Preserve newlines
-                cleaned_chars.append(ch)
-            elif ch == '\xa0':
-                # Convert non-breaking space to regular space
-                cleaned_chars.append(' ')
-            elif unicodedata.category(ch) == 'Cc' and ch != '\t':
-                # Replace only ASCII control characters (category Cc) except tab
-                cleaned_chars.append(' ')
-            elif unicodedata.category(ch).startswith('Z') and ch != ' ':
-                # Replace other space-like characters except normal space
-                cleaned_chars.append(' ')
-            else:
-                # Preserve all other characters including dashes and hyphens
-                cleaned_chars.append(ch)
-        
-        return ''.join(cleaned_chars)
+        return text_normalize.normalize_unicode(text)
     
     def normalize_extracted_text(self, text_str, newlines_to_spaces=True):
         '''
@@ -692,13 +700,13 @@ class MasterParserClass:
         normalized_text = re.sub(r'\n{3,}', '\n\n', normalized_text)
         return normalized_text
     
-    def extract_and_normalize_tidy_doc_text(self, html_content):
+    def extract_and_normalize_tidy_doc_text(self, document):
         '''
         Extracts and normalizes the text of a tidy/known-section-names style filing document, notably with double newlines (\n\n) between paragraphs, section headings, etc.
         Later parsing regex relies on the existence of these double newline delimiters. 
         '''
         logging.info(f'Attempting to extract text from tidy filing type {self.type}.')
-        extracted_text = self.extract_text_from_tidy_doc(html_content)
+        extracted_text = self.extract_text_from_tidy_doc(document)
         logging.info(f'Normalizing and returning extracted text.')
         return self.normalize_extracted_text(extracted_text, True)
     
@@ -716,8 +724,7 @@ class MasterParserClass:
         :returns: An iterator over the header and text for each part extracted from the form plain text.
             (e.g. for 10-K forms, we iterate through Part I through Part IV)
         """
-        pattern = '((^PART|^Part|\n\nPART|\n\nPart) [IVXLCDM]+).*?(\n\n.*?)(?=\n\n(PART|Part) [IVXLCDM]+.*?\n\n|$)'
-        return ((_.group(1).strip(), _.group(3)) for _ in re.finditer(pattern, form_text, re.DOTALL))
+        return tidy_sections.split_parts(form_text)
     
     def extract_indiv_tidy_sections(self, part_header, part_text, form_type, expected_sections):
         """Extracts the item/section header and its corresponding text for every item within the plain text of a "part" of a form.
@@ -737,36 +744,14 @@ class MasterParserClass:
             for each item in the "part". part_header is included to differentiate 
             between portions of a filing that have the same item number but are in different parts.
         """
-        if form_type in ["10-k", "10-k/a", "10-q", "10-q/a"]:
-            #pattern = '(?P<header>(\n\n(ITEM|Item) \d+[A-Z]*.*?)\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item) \d+[A-Z]*.*?)\n\n|$)'
-            #pattern = r'(?P<header>(\n\n(ITEM|Item)\s+\d+[A-Z]*\b.*?)\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item)\s+\d+[A-Z]*\b.*?)\n\n|$)'
-            pattern = r'(?P<header>\n\n(ITEM|Item)\s+\d+[A-Z]?\.*.*?\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item)\s+\d+[A-Z]?\.*.*?\n\n|$))'
-            regex = re.compile(pattern, re.DOTALL)
-        elif form_type in ["8-k", "8-k/a"]:
-            #pattern = '(?P<header>\n\n(ITEM|Item)\s+\d+\.\d+\.*)(?P<text>.*?)(?=((\n\n(ITEM|Item)\s+\d+\.\d+.*?)\n\n|$))' # <- only grabs Item X.XX, not text after, requires no processing of header in items_to_df_row
-            pattern = r'(?P<header>\n\n(ITEM|Item)\s+\d+\.\d+\.*.*?\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item)\s+\d+\.\d+\.*.*?\n\n|$))'
-            regex = re.compile(pattern, re.DOTALL)
-        elif form_type in ['s-1', 's-1/a', 's-3', 's-3/a']:
-            # Build a regex that looks for all S-1 section headers with double newlines before/after
-            #pattern = rf'(?P<header>\n\n(?:{"|".join(re.escape(h) for h in columns)}))\n\n(?P<text>.*?)(?=\n\n(?:{"|".join(re.escape(h) for h in columns)})\n\n|$)'
-            pattern = rf'(?P<header>\n\n(?:{"|".join(re.escape(h) for h in expected_sections)})\s*\n\n)(?P<text>.*?)(?=\n\n(?:{"|".join(re.escape(h) for h in expected_sections)})\s*\n\n|$)'
-            # Case-insensitive
-            regex = re.compile(pattern, re.IGNORECASE | re.DOTALL)
-        elif form_type in ['sc 13d', 'sc 13d/a']:
-            pattern = r'(?P<header>\n\n(ITEM|Item)\s+\d+\.*.*?\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item)\s+\d+\.*.*?\n\n|$))'
-            regex = re.compile(pattern, re.DOTALL)
-        elif form_type in ['sc 13g', 'sc 13g/a']:
-            pattern = r'(?P<header>\n\n(ITEM|Item)\s+\d+(?:\([a-z]\))?.*?\n\n)(?P<text>.*?)(?=(\n\n(ITEM|Item)\s+\d+(?:\([a-z]\))?.*?\n\n|$))'
-            regex = re.compile(pattern, re.DOTALL)
-        else: 
-            regex = None
+        # Compiled once per form type (see parser/tidy_sections.py), headers are located in one pass and the text between them sliced
+        pattern, whole_header = tidy_sections.header_pattern_for(form_type, expected_sections)
+        if not pattern:
             logging.error(f'Unsupported form type {form_type} passed to extract_indiv_tidy_sections, unsure of section header format. Expecting a filing of known tidy types: {self.tidy_filing_types}')
-        
-        if not regex:
             return None
         
         logging.info(f'Chose regex for section/item extraction based on type: {form_type}.')
-        return ((part_header, _.group('header').strip(), _.group('text').strip()) for _ in regex.finditer(part_text))
+        return ((part_header, header, text) for header, text in tidy_sections.split_sections(pattern, part_text, whole_header))
     
     def get_tidy_sections(self, form_text, form_type, expected_sections): 
         """Extracts the item header and its corresponding text for every item within a form's plaintext.
@@ -821,32 +806,22 @@ class MasterParserClass:
         
         :rtype: DataFrame
         """
-        section_rows = []
         section_dict = {} # Used to ensure we only save last occurance of each section (TOC causes false positives)
+        known_headers = {x.lower() for x in known_list}
+        # Part I Item 1 / Item 1A / Item 1.01 / Item 1(a) part of the header, per form type (S-1 / S-3 headers are used whole)
+        header_pattern = tidy_sections.PROCESSED_HEADER_PATTERNS.get(form_type)
+        is_named_type = form_type in tidy_sections.NAMED_HEADER_FORM_TYPES
 
         for part_header, section_header, text in sections_list:
             processed_header = (part_header.lower() + " " + section_header.lower()).strip() 
-            if form_type in ["10-q", "10-q/a"]:
-                processed_header = re.search("part\s+[ivxlcdm]+\s+item\s+\d+[a-z]*", processed_header).group(0)
-            elif form_type in ["10-k", "10-k/a"]:
-                processed_header = re.search("item\s+\d+[a-z]*", processed_header).group(0)
-            elif form_type in ["8-k", "8-k/a"]:
-                if processed_header[-1] == ".":
+            if header_pattern:
+                if form_type in ["8-k", "8-k/a"] and processed_header[-1] == ".":
                     processed_header = processed_header[:-1] # Some companies will include a period at the end of the header while others don't 
-                # Testing, we just want the Item X.XX part 
-                processed_header = re.search("item\s+\d+\.\d+", processed_header).group(0)
-            elif form_type in ["s-1", "s-1/a", "s-3", "s-3/a"]:
-                pass # No additional normalization needed here, already stripped and lowercased
-            elif form_type in ['sc 13d', 'sc 13d/a']:
-                # Only want Item X part
-                processed_header = re.search("item\s+\d+", processed_header).group(0)
-            elif form_type in ['sc 13g', 'sc 13g/a']:
-                # We want Item X with optional '(y)' afterwards
-                processed_header = re.search(r'item\s+\d+(?:\([a-z]\))?', processed_header).group(0)
-            else:
+                processed_header = header_pattern.search(processed_header).group(0)
+            elif not is_named_type:
                 logging.error(f'Unsupported form type {form_type} passed to tidy_sections_to_df_row, unsure how to process section {processed_header}. Expecting a filing of known tidy types: {self.tidy_filing_types}')
         
-            if processed_header in [x.lower() for x in known_list]:
+            if processed_header in known_headers:
                 # Create row in DF with accession_number column from self.filing_info['accession_number'].iloc[0], section_name column with processed_header, section_meaning column with header_mappings, and section_text column with text
                 if processed_header in section_dict.keys():
                     logging.info(f'Over-writing previous {processed_header} row, found a subsequent occurence.')
@@ -865,17 +840,10 @@ class MasterParserClass:
         logging.info(f'Finished building tidy sections dataframe for {form_type} filing.')
         return pd.DataFrame(section_rows)
 
-    def parse_doc_named_sections(self, html_content, form_type): 
+    def get_known_sections(self, form_type):
         '''
-        Returns a dataframe with one record per extracted section, with an accession_number column for linking to filing info. 
-        Section names and meanings will vary based on form/filing type.
+        Returns (known section headers, header mappings or None) for a tidy form type.
         '''
-        logging.info(f"Parsing main document of {form_type} filing {self.filing_info['accession_number'].iloc[0]} for known named sections.")
-        normalized_text = self.extract_and_normalize_tidy_doc_text(html_content)
-        if not normalized_text.strip():
-            raise ValueError('Failed to extract meaningful text from HTML content.')
-        logging.info(f'Extracted and normalized document text.')
-        
         header_mappings = None
         if form_type in ["10-k", "10-k/a"]:
             known_sections = MasterParserClass.headers_10K
@@ -895,7 +863,21 @@ class MasterParserClass:
             known_sections = MasterParserClass.headers_13G
             header_mappings = MasterParserClass.header_mappings_13G
         else: 
-            raise ValueError(f"Unsupported form type {form_type} fed to parse_doc_items. Expecting a 'tidy' type: {MasterParserClass.tidy_filing_types}")
+            raise ValueError(f"Unsupported form type {form_type} fed to get_known_sections. Expecting a 'tidy' type: {MasterParserClass.tidy_filing_types}")
+        return known_sections, header_mappings
+
+    def parse_doc_named_sections(self, document, form_type): 
+        '''
+        Returns a dataframe with one record per extracted section, with an accession_number column for linking to filing info. 
+        Section names and meanings will vary based on form/filing type. Takes the HtmlDocument of the main document.
+        '''
+        logging.info(f"Parsing main document of {form_type} filing {self.filing_info['accession_number'].iloc[0]} for known named sections.")
+        normalized_text = self.extract_and_normalize_tidy_doc_text(document)
+        if not normalized_text.strip():
+            raise ValueError('Failed to extract meaningful text from HTML content.')
+        logging.info(f'Extracted and normalized document text.')
+        
+        known_sections, header_mappings = self.get_known_sections(form_type)
         logging.info(f'Chose possible sections list and header mappings based on tidy filing type ({self.type}).\nSections: {known_sections}\nHeader mappings: {header_mappings}')
         
         tidy_sections = self.get_tidy_sections(normalized_text, form_type, known_sections)
@@ -921,13 +903,16 @@ class MasterParserClass:
             if doc.get('doc_filename', '').lower().endswith('.htm') and doc.get('doc_type', '').lower() == self.type.lower():
                 logging.info(f'Found main filing document: {doc.get("doc_filename", "")} of type {self.type}.')
 
+                # Parsed once, shared by the named section strategies and the TOC fallback
+                document = HtmlDocument(doc.get('doc_text', ''))
+
                 # Look for known sections
-                named_sections_df = self.parse_doc_named_sections(doc.get('doc_text', ''), self.type.lower()) 
+                named_sections_df = self.parse_doc_named_sections(document, self.type.lower()) 
                 if not named_sections_df.empty:
                     return named_sections_df
                 else:
                     logging.warning(f"Falling back to TOC style parsing of tidy type filing {self.filing_info['accession_number'].iloc[0]}.")
-                    toc_sections = self.get_toc_sections(doc.get('doc_text', ''))
+                    toc_sections = self.get_toc_sections(document)
                     if toc_sections:
                         logging.info(f'Building tidy sections dataframe with TOC method results.')
                         
@@ -1049,7 +1034,7 @@ class MasterParserClass:
                 logging.info(f'Identified {doc.get("doc_type")} exhibit document {doc.get("doc_filename")} of {self.type} filing.')
 
                 # Get document text
-                soup = BeautifulSoup(doc.get('doc_text', ''), 'html.parser')
+                soup = HtmlDocument(doc.get('doc_text', '')).soup
                 if not soup:
                     logging.error(f'Invalid exhibit document HTML encountered, unable to parse.')
                     continue
@@ -1090,128 +1075,115 @@ class MasterParserClass:
             'name_changes': []
         }
 
-        header_text = self.extract_sec_header(self.fulltext)
-        if not header_text:
+        if not self.sec_header:
             logging.error('Failed to extract SEC header from filing content.')
             return pd.DataFrame([subject_info])
         
-        subject_match = re.search(r'SUBJECT COMPANY:(.+?)(?:FILED BY:|FILER:|</SEC-HEADER>)', header_text, re.IGNORECASE | re.DOTALL)
-        if not subject_match:
+        subject = self.sec_header.first_entity('SUBJECT COMPANY')
+        if not subject:
             logging.error('Subject company section not found in SEC header.')
             return pd.DataFrame([subject_info])
 
-        subject_block = subject_match.group(1)
-
-        patterns = {
-            'company_name': r'COMPANY CONFORMED NAME:\s*(.+)',
-            'cik': r'CENTRAL INDEX KEY:\s*(\d+)',
-            'org_name': r'ORGANIZATION NAME:\s*(.+)',
-            'sec_file_num': r'SEC FILE NUMBER:\s*([^\n\r]+)',
-            'film_num': r'FILM NUMBER:\s*(\d+)',
-            'state_of_incorp': r'STATE OF INCORPORATION:\s*(\w+)',
-            'fiscal_yr_end': r'FISCAL YEAR END:\s*(\d+)',
-            'business_phone': r'BUSINESS PHONE:\s*(.+)'
+        # Subject company fields, with the part of the value we keep
+        subject_fields = {
+            'company_name': ('COMPANY CONFORMED NAME', None),
+            'cik': ('CENTRAL INDEX KEY', r'\d+'),
+            'org_name': ('ORGANIZATION NAME', None),
+            'sec_file_num': ('SEC FILE NUMBER', None),
+            'film_num': ('FILM NUMBER', r'\d+'),
+            'state_of_incorp': ('STATE OF INCORPORATION', r'\w+'),
+            'fiscal_yr_end': ('FISCAL YEAR END', r'\d+'),
+            'business_phone': ('BUSINESS PHONE', None)
         }
 
-        for key, pattern in patterns.items():
-            match = re.search(pattern, subject_block, re.IGNORECASE)
-            if match:
-                subject_info[key] = match.group(1).strip()
+        for key, (header_key, pattern) in subject_fields.items():
+            value = subject.field(header_key)
+            if value and pattern:
+                value = self.match_header_value(pattern, value)
+
+            if value:
+                subject_info[key] = value
             else:
                 logging.warning(f'Subject field not found: {key}.')
 
         # SIC parsing
-        sic_match = re.search(r'STANDARD INDUSTRIAL CLASSIFICATION:\s*(.+?)\s*\[(\d{4})\]', subject_block, re.IGNORECASE)
+        sic_whole = subject.field('STANDARD INDUSTRIAL CLASSIFICATION')
+        sic_match = re.match(r'(.+?)\s*\[(\d{4})\]', sic_whole) if sic_whole else None
         if sic_match:
             subject_info['sic_desc'] = sic_match.group(1).strip()
             subject_info['sic_code'] = sic_match.group(2).strip()
         else:
             logging.warning('SIC code or description not found in beneficial ownership subject section.')
 
-        # Business address parsing
-        address_fields = ['street1', 'street2', 'city', 'state', 'zip']
-        addr_data = {}
-
-        for field in address_fields:
-            pattern = rf'{field.replace("street", "STREET ").replace("city", "CITY").replace("state", "STATE").replace("zip", "ZIP")}:\s*(.+)'
-            match = re.search(pattern, subject_block, re.IGNORECASE)
-            if match:
-                addr_data[field] = match.group(1).strip()
-            else:
-                addr_data[field] = None
-
-        subject_info['business_address'] = ', '.join([v for v in addr_data.values() if v])
+        # Business address parsing, the mailing address if there's no business address
+        subject_info['business_address'] = self.parse_header_address(subject, 'BUSINESS ADDRESS')
+        if subject_info['business_address'] is None:
+            subject_info['business_address'] = self.parse_header_address(subject, 'MAIL ADDRESS') or ''
 
         # Former company names
-        former_name_matches = re.finditer(
-            r'FORMER COMPANY:\s*FORMER CONFORMED NAME:\s*(.+?)\s*DATE OF NAME CHANGE:\s*(\d{8})',
-            subject_block,
-            re.IGNORECASE | re.DOTALL
-        )
-        for match in former_name_matches:
-            subject_info['name_changes'].append({
-                'former_name': match.group(1).strip(),
-                'date_of_change': match.group(2).strip()
-            })
+        subject_info['name_changes'] = self.parse_header_name_changes(subject)
 
         logging.info('Finished parsing beneficial ownership subject company section.')
         return pd.DataFrame([subject_info])
 
-    def parse_pdf_to_df(self, decoded_pdf: io.BytesIO):
+    def parse_pdf_to_df(self, pdf_bytes: bytes):
         '''
         Utilizes PyMuPDF to parse uudecoded PDF contents, 
         returning a dataframe with one row per PDF section or page.
+        The PDF's metadata is stored once, on its first row, the other rows' pdf_metadata is None.
         TODO: Possibly grab images too
         '''
         try:
-            pdf_mu = pymupdf.open(stream=decoded_pdf, filetype='pdf')
+            pdf_mu = pymupdf.open(stream=pdf_bytes, filetype='pdf')
 
             logging.info('Parsing PDF with PyMuPDF.')
         except Exception as e:
             logging.error(f'Failed to open PDF with PyMyPDF and grab metadata. Error: {e}.')
             return pd.DataFrame()
         
-        metadata = pdf_mu.metadata
-        metadata['num_pages'] = len(pdf_mu)
-        
+        with pdf_mu:
+            metadata = pdf_mu.metadata
+            metadata['num_pages'] = len(pdf_mu)
+
+            # Every page's text is extracted once, sections are joins of page ranges of it
+            page_texts = pdf_text.extract_page_texts(pdf_mu, pdf_bytes)
+            toc = pdf_mu.get_toc()
+
+        accession_number = self.filing_info['accession_number'].iloc[0]
         pdf_sections = []
-        toc = pdf_mu.get_toc()
         if toc:
             logging.info(f'Found PDF table of contents, will save section text accordingly.')
             for i, (level, title, start_page) in enumerate(toc):
                 logging.info(f'Parsing PDF section: {title}.')
 
                 start_page -= 1 # Convert to 0-based
-                end_page = toc[i + 1][2] - 1 if i + 1 < len(toc) else len(pdf_mu)
-
-                text = ''
-                for p in range(start_page, end_page):
-                    text += pdf_mu.load_page(p).get_text()
+                end_page = toc[i + 1][2] - 1 if i + 1 < len(toc) else len(page_texts)
 
                 pdf_section = {
-                    'accession_number': self.filing_info['accession_number'].iloc[0],
-                    'pdf_metadata': metadata,
+                    'accession_number': accession_number,
+                    'pdf_metadata': None,
                     'start_page': start_page,
                     'end_page': end_page,
                     'section_name': title,
-                    'text': text.strip()
+                    'text': ''.join([page_texts[p] for p in range(start_page, end_page)]).strip()
                 }
                 pdf_sections.append(pdf_section)
         else:
-            logging.info(f'No PDF table of contents found, saving text per page.')
-            for i in range(len(pdf_mu)):
-                logging.info(f'Parsing PDF page {i+1}/{len(pdf_mu)}.')
-
+            logging.info(f'No PDF table of contents found, saving text per page ({len(page_texts)} pages).')
+            for i, page_text in enumerate(page_texts):
                 pdf_page = {
-                    'accession_number': self.filing_info['accession_number'].iloc[0],
-                    'pdf_metadata': metadata,
+                    'accession_number': accession_number,
+                    'pdf_metadata': None,
                     'start_page': i,
                     'end_page': i,
                     'section_name': 'page',
-                    'text': pdf_mu.load_page(i).get_text().strip()
+                    'text': page_text.strip()
                 }
                 pdf_sections.append(pdf_page)
 
+        if pdf_sections:
+            pdf_sections[0]['pdf_metadata'] = metadata
+
         return pd.DataFrame(pdf_sections)
     
     def parse_pdfs(self):
@@ -1228,17 +1200,10 @@ class MasterParserClass:
             if doc.get('doc_filename', '').lower().endswith('.pdf'):
                 logging.info(f'Found a PDF file, going to attempt to parse: {doc["doc_filename"]}.')
 
-                # Contents come UUencoded (represent PDF in ASCII chars)
-                encoded_pdf_content = re.sub(r'</?pdf>', '', doc.get('doc_text', ''), flags=re.IGNORECASE)
-                
-                uu_encoded_bytes = io.BytesIO(encoded_pdf_content.encode('ascii'))
-                pdf_bytes = io.BytesIO()
-
+                # Contents come UUencoded (represent PDF in ASCII chars), wrapped in <PDF> tags that decode_uu skips over with the rest of the lines before begin
                 try:
-                    # Decode and write PDF content to BytesIO object
-                    uu.decode(uu_encoded_bytes, pdf_bytes)
-                    pdf_bytes.seek(0) # Reset pointer
-                except Exception as e:
+                    pdf_bytes = pdf_text.decode_uu(doc.get('doc_text', ''))
+                except (ValueError, UnicodeEncodeError) as e:
                     logging.error(f'Failed to decode UUencoded data. Error: {e}.')
                     continue
                 logging.info(f'UU-decoded PDF contents.')
@@ -1280,44 +1245,6 @@ class MasterParserClass:
 
         return is_roman
     
-    def text_between_tags(self, start, end):
-        '''
-        Helper method to find_section_with_toc, extracts the text found inbetween 2 bs4 Tags/elements.
-        '''
-        cur = start
-        found_text = ""
-
-        # Loop through all elements inbetween the two
-        while cur and cur != end:
-            if isinstance(cur, NavigableString):
-
-                text = cur.strip()
-                if len(text):
-                    found_text += "{} ".format(text)
-
-            cur = cur.next_element
-
-        return self.normalize_extracted_text(found_text.strip(), False) # Strip trailing space that the above pattern will result in
-    
-    def text_starting_at_tag(self, start):
-        '''
-        Helper method to find_section_with_toc, extracts the text found starting at a given tag through the end of the soup.
-        '''
-        cur = start
-        found_text = ""
-
-        # Loop through all elements
-        while cur:
-            if isinstance(cur, NavigableString):
-
-                text = cur.strip()
-                if len(text):
-                    found_text += "{} ".format(text)
-
-            cur = cur.next_element
-
-        return self.normalize_extracted_text(found_text.strip(), False)
-    
     def find_sections_with_toc(self, document_soup, toc_soup):
         """
         Use the hyperlinked TOC to find text sections. 
@@ -1348,43 +1275,81 @@ class MasterParserClass:
 
             link_dict[link_tag.get('href').replace('#', '')] = self.normalize_extracted_text(link_tag.text.strip(), True)
 
-        # Grab a list of destination anchors (<a> or <div> tags with "id" or "name" attribute)
-        link_dests = document_soup.find_all('a', attrs = { 'id' : True }) + document_soup.find_all('a', attrs = { 'name' : True })\
-        + document_soup.find_all('div', attrs = { 'id' : True }) + document_soup.find_all('div', attrs = { 'name' : True })
-
-        # Filter out those which are never linked to, they will obstruct our logic in text_between_tags as we rely on the next anchor to be the beginning of the next section
+        # One walk of the document: the position of every element, the non-empty stripped strings with their positions,
+        # and the destination anchors (<a> or <div> tags with "id" or "name" attribute), grouped as a[id], a[name], div[id], div[name]
+        positions = {}
+        string_positions = []
+        string_texts = []
+        anchor_groups = { ('a', 'id'): [], ('a', 'name'): [], ('div', 'id'): [], ('div', 'name'): [] }
+        for position, element in enumerate(document_soup.descendants):
+            if isinstance(element, NavigableString):
+                text = element.strip()
+                if text:
+                    string_positions.append(position)
+                    string_texts.append(text)
+            elif element.name in ('a', 'div'):
+                positions[id(element)] = position
+                for attr in ('id', 'name'):
+                    if element.get(attr) is not None:
+                        anchor_groups[(element.name, attr)].append(element)
+        link_dests = [anchor for group in anchor_groups.values() for anchor in group]
+
+        # Filter out those which are never linked to, they will obstruct our logic in section_text as we rely on the next anchor to be the beginning of the next section
         # I have run into filings with such "phantom" anchors that are never linked to and can prematurely signal the end of a section
         # (i.e: https://www.sec.gov/Archives/edgar/data/1331451/000133145118000076/0001331451-18-000076.txt)
         link_dests = [anchor for anchor in link_dests if (anchor.get('id') in link_dict.keys() or anchor.get('name') in link_dict.keys())]
 
-        # Now loop through the target sections that we just found links to. We will try to locate the destination of each
+        # id / name value -> indices in link_dests, instead of scanning every destination for every link
+        dest_indices = {}
+        for dest_index, link_dest in enumerate(link_dests):
+            for value in { link_dest.get('id'), link_dest.get('name') }:
+                if value in link_dict:
+                    dest_indices.setdefault(value, []).append(dest_index)
+
+        # Destinations with the same tag, id and name, which may also be equal as bs4 compares tags (markup, not identity)
+        same_key_dests = {}
+        for link_dest in link_dests:
+            same_key_dests.setdefault((link_dest.name, link_dest.get('id'), link_dest.get('name')), {})[id(link_dest)] = link_dest
+        stop_positions_cache = {}
+
+        def stop_positions(end_tag):
+            # Sorted positions of end_tag and of every destination equal to it, a section ends at the first of them from its start
+            if id(end_tag) not in stop_positions_cache:
+                candidates = same_key_dests[(end_tag.name, end_tag.get('id'), end_tag.get('name'))].values()
+                stop_positions_cache[id(end_tag)] = sorted(positions[id(c)] for c in candidates if c is end_tag or c == end_tag)
+            return stop_positions_cache[id(end_tag)]
+
+        def section_text(start_tag, end_tag):
+            # Text of the strings from start_tag up to the first tag equal to end_tag, itself included, or through the end of the document if
+            # there is none from start_tag on (link_dests is not in document order, a[...] anchors come before div[...] ones)
+            start = positions[id(start_tag)]
+            first = bisect.bisect_left(string_positions, start)
+            last = len(string_texts)
+            if end_tag is not None:
+                stops = stop_positions(end_tag)
+                stop_index = bisect.bisect_left(stops, start)
+                if stop_index < len(stops):
+                    last = bisect.bisect_left(string_positions, stops[stop_index])
+            return self.normalize_extracted_text(' '.join(string_texts[first:last]), False)
+
+        # Now loop through the target sections that we just found links to, and take the text between each destination and the next one in link_dests
+        # If we are on the last destination, grab all the text left
+        num_destinations = len(link_dests)
         for target_href, target_name in link_dict.items():
+            for dest_index in dest_indices.get(target_href, []): # Can be either id or name according to HTML spec (see https://stackoverflow.com/questions/484719/should-i-make-html-anchors-with-name-or-id)
 
-            # The href values are used at their destination in <a> tags with an id/name attribute of the same href value (minus the leading #, why we got rid of it)
-            # Loop through the link_dests list of all destination tags, and find the one with id/name=target_href
-            num_destinations = len(link_dests)
-            for dest_index, link_dest in enumerate(link_dests):
+                next_dest = link_dests[dest_index + 1] if dest_index + 1 < num_destinations else None
+                section_text_found = section_text(link_dests[dest_index], next_dest)
 
-                if (link_dest.get('id') == target_href or link_dest.get('name') == target_href): # Can be either id or name according to HTML spec (see https://stackoverflow.com/questions/484719/should-i-make-html-anchors-with-name-or-id)
+                if section_text_found:
 
-                    # Grab the text inbetween the current destination tag and the next occuring destination in link_dests
-                    # If we are on the last destination, grab all the text left
-                    section_text = ""
+                    section_info = {}
+                    section_info['section_name'] = target_name
+                    section_info['section_raw_text'] = None
+                    section_info['section_parsed_text'] = section_text_found
 
-                    if dest_index + 1 < num_destinations:
-                        section_text = self.text_between_tags(link_dest, link_dests[dest_index + 1])
-                    else:
-                        section_text = self.text_starting_at_tag(link_dest)
-
-                    if section_text:
-
-                        section_info = {}
-                        section_info['section_name'] = target_name
-                        section_info['section_raw_text'] = None
-                        section_info['section_parsed_text'] = section_text
-
-                        # Add to master list
-                        section_list.append(section_info)
+                    # Add to master list
+                    section_list.append(section_info)
 
         return section_list
     
@@ -1405,9 +1370,9 @@ class MasterParserClass:
 
         return None
     
-    def get_toc_sections(self, doc_html):
+    def get_toc_sections(self, document):
         '''
-        Attempts to locate and crawl the hyperlinked table of contents of an HTML document.
+        Attempts to locate and crawl the hyperlinked table of contents of an HtmlDocument.
         Returns: A list of dicts for TOC sections if found, (in the case none is found, will be a single dict for the whole document's text)
         '''
         sections_list = []
@@ -1415,7 +1380,7 @@ class MasterParserClass:
         logging.info(f'Parsing filing HTML document for TOC.')
 
         # Parse using TOC if it exists
-        soup = BeautifulSoup(doc_html, 'html.parser')
+        soup = document.soup
         toc_tag = self.linked_toc_exists(soup)
         if toc_tag:
             # TODO: better handling of table data
@@ -1467,13 +1432,13 @@ class MasterParserClass:
 
         return sections_list
     
-    def parse_doc_toc(self, html_content, form_type):
+    def parse_doc_toc(self, document, form_type):
         '''
-        Builds a dataframe of text sections extracted from the hyperlinked table of contents of an HTML document,
+        Builds a dataframe of text sections extracted from the hyperlinked table of contents of an HtmlDocument,
         or the whole document as one section if unable to locate/walk a table of contents.
         '''
         logging.info(f'Attempting to parse main document of {form_type} filing for a hyperlinked table of contents.')
-        sections_list = self.get_toc_sections(html_content)
+        sections_list = self.get_toc_sections(document)
         logging.info(f'Extracted TOC sections of {form_type} filing.')
 
         for section in sections_list:
@@ -1496,7 +1461,7 @@ class MasterParserClass:
             if doc.get('doc_filename', '').lower().endswith('.htm') and doc.get('doc_type', '').lower() == self.type.lower():
                 logging.info(f'Found main filing document: {doc.get("doc_filename", "")} of type {self.type}.')
 
-                return self.parse_doc_toc(doc.get('doc_text', ''), self.type)
+                return self.parse_doc_toc(HtmlDocument(doc.get('doc_text', '')), self.type)
 
         logging.error(f'Failed to find main HTML document for {self.type} filing.')
         return pd.DataFrame() 
@@ -1574,104 +1539,59 @@ class MasterParserClass:
 
         return report_info
     
-    def parse_it_element_soup(self, element):
+    def resolve_hr_manager_names(self, other_mgrs, mgr_df):
         '''
-        Returns a dictionary from the given bs4 <infotable> element of a holdings report. 
+        Given the <otherManager> values of a holdings report's holdings, returns the name of the manager of each holding (a series aligned with other_mgrs),
+        for the manager_name column. Resolved for all holdings at once:
+        - Empty or 0: the filing manager (seems to be what 0 means...)
+        - Non-numeric: already a manager name. In some filings with no other managers on the primary XML, <othermanager> holds the filing manager name redundantly
+        - Any other number: the other manager with that sequence number in the manager dataframe, the number itself if there is none (improper use of the field by the filer)
         '''
-        holding = {
-        "issuer": "",
-        "holding_class": "",
-        "cusip": "",
-        "value": "",
-        "amount": "",
-        "amt_type": "",
-        "discretion": "",
-        "sole_vote": "",
-        "shared_vote": "",
-        "no_vote": "",
-        "figi": "",
-        "other_mgr": "",
-        "option_type": ""
-        }
-        try:
-            holding["issuer"] = element.find(re.compile('nameofissuer')).text.strip()
-            holding["holding_class"] = element.find(re.compile('titleofclass')).text.strip()
-            holding["cusip"] = element.find(re.compile('cusip')).text.strip()
-            holding["value"] = element.find(re.compile('value')).text.strip()
-            holding["amount"] = element.find(re.compile('sshprnamt')).text.strip()
-            holding["amt_type"] = element.find(re.compile('sshprnamttype')).text.strip()
-            holding["discretion"] = element.find(re.compile('investmentdiscretion')).text.strip()
-
-            vote_auth = element.find(re.compile('votingauthority'))
-            if vote_auth:
-                holding["sole_vote"] = vote_auth.find(re.compile('sole')).text.strip()
-                holding['shared_vote'] = vote_auth.find(re.compile('shared')).text.strip()
-                holding['no_vote'] = vote_auth.find(re.compile('none')).text.strip()
-            else:
-                logging.error('Failed to find voting authority XML element for holding entry, which should be mandatory.')
+        other_mgrs = other_mgrs.fillna('').astype(str)
+        manager_names = other_mgrs.astype(object)
 
-            # Optional
-            holding['figi'] = element.find(re.compile('figi')).text.strip() if element.find(re.compile('figi')) else ''
-            holding['other_mgr'] = element.find(re.compile('othermanager')).text.strip() if element.find(re.compile('othermanager')) else ''
-            holding['option_type'] = element.find(re.compile('putcall')).text.strip() if element.find(re.compile('putcall')) else ''
-        
-        except AttributeError as e:
-            logging.warning(f"Error extracting holding details: {e}. Holding data may be incomplete.") 
-        
-        return holding
-    
-    def get_hr_rows_iter(self, it_elements, mgr_df):
-        '''
-        Given a list of <infotable> elements, it generates dictionary objects. 
-        Each containing the details of one holding as well as accession number for filing ID, for use as a dataframe row.
-        '''
-        for i, infotable in enumerate(it_elements):
-            holding_dict = self.parse_it_element_soup(infotable)
-
-            # Look up manager name
-            other_mgr = holding_dict.get('other_mgr', '0')
-            if not other_mgr or other_mgr == '0': # No <othermanager> or was set to 0 (seems to mean filing manager...)
-                logging.info(f'<othermanager> value of {other_mgr} seems to refer to filing manager. Recording holding accordingly.')
-                holding_dict['manager_name'] = mgr_df['filing_mgr_name'].iloc[0]
-            elif not other_mgr.isnumeric(): # In some filings with no other managers on primary XML, <othermanager> on infotable holds filing manager name redundantly
-                logging.info(f'Non-numeric <othermanager> value {other_mgr}, most likely refers to manager by name. Recording holding accordingly.')
-                holding_dict['manager_name'] = other_mgr
-            else: # If it is a number other than 0, refer to the manager dataframe
-                logging.info(f'Processing holding of manager #{other_mgr}. Referring to manager dataframe.')
-                if not mgr_df.empty:
-                    if not mgr_df.loc[mgr_df['mgr_seq'].astype(int) == int(other_mgr), 'mgr_name'].empty:
-                        holding_dict['manager_name'] = mgr_df.loc[mgr_df['mgr_seq'].astype(int) == int(other_mgr), 'mgr_name'].values[0]
-                        logging.info(f'Found corresponding manager in manager dataframe, recording holding accordingly.')
-                    else:
-                        logging.warning(f'Was unable to find manager #{other_mgr} in manager dataframe, most likely improper use of the field by the filer.')
-                        holding_dict['manager_name'] = other_mgr
-                else:
-                    logging.warning(f'Numeric reference to other manager #{other_mgr}, but other manager dataframe is empty...')
-                    holding_dict['manager_name'] = other_mgr
+        is_filing_mgr = other_mgrs.isin(['', '0'])
+        is_seq = ~is_filing_mgr & other_mgrs.str.isnumeric()
+
+        if mgr_df.empty:
+            logging.warning(f'Manager dataframe is empty, holdings of the filing manager get no manager name and other manager numbers are kept as is.')
+            manager_names[is_filing_mgr] = None
+            return manager_names
 
-            holding_dict['accession_number'] = self.filing_info['accession_number'].iloc[0]
-            yield holding_dict
+        manager_names[is_filing_mgr] = mgr_df['filing_mgr_name'].iloc[0]
+
+        # Sequence number -> name, first manager per number
+        mgr_seqs = pd.to_numeric(mgr_df['mgr_seq'], errors='coerce').astype(float)
+        seq_names = pd.Series(mgr_df['mgr_name'].values, index=mgr_seqs.values)
+        seq_names = seq_names[seq_names.index.notna() & ~seq_names.index.duplicated()]
+
+        holding_seqs = pd.to_numeric(other_mgrs.where(is_seq), errors='coerce').astype(float)
+        is_found = is_seq & holding_seqs.isin(seq_names.index)
+        manager_names[is_found] = holding_seqs[is_found].map(seq_names)
+
+        unresolved = int((is_seq & ~is_found).sum())
+        logging.info(f'Resolved managers of {len(other_mgrs)} holdings: {int(is_filing_mgr.sum())} filing manager, {int(is_found.sum())} by sequence number, '
+                     f'{int((~is_filing_mgr & ~is_seq).sum())} by name.')
+        if unresolved:
+            logging.warning(f'{unresolved} holdings refer to other manager numbers missing from the manager dataframe, kept the numbers as manager names.')
+        return manager_names
 
     def parse_hr_it_xml(self, mgr_df, it_xml_content):
         '''
         Returns a dataframe with one row per manager-issuer holding pair reported.
+        The info table is streamed by parser/hr_info_table.py, value, amount and vote columns are nullable integers.
         '''
         logging.info(f'Attempting to parse {self.type} info table XML for holdings information.')
-        soup = BeautifulSoup(it_xml_content, 'lxml')
 
-        outer_table = soup.find(re.compile('informationtable'))
-        if not outer_table:
-            logging.error(f'Failed to find XML <informationtable> element in info table XML. No holdings can be extracted.')
+        holdings = hr_info_table.info_table_to_df(it_xml_content)
+        if holdings.empty:
+            logging.error(f'Failed to parse <informationtable> for <infotable> elements. No holdings can be extracted.')
             return pd.DataFrame()
-        
-        holdings_list = outer_table.find_all(re.compile('infotable'))
-        if not holdings_list:
-            logging.error(f'Failed to parse <informationtable> for child <infotable> elements. No holdings can be extracted.')
-            return pd.DataFrame()
-        
-        hr_rows_iter = self.get_hr_rows_iter(holdings_list, mgr_df)
-        logging.info(f'Got iterator to holdings report rows, building dataframe now.')
-        return pd.DataFrame(hr_rows_iter)
+        logging.info(f'Parsed {len(holdings)} holdings from info table, resolving their managers now.')
+
+        holdings['manager_name'] = self.resolve_hr_manager_names(holdings['other_mgr'], mgr_df)
+        holdings['accession_number'] = self.filing_info['accession_number'].iloc[0]
+        return holdings
         
     def parse_hr_managers(self):
         '''
@@ -0,0 +1,104 @@
+import io
+import logging
+import pandas as pd
+from lxml import etree
+
+'''
+Streaming reader for the information table XML of 13F-HR filings (one <infoTable> per holding, tens of thousands for large managers).
+
+The document is read with lxml.etree.iterparse: fields are matched on their local tag name, lowercased, so any namespace prefix (or none)
+works, each <infoTable> is cleared once its holding is recorded so the tree never holds more than one, and values are appended straight
+to one list per column. The lists become a typed dataframe: value, amount and the three vote counts as nullable integers, text otherwise.
+'''
+
+# Local tag name (lowercase) of an <infoTable> descendant -> holdings column. The first occurrence within a holding is used
+FIELD_COLUMNS = {
+    'nameofissuer': 'issuer',
+    'titleofclass': 'holding_class',
+    'cusip': 'cusip',
+    'value': 'value',
+    'sshprnamt': 'amount',
+    'sshprnamttype': 'amt_type',
+    'investmentdiscretion': 'discretion',
+    'sole': 'sole_vote',
+    'shared': 'shared_vote',
+    'none': 'no_vote',
+    'figi': 'figi',
+    'othermanager': 'other_mgr',
+    'putcall': 'option_type'
+}
+
+HOLDING_COLUMNS = list(FIELD_COLUMNS.values())
+NUMERIC_COLUMNS = ['value', 'amount', 'sole_vote', 'shared_vote', 'no_vote']
+
+# Every holding should have these, the rest are optional
+MANDATORY_COLUMNS = ['issuer', 'holding_class', 'cusip', 'value', 'amount', 'amt_type', 'discretion', 'sole_vote', 'shared_vote', 'no_vote']
+
+def _local_name(tag):
+    return tag.rpartition('}')[2].rpartition(':')[2].lower()
+
+def read_info_table(xml_content):
+    '''
+    Streams an information table document. Returns a dict of column -> list of values (stripped text, '' if missing), one entry per
+    <infoTable> in document order, and the number of holdings missing a mandatory field. (None, 0) if the document can't be parsed.
+    '''
+    data = xml_content.strip().encode('utf-8') # The XML declaration has to be the very first thing
+    columns = {column: [] for column in HOLDING_COLUMNS}
+    missing_mandatory = 0
+    found_outer_table = False
+
+    tag_columns = {} # Tag as lxml reports it -> column, None for tags that aren't fields
+    holding = {}
+    try:
+        for _, element in etree.iterparse(io.BytesIO(data), events=('end',), encoding='utf-8', recover=True, remove_comments=True, remove_pis=True):
+            tag = element.tag
+            if tag not in tag_columns:
+                local_name = _local_name(tag)
+                tag_columns[tag] = FIELD_COLUMNS.get(local_name, local_name if local_name in ('infotable', 'informationtable') else None)
+            column = tag_columns[tag]
+            if column is None:
+                continue
+
+            if column == 'infotable':
+                for name, values in columns.items():
+                    values.append(holding.get(name, ''))
+                if any(name not in holding for name in MANDATORY_COLUMNS):
+                    missing_mandatory += 1
+                holding = {}
+
+                # Drop the holding (and any earlier siblings) from the tree
+                element.clear()
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+            elif column == 'informationtable':
+                found_outer_table = True
+            elif column not in holding:
+                text = element.text if len(element) == 0 else ''.join(element.itertext())
+                holding[column] = text.strip() if text else ''
+    except etree.XMLSyntaxError as e:
+        logging.error(f'Failed to parse info table XML: {e}.')
+        return None, 0
+
+    if not found_outer_table:
+        logging.error(f'Failed to find XML <informationTable> element in info table XML.')
+        return None, 0
+    return columns, missing_mandatory
+
+def info_table_to_df(xml_content):
+    '''
+    Returns a dataframe with one row per <infoTable> of an information table document, numeric columns typed Int64 (NA if missing or not
+    a number). Empty if the document can't be parsed or has no holdings.
+    '''
+    columns, missing_mandatory = read_info_table(xml_content)
+    if not columns or not columns['issuer']:
+        return pd.DataFrame()
+
+    holdings = pd.DataFrame(columns)
+    for column in NUMERIC_COLUMNS:
+        holdings[column] = pd.to_numeric(holdings[column].str.replace(',', '', regex=False), errors='coerce').round().astype('Int64')
+
+    if missing_mandatory:
+        logging.warning(f'{missing_mandatory}/{len(holdings)} holdings are missing mandatory info table fields, recorded with what was present.')
+    return holdings
@@ -0,0 +1,41 @@
+import logging
+from bs4 import BeautifulSoup, FeatureNotFound
+
+import config.settings as settings
+from parser.lxml_text import parse_document
+
+class HtmlDocument:
+    '''
+    One HTML document of a filing, parsed at most once per representation and shared by everything reading it:
+    soup (BeautifulSoup, used by the TOC walker and the bs4 text strategies) and tree (lxml root, used by parser/lxml_text.py).
+    Each is only built when first used, so a document whose text the lxml engine extracts is never turned into a soup.
+    '''
+
+    def __init__(self, html_content):
+        self.html = html_content
+        self._soup = None
+        self._tree = None
+        self._tree_parsed = False
+
+    @property
+    def soup(self):
+        '''
+        BeautifulSoup tree using the settings.HTML_SOUP_PARSER backend, falling back to html.parser if it isn't installed.
+        '''
+        if self._soup is None:
+            try:
+                self._soup = BeautifulSoup(self.html, settings.HTML_SOUP_PARSER)
+            except FeatureNotFound:
+                logging.warning(f'HTML parser backend {settings.HTML_SOUP_PARSER} is not installed, falling back to html.parser.')
+                self._soup = BeautifulSoup(self.html, 'html.parser')
+        return self._soup
+
+    @property
+    def tree(self):
+        '''
+        lxml root element, None if the document couldn't be parsed.
+        '''
+        if not self._tree_parsed:
+            self._tree = parse_document(self.html)
+            self._tree_parsed = True
+        return self._tree
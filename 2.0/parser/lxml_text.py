@@ -0,0 +1,179 @@
+import re
+import logging
+import lxml.html
+from lxml import etree
+
+'''
+lxml implementation of the tidy filing text extraction strategies in MasterParserClass (tidy_parse_* / extract_text_from_element).
+Walks the libxml2 tree directly rather than a BeautifulSoup tree built on top of it, and produces the same \\n\\n delimited
+paragraph text that get_tidy_sections relies on as the BeautifulSoup strategies do with the lxml backend.
+Selected by settings.HTML_TEXT_ENGINE, parser/parity_check.py compares the two engines over saved documents.
+
+libxml2 caps tree depth at 256 levels, so the recursive walks below stay well within Python's recursion limit.
+'''
+
+# Same as MasterParserClass.inline_element_tags
+INLINE_ELEMENT_TAGS = frozenset(["font", "span", "a", "b", "i", "u", "strong", "em", "small"])
+
+# BeautifulSoup keeps strings under these tags in its own string classes, which get_text() / stripped_strings skip
+_NON_TEXT_TAGS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+_FALLBACK_SKIPPED_TAGS = frozenset(['table', 'footer', 'header', 'nav']) | _NON_TEXT_TAGS
+
+def parse_document(html_content):
+    '''
+    Parses an HTML document with lxml's HTML parser, the same parser BeautifulSoup's lxml backend feeds.
+    Returns the root element, or None if nothing could be parsed.
+    '''
+    parser = lxml.html.HTMLParser()
+    try:
+        parser.feed(html_content) # Unlike fromstring, feed accepts str input starting with an XML encoding declaration (inline XBRL)
+        return parser.close()
+    except etree.XMLSyntaxError as e:
+        logging.warning(f'lxml failed to parse HTML document: {str(e)}')
+        return None
+
+def _is_tag(node):
+    return isinstance(node.tag, str) # Comments and processing instructions have factory functions as their tag
+
+def _has_descendant(element, tags):
+    return next(element.iterdescendants(*tags), None) is not None
+
+def _stripped_strings(node, parts):
+    # cell.stripped_strings: every non-empty stripped string except comments and script / style content
+    if node.text and node.tag not in _NON_TEXT_TAGS:
+        text = node.text.strip()
+        if text:
+            parts.append(text)
+    for child in node:
+        if _is_tag(child) and child.tag not in _NON_TEXT_TAGS:
+            _stripped_strings(child, parts)
+        if child.tail:
+            tail = child.tail.strip()
+            if tail:
+                parts.append(tail)
+    return parts
+
+def _table_text(table):
+    table_text = []
+    for row in table.iter('tr'):
+        cells = [''.join(_stripped_strings(cell, [])) for cell in row.iter('th', 'td')]
+        table_text.append(' | '.join(cells))
+    return '\nTABLE: ' + '\n'.join(table_text) + '\n'
+
+def _append(text_parts, content, parent_tag):
+    if '\n' in content and parent_tag in INLINE_ELEMENT_TAGS:
+        content = content.replace('\n', ' ')
+    text_parts.append(content)
+
+def _element_text(element, text_parts):
+    # A node's text belongs to the node, its tail to the node's parent
+    if element.text:
+        _append(text_parts, element.text, element.tag)
+    for child in element:
+        if not _is_tag(child):
+            if child.tag is etree.Comment and child.text:
+                _append(text_parts, child.text, element.tag)
+        elif child.tag == 'table':
+            _append(text_parts, _table_text(child), element.tag)
+        elif child.tag == 'br':
+            _append(text_parts, '\n', element.tag)
+        else:
+            _element_text(child, text_parts)
+        if child.tail:
+            _append(text_parts, child.tail, element.tag)
+
+def extract_text_from_element(element):
+    '''
+    Extracts text while converting newlines inside inline tags to spaces, with tables as simplified text and <br> tags as newlines.
+    '''
+    text_parts = []
+    _element_text(element, text_parts)
+    text = ''.join(text_parts)
+
+    # Collapse multiple spaces but preserve newlines
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r' *\n *', '\n', text)
+
+    return text.strip()
+
+def tidy_parse_with_p_tags(root):
+    '''
+    Paragraphs in <p> tags, the most common structure in SEC filings. Container <p> tags wrapping other <p> tags are skipped.
+    '''
+    paragraphs = []
+    for p in root.iter('p'):
+        if _has_descendant(p, ['p']):
+            continue
+        text = extract_text_from_element(p)
+        if text:
+            paragraphs.append(text)
+    return '\n\n'.join(paragraphs)
+
+def tidy_parse_with_div_tags(root):
+    '''
+    Paragraphs in <div> tags, divs containing block elements are treated as containers and skipped.
+    '''
+    paragraphs = []
+    for div in root.iter('div'):
+        if _has_descendant(div, ['p', 'div', 'table', 'ul', 'ol']):
+            continue
+        text = extract_text_from_element(div)
+        if text:
+            paragraphs.append(text)
+    return '\n\n'.join(paragraphs)
+
+def tidy_parse_with_nested_structures(root):
+    '''
+    Every <p>, plus text container <div> tags when there are few paragraphs.
+    '''
+    paragraphs = []
+    for p in root.iter('p'):
+        text = extract_text_from_element(p)
+        if text:
+            paragraphs.append(text)
+
+    if len(paragraphs) < 5: # Arbitrary threshold, same as the BeautifulSoup strategy
+        for div in root.iter('div'):
+            if _has_descendant(div, ['table', 'ul', 'ol', 'img']):
+                continue
+            text = extract_text_from_element(div)
+            if text:
+                paragraphs.append(text)
+    return '\n\n'.join(paragraphs)
+
+def _fallback_strings(element, strings):
+    if element.text:
+        strings.append(element.text)
+    for child in element:
+        if _is_tag(child) and child.tag not in _FALLBACK_SKIPPED_TAGS:
+            _fallback_strings(child, strings)
+        if child.tail:
+            strings.append(child.tail)
+
+def tidy_parse_fallback(root):
+    '''
+    Every line of text outside of script, style, table, footer, header and nav elements, one per paragraph.
+    '''
+    strings = []
+    if root.tag not in _FALLBACK_SKIPPED_TAGS:
+        _fallback_strings(root, strings)
+    lines = [line.strip() for line in '\n'.join(strings).splitlines() if line.strip()]
+    return '\n\n'.join(lines)
+
+STRATEGIES = [tidy_parse_with_p_tags, tidy_parse_with_div_tags, tidy_parse_with_nested_structures, tidy_parse_fallback]
+
+def extract_text_from_tidy_doc(root, form_type=''):
+    '''
+    Tries each strategy in turn on the parsed document, returning the first non-empty result.
+    '''
+    if root is None:
+        return ""
+
+    for strategy in STRATEGIES:
+        logging.info(f'Attempting to extract tidy {form_type} filing text using lxml {strategy.__name__}')
+        result = strategy(root)
+        if result.strip():
+            logging.info(f'Successfully extracted text from tidy {form_type} filing.\nStrategy used: lxml {strategy.__name__}')
+            return result
+
+    return ""
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+
+import config.settings as settings
+from parser.filing_parser import MasterParserClass
+from parser.html_document import HtmlDocument
+
+'''
+Golden output parity check for the tidy filing text extraction (settings.HTML_TEXT_ENGINE and settings.HTML_SOUP_PARSER).
+For each saved main HTML document, extracts and normalizes the text with each configuration below, splits it into sections with
+get_tidy_sections and compares the sections (headers, boundaries and text) with the baseline: the BeautifulSoup strategies on the
+html.parser backend, which the pipeline used before the lxml defaults. So differences from the switch of defaults are reported, as
+well as between the lxml engine and the BeautifulSoup strategies on the same lxml parse.
+With --golden DIR, the sections are also compared against DIR/<document>.sections.json, which is written from the baseline the first
+time a document is seen, so later parser changes can be checked against the same corpus.
+
+Usage (from the project root): python -m parser.parity_check data/samples/10k/*.htm --type 10-k [--golden data/samples/golden]
+'''
+
+# Just enough of a header for MasterParserClass to build filing_info
+_STUB_HEADER = '<SEC-HEADER>\nACCESSION NUMBER:\t\tparity-check\nCONFORMED SUBMISSION TYPE:\t{form_type}\nFILED AS OF DATE:\t\t20000101\n</SEC-HEADER>'
+
+# (label, settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER). The first is the baseline the others and the golden files are held to
+CONFIGURATIONS = [
+    ('bs4/html.parser', 'bs4', 'html.parser'),
+    ('bs4/lxml', 'bs4', 'lxml'),
+    ('lxml', 'lxml', 'lxml')
+]
+
+def extract_sections(parser, html, form_type, engine, soup_parser):
+    '''
+    Returns (seconds, sections) for one configuration, parsing the document from scratch so parse time is included.
+    '''
+    settings.HTML_TEXT_ENGINE = engine
+    settings.HTML_SOUP_PARSER = soup_parser
+    known_sections, _ = parser.get_known_sections(form_type)
+    start = time.perf_counter()
+    text = parser.extract_and_normalize_tidy_doc_text(HtmlDocument(html))
+    elapsed = time.perf_counter() - start
+    sections = [list(section) for section in parser.get_tidy_sections(text, form_type, known_sections)]
+    return elapsed, sections
+
+def describe_difference(expected, actual):
+    if len(expected) != len(actual):
+        return f'{len(expected)} sections expected, got {len(actual)}: {[s[1] for s in expected]} vs {[s[1] for s in actual]}'
+    for (exp_part, exp_header, exp_text), (part, header, text) in zip(expected, actual):
+        if (exp_part, exp_header) != (part, header):
+            return f'section header {exp_part} {exp_header} expected, got {part} {header}'
+        if exp_text != text:
+            offset = next((i for i, (a, b) in enumerate(zip(exp_text, text)) if a != b), min(len(exp_text), len(text)))
+            return f'{exp_header} text differs at char {offset}: {exp_text[offset:offset + 60]!r} vs {text[offset:offset + 60]!r}'
+    return None
+
+def check_document(parser, path, form_type, golden_dir):
+    '''
+    Returns (identical, {label: seconds}) for one document, printing any differences.
+    '''
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        html = f.read()
+
+    seconds, results = {}, {}
+    for label, engine, soup_parser in CONFIGURATIONS:
+        seconds[label], results[label] = extract_sections(parser, html, form_type, engine, soup_parser)
+    baseline_label = CONFIGURATIONS[0][0]
+    baseline = results[baseline_label]
+    problems = []
+
+    for label, _, _ in CONFIGURATIONS[1:]:
+        difference = describe_difference(baseline, results[label])
+        if difference:
+            problems.append(f'{label} vs {baseline_label}: {difference}')
+    # Engine parity on the same parse, reported separately from the backend switch
+    difference = describe_difference(results['bs4/lxml'], results['lxml'])
+    if difference:
+        problems.append(f'lxml vs bs4/lxml: {difference}')
+
+    if golden_dir:
+        golden_path = os.path.join(golden_dir, os.path.basename(path) + '.sections.json')
+        if os.path.exists(golden_path):
+            with open(golden_path, 'r', encoding='utf-8') as f:
+                golden_sections = json.load(f)
+            for label, sections in results.items():
+                difference = describe_difference(golden_sections, sections)
+                if difference:
+                    problems.append(f'{label} vs golden: {difference}')
+        else:
+            with open(golden_path, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f)
+
+    status = 'OK' if not problems else 'DIFF'
+    timings = '  '.join(f'{label} {seconds[label]:7.3f}s' for label, _, _ in CONFIGURATIONS)
+    print(f'{status:4} {os.path.basename(path)[:40]:40} {len(baseline):4} sections  {timings}')
+    for problem in problems:
+        print(f'     {problem}')
+    return not problems, seconds
+
+def run(paths, form_type, golden_dir=None):
+    configured = (settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER)
+    if golden_dir:
+        os.makedirs(golden_dir, exist_ok=True)
+
+    passed = 0
+    totals = {label: 0.0 for label, _, _ in CONFIGURATIONS}
+    logging.disable(logging.CRITICAL) # Per-strategy logging would dominate the timings
+    try:
+        parser = MasterParserClass(_STUB_HEADER.format(form_type=form_type.upper()), form_type)
+        for path in paths:
+            ok, seconds = check_document(parser, path, form_type, golden_dir)
+            passed += ok
+            for label, elapsed in seconds.items():
+                totals[label] += elapsed
+    finally:
+        logging.disable(logging.NOTSET)
+        settings.HTML_TEXT_ENGINE, settings.HTML_SOUP_PARSER = configured
+
+    baseline_total = totals[CONFIGURATIONS[0][0]]
+    timings = ', '.join(f'{label} {total:.3f}s ({baseline_total / max(total, 1e-9):.1f}x)' for label, total in totals.items())
+    print(f'{passed}/{len(paths)} documents identical to the {CONFIGURATIONS[0][0]} baseline. {timings}')
+    return passed == len(paths)
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Check the tidy text extraction configurations produce the same sections as the html.parser baseline.')
+    arg_parser.add_argument('paths', nargs='+', help='Saved main HTML documents, all of one form type')
+    arg_parser.add_argument('--type', default='10-k', help='Tidy form type of the documents')
+    arg_parser.add_argument('--golden', help='Directory of golden section outputs, written from the baseline for documents not seen before')
+    args = arg_parser.parse_args()
+    sys.exit(0 if run(args.paths, args.type.lower(), args.golden) else 1)
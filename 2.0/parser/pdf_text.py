@@ -0,0 +1,199 @@
+import sys
+import logging
+import binascii
+import numpy as np
+import pymupdf
+from concurrent.futures import ProcessPoolExecutor
+
+import config.settings as settings
+
+'''
+Decoding and page text extraction of the PDF documents of a filing (MasterParserClass.parse_pdfs / parse_pdf_to_df).
+
+EDGAR submissions carry PDFs uuencoded. decode_uu follows the rules of the deprecated uu module's uu.decode (skip to a valid begin line,
+binascii.a2b_uu per line, with its workaround for lines some encoders pad wrongly, stop at end) without reading lines from a BytesIO
+into another: the standard 60 character lines making up nearly all of the body are found with numpy over the encoded bytes and decoded
+in one binascii.a2b_base64 call, the few others with binascii.a2b_uu over slices of a memoryview of the bytes.
+Page text is extracted once per page with the document's page iterator, and in several processes for large PDFs when
+settings.PDF_EXTRACT_WORKERS > 1.
+
+Usage (equivalence check of decode_uu against uu.decode, while the uu module is available): python -m parser.pdf_text file.pdf [...]
+'''
+
+# Standard full line: length character M (45 bytes), 60 data characters, line ending
+_FULL_LINE_CHARS = 60
+# Runs of fewer standard lines are decoded line by line, as are the lines after such a run
+_MIN_BLOCK_LINES = 16
+
+# uuencoded character (space to backtick, 6-bit values 0-63 with backtick as 0) -> base64 character of the same value, ! for anything else
+_BASE64_ALPHABET = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+_UU_TO_BASE64 = bytes(_BASE64_ALPHABET[(c - 32) & 63] if 32 <= c <= 96 else ord('!') for c in range(256))
+
+def _standard_lines(data, start, end):
+    '''
+    Returns (count, stride) of the standard full lines in a row from start, stride being their length with the \\n or \\r\\n ending.
+    Lines are checked in doubling windows, so finding where a run stops costs about as much as the run, not the rest of the body.
+    '''
+    first_line_end = data.find(b'\n', start, end)
+    stride = first_line_end + 1 - start
+    if first_line_end == -1 or data[start] != ord('M') or stride not in (_FULL_LINE_CHARS + 2, _FULL_LINE_CHARS + 3):
+        return 0, stride
+    crlf = stride == _FULL_LINE_CHARS + 3
+    if crlf and data[first_line_end - 1] != ord('\r'):
+        return 0, stride
+
+    line_count = (end - start) // stride
+    rows = np.frombuffer(data, dtype=np.uint8, count=line_count * stride, offset=start).reshape(line_count, stride)
+    count, window = 0, _MIN_BLOCK_LINES
+    while count < line_count:
+        window_rows = rows[count:count + window]
+        standard = (window_rows[:, 0] == ord('M')) & (window_rows[:, -1] == ord('\n'))
+        if crlf:
+            standard &= window_rows[:, -2] == ord('\r')
+        if not standard.all():
+            return count + int(standard.argmin()), stride
+        count += len(standard)
+        window *= 2
+    return count, stride
+
+def _decode_line(line):
+    try:
+        return binascii.a2b_uu(line)
+    except binascii.Error:
+        # Lines from broken encoders carry extra characters, decode only as many as the length character says
+        nbytes = (((line[0] - 32) & 63) * 4 + 5) // 3
+        try:
+            return binascii.a2b_uu(line[:nbytes])
+        except binascii.Error as e:
+            raise ValueError(f'Undecodable uuencoded line: {e}')
+
+def _decode_body(data, start):
+    '''
+    Decodes the lines after the begin line, from start through the end line ("end" with only whitespace around it). Returns a list of
+    chunks in order, raises ValueError if the data runs out before the end line.
+    Runs of standard full lines are decoded as one block: their data characters, taken from a numpy view of the lines, are translated to
+    the base64 alphabet and decoded by one binascii.a2b_base64 call. A character a2b_uu wouldn't accept ends the block before its line.
+    '''
+    view = memoryview(data)
+    length = len(data)
+    chunks = []
+    pos = start
+    while pos < length:
+        count, stride = _standard_lines(data, pos, length)
+        if count >= _MIN_BLOCK_LINES:
+            rows = np.frombuffer(data, dtype=np.uint8, count=count * stride, offset=pos).reshape(count, stride)
+            block = rows[:, 1:_FULL_LINE_CHARS + 1].tobytes().translate(_UU_TO_BASE64)
+            invalid = block.find(b'!')
+            if invalid != -1:
+                count = invalid // _FULL_LINE_CHARS
+                block = block[:count * _FULL_LINE_CHARS]
+            if count:
+                chunks.append(binascii.a2b_base64(block))
+                pos += count * stride
+                continue
+
+        # Line by line up to the end of a short run, at least _MIN_BLOCK_LINES lines, before looking for a block again
+        for _ in range(max(count + 1, _MIN_BLOCK_LINES)):
+            if pos >= length:
+                break
+            line_end = data.find(b'\n', pos) + 1 or length
+            # Data lines start with their length character, only strip lines that could be the end line
+            if data[pos] in b'e \t\r\n\f' and data[pos:line_end].strip(b' \t\r\n\f') == b'end':
+                return chunks
+            chunks.append(_decode_line(view[pos:line_end]))
+            pos = line_end
+
+    raise ValueError('Truncated input file')
+
+def decode_uu(encoded_text):
+    '''
+    Decodes uuencoded text (from the begin line through the end line, anything around them is skipped) to bytes.
+    Raises ValueError if there is no valid begin line, the end line is missing or a line can't be decoded.
+    '''
+    data = encoded_text.encode('ascii') if isinstance(encoded_text, str) else bytes(encoded_text)
+    length = len(data)
+
+    # Find the begin line: "begin <octal mode> <filename>"
+    pos = 0
+    while True:
+        if pos >= length:
+            raise ValueError('No valid begin line found in input file')
+        line_end = data.find(b'\n', pos)
+        line_end = length if line_end == -1 else line_end + 1
+        if data.startswith(b'begin', pos):
+            fields = data[pos:line_end].split(b' ', 2)
+            if len(fields) == 3 and fields[0] == b'begin':
+                try:
+                    int(fields[1], 8)
+                    pos = line_end
+                    break
+                except ValueError:
+                    pass
+        pos = line_end
+
+    return b''.join(_decode_body(data, pos))
+
+def _extract_page_range(pdf_bytes, start, stop):
+    # Worker process side of extract_page_texts, documents can't be pickled so each worker opens its own
+    with pymupdf.open(stream=pdf_bytes, filetype='pdf') as pdf_mu:
+        return [page.get_text() for page in pdf_mu.pages(start, stop)]
+
+def extract_page_texts(pdf_mu, pdf_bytes=None, workers=None):
+    '''
+    Returns the text of every page of an open PyMuPDF document, in page order.
+    With more than one worker (default settings.PDF_EXTRACT_WORKERS) and the PDF's bytes, PDFs of at least settings.PDF_PARALLEL_MIN_PAGES
+    pages are split into one page range per worker process. Falls back to extracting in this process if that fails.
+    '''
+    workers = workers or settings.PDF_EXTRACT_WORKERS
+    page_count = len(pdf_mu)
+
+    if workers > 1 and pdf_bytes is not None and page_count >= settings.PDF_PARALLEL_MIN_PAGES:
+        per_worker = -(-page_count // workers)
+        ranges = [(start, min(start + per_worker, page_count)) for start in range(0, page_count, per_worker)]
+        logging.info(f'Extracting text of {page_count} PDF pages in {len(ranges)} processes.')
+        try:
+            with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+                futures = [pool.submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+                return [text for future in futures for text in future.result()]
+        except Exception as e:
+            logging.warning(f'Parallel PDF page extraction failed, extracting pages in this process. Error: {e}.')
+
+    return [page.get_text() for page in pdf_mu.pages()]
+
+def check_equivalence(encoded_texts):
+    '''
+    Compares decode_uu with uu.decode for each uuencoded text. Returns the indexes of texts decoded differently (or failing in only one).
+    '''
+    import io
+    import uu # Deprecated, removed in Python 3.13. Only used as the reference here
+
+    failures = []
+    for i, text in enumerate(encoded_texts):
+        reference = io.BytesIO()
+        try:
+            uu.decode(io.BytesIO(text.encode('ascii')), reference, quiet=True)
+            expected = reference.getvalue()
+        except Exception:
+            expected = None
+        try:
+            actual = decode_uu(text)
+        except ValueError:
+            actual = None
+        if actual != expected:
+            failures.append(i)
+    return failures
+
+if __name__ == '__main__':
+    import io
+    import uu
+
+    samples = []
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            encoded = io.BytesIO()
+            uu.encode(io.BytesIO(f.read()), encoded, name=path.split('/')[-1])
+        text = encoded.getvalue().decode('ascii')
+        samples += [text, '\n\n' + text.replace('\n', '\r\n'), text[:len(text) // 2], text.replace('begin 644', 'begin xyz', 1)]
+    failures = check_equivalence(samples)
+    print(f'{len(samples) - len(failures)}/{len(samples)} uuencoded samples decoded identically')
+    sys.exit(1 if failures else 0)
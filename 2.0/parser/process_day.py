@@ -9,11 +9,14 @@ from prefect import flow
 import config.settings as settings
 from config.log_config import config_logging
 import conn.sec_http as sec_http
-from conn.db_engine import engine
+from conn.db_engine import engine, get_engine
 from conn.setup_db import create_db_tables
+from conn.data_version import bump_data_version
 import parser.filing_parser as filing_parser
-from ingest.ingest_logic import ingest_dataframe
+from ingest.ingest_logic import ingest_dataframe, invalidate_rag_answer_cache
 from ingest.text_embedding import embed_new_text_sections
+from ingest.topic_modeling import update_section_topics
+from ingest.rollups import refresh_filing_rollups
 
 def get_quarter_from_date(date_obj):
     '''
@@ -119,13 +122,68 @@ def get_daily_index_df(target_date, rate_limiter):
         logging.error(f'Failed to download daily index for {target_date} based on URL: {daily_index_url}.')
         return pd.DataFrame()
 
-def process_filing(fulltext_url, type, rate_limiter):
+def fetch_filing_header(fulltext_url, type, rate_limiter):
+    '''
+    Header-only fast path. Downloads just the start of a submission (settings.SEC_HEADER_FETCH_BYTES, see sec_http.download_file_head_from_sec)
+    and parses filing_info from its SEC header. Falls back to the full download if the header runs past the fetched bytes.
+
+    Returns: (parser, complete). parser is a MasterParserClass over the downloaded text, complete is True if that text is the whole submission,
+    so the parser can go on to output_dfs without downloading it again. (None, False) if the download or header parsing failed.
+    '''
+    head_text, complete = sec_http.download_file_head_from_sec(fulltext_url, rate_limiter, end_marker=b'</SEC-HEADER>')
+    if head_text is None:
+        logging.error(f'Failed to download start of filing, unable to parse its header.')
+        return None, False
+
+    if not complete and '</sec-header>' not in head_text.lower():
+        logging.warning(f'SEC header is longer than {settings.SEC_HEADER_FETCH_BYTES} bytes, downloading the whole filing.')
+        head_text = sec_http.download_file_from_sec(fulltext_url, rate_limiter)
+        complete = True
+        if not head_text:
+            logging.error(f'Failed to download filing contents, unable to parse its header.')
+            return None, False
+
+    parser = filing_parser.MasterParserClass(head_text, type)
+    if not isinstance(parser.filing_info, pd.DataFrame): # parse_sec_header returns its dict of defaults when required fields are missing
+        logging.error(f'Failed to parse SEC header of filing.')
+        return None, False
+    return parser, complete
+
+def process_filing(fulltext_url, type, rate_limiter, header_only=False, fetch_rest=None):
     '''
     Processes an SEC filing of the specified type from its fulltext URL.
 
+    header_only: only fetch and parse the SEC header (see fetch_filing_header), outputting just filing_info.
+    fetch_rest: optional callable taking the filing_info dataframe parsed from the header, deciding per filing whether the rest of the filing
+        is fetched and parsed (True) or only filing_info is output (False).
+    Without either, the whole filing is downloaded in one request as before.
+
     Returns: a dictionary with one key/value pair per dataframe generated by processing the filing. Values/structure depends on filing type
     '''
     logging.info(f'Processing filing of type {type}.')
+
+    if header_only or fetch_rest:
+        parser, complete = fetch_filing_header(fulltext_url, type, rate_limiter)
+        if not parser:
+            return None
+        accession_number = parser.filing_info['accession_number'].iloc[0]
+
+        if header_only or not fetch_rest(parser.filing_info):
+            logging.info(f'Parsed header of {type} filing {accession_number}, not fetching the rest.')
+            return { settings.FILING_INFO_TABLE: parser.filing_info }
+
+        if complete:
+            logging.info(f'Header fetch of {type} filing {accession_number} already held the whole filing.')
+        else:
+            raw_contents = sec_http.download_file_from_sec(fulltext_url, rate_limiter)
+            if not raw_contents:
+                logging.error(f'Failed to download filing contents, unable to process.')
+                return None
+            parser = filing_parser.MasterParserClass(raw_contents, type)
+
+        logging.info(f"Parsing {type} filing {accession_number}.")
+        return parser.output_dfs()
+
     raw_contents = sec_http.download_file_from_sec(fulltext_url, rate_limiter)
     if raw_contents:
         logging.info(f'Downloaded filing contents.')
@@ -138,6 +196,25 @@ def process_filing(fulltext_url, type, rate_limiter):
         logging.error(f'Failed to download filing contents, unable to process.')
         return None
 
+def full_parse_predicate(type, full_parse_sic_ranges):
+    '''
+    Returns the fetch_rest callable for process_filing given filing type -> [(low, high)] SIC code ranges worth fully parsing
+    (settings.FULL_PARSE_SIC_RANGES), or None if the type isn't listed and all its filings are fully parsed.
+    Filings without a SIC code are never in range.
+    '''
+    sic_ranges = full_parse_sic_ranges.get(type.lower())
+    if sic_ranges is None:
+        return None
+
+    def fetch_rest(filing_info):
+        try:
+            sic_code = int(filing_info['whole_sic_code'].iloc[0])
+        except (TypeError, ValueError):
+            return False
+        return any(int(low) <= sic_code <= int(high) for low, high in sic_ranges)
+
+    return fetch_rest
+
 def aggregate_parsed_dfs(list_of_parsed, filing_type):
     '''
     Builds the appropriate aggregated dataframes based on filing type.
@@ -191,11 +268,16 @@ def save_parsed_type(agged_dfs, date, form_type):
         df.to_csv(df_save_path)
         logging.info(f'Saved {df_type} for {form_type} filings to: {df_save_path}')
 
-def full_process_day(target_date: date | datetime):
+def full_process_day(target_date: date | datetime, header_only=False, full_parse_sic_ranges=None):
     '''
     Run the full pipeline. 
+    With header_only, a metadata-only pass: only the SEC header of each filing is fetched (byte range request) and only filing_info is ingested.
+    Otherwise the rest of a filing is fetched and parsed depending on its header, for the types in full_parse_sic_ranges
+    (default settings.FULL_PARSE_SIC_RANGES, see full_parse_predicate).
     '''
-    logging.info(f'Running full processing pipeline for date: {target_date}.')
+    if full_parse_sic_ranges is None:
+        full_parse_sic_ranges = settings.FULL_PARSE_SIC_RANGES
+    logging.info(f'Running {"header-only" if header_only else "full"} processing pipeline for date: {target_date}.')
 
     # Create SEC rate limiter object
     rate_limiter = sec_http.create_sec_rate_limiter()
@@ -218,17 +300,22 @@ def full_process_day(target_date: date | datetime):
 
         # Process filings one target type at a time
         target_filing_types = settings.TARGET_FILING_TYPES
+        ingested_dates = set() # Filing dates of ingested filing_info rows, to refresh the count rollups for
         for type in target_filing_types:
             type_filtered_idx = idx_df[idx_df['type'].str.lower() == type.lower()]
             logging.info(f'Parsing {len(type_filtered_idx)} {type} filings.')
 
             # TODO: Implement parallel processing, maybe 5 filings at a time...
 
+            fetch_rest = None if header_only else full_parse_predicate(type, full_parse_sic_ranges)
+            if fetch_rest:
+                logging.info(f'Only fully parsing {type} filings in SIC code ranges: {full_parse_sic_ranges[type.lower()]}.')
+
             parsed_of_current_type = []
             for i, row in type_filtered_idx.iterrows():
 
                 logging.info(f'Processing idx row {i}: {row.fulltext_path}')
-                parsed_filing_data = process_filing(row.fulltext_path, type.lower(), rate_limiter)
+                parsed_filing_data = process_filing(row.fulltext_path, type.lower(), rate_limiter, header_only=header_only, fetch_rest=fetch_rest)
                 if parsed_filing_data:
                     logging.info(f'Successfully processed {type} filing.')
                     parsed_of_current_type.append(parsed_filing_data)
@@ -245,21 +332,37 @@ def full_process_day(target_date: date | datetime):
                 if not df.empty:
                     logging.info(f"Ingesting {df_name} from {type} filings.")
                     ingest_dataframe(df, df_name, engine)
+                    if df_name == settings.FILING_INFO_TABLE:
+                        ingested_dates.update(pd.to_datetime(df['date']).dt.date)
                 else:
                     logging.warning(f'Was no data in {df_name} from {type} filings, nothing to insert.')
             logging.info(f'Ingested parsed data from all filings of type: {type}.')
 
-        logging.info(f'Processed all {target_date} filings of target types: {target_filing_types}. Now generating embeddings of text sections')
+        refresh_filing_rollups(engine, ingested_dates)
+        # Invalidates the web workers' cached dashboard summaries
+        bump_data_version(engine)
+
+        if header_only:
+            logging.info(f'Processed headers of all {target_date} filings of target types: {target_filing_types}. No text sections to embed.')
+        else:
+            logging.info(f'Processed all {target_date} filings of target types: {target_filing_types}. Now generating embeddings of text sections')
+
+            # Own small pool without a statement timeout, vector index rebuilds run long
+            embed_new_text_sections(get_engine('embedder'))
+            logging.info(f'Finished embedding new text sections and rebuilding indexes for vector search.')
+
+            # Topics are precomputed here so the dashboard only ever reads them
+            update_section_topics(engine)
+            logging.info(f'Finished assigning new text sections to topics.')
 
-        embed_new_text_sections(engine)
-        logging.info(f'Finished embedding new text sections and rebuilding indexes for vector search.')
+        invalidate_rag_answer_cache(engine, target_date, target_date)
 
         logging.info(f'Finished processing {target_date}.')
     else:
         logging.error(f'Failed to get dataframe of daily index for date: {target_date}\nUnable to process any filings.')
 
 @flow(name=settings.PREFECT_FLOW_NAME)
-def full_process_day_flow(target_date: str):
+def full_process_day_flow(target_date: str, header_only: bool = False, full_parse_sic_ranges: dict | None = None):
     config_logging('ingestion_flow')
     date = datetime.strptime(target_date, "%Y-%m-%d").date()
-    return full_process_day(date)
\ No newline at end of file
+    return full_process_day(date, header_only, full_parse_sic_ranges)
\ No newline at end of file
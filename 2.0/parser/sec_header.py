@@ -0,0 +1,123 @@
+'''
+Single-pass tokenizer for the <SEC-HEADER> block of an EDGAR submission.
+
+The header is a tab indented KEY: value outline:
+
+    ACCESSION NUMBER:       0000950170-24-001234        <- header field (no indent)
+    FILER:                                              <- entity (no indent, no value): FILER, SUBJECT COMPANY, FILED BY, REPORTING-OWNER, ISSUER, ...
+        COMPANY DATA:                                   <- block (one indent, no value), FORMER COMPANY / FORMER NAME may repeat
+            COMPANY CONFORMED NAME:     ACME CORP       <- block field
+        BUSINESS ADDRESS:
+            STREET 1:       1 MAIN ST
+
+Every line is read once into SecHeader (fields + entities in order, each entity holding its blocks), which filing_info and
+subject company rows are then projected from. Headers with several filers keep one entity per filer, so fields are never
+picked up from a neighbouring filer's block.
+'''
+
+# Indented keys without a value that open a block even when indented deeper than usual
+BLOCK_NAMES = frozenset([
+    'COMPANY DATA', 'OWNER DATA', 'FILING VALUES', 'BUSINESS ADDRESS', 'MAIL ADDRESS', 'FORMER COMPANY', 'FORMER NAME'
+])
+
+class HeaderEntity:
+    '''
+    One FILER / SUBJECT COMPANY / FILED BY / REPORTING-OWNER / ISSUER ... block of the header.
+    '''
+
+    def __init__(self, role):
+        self.role = role
+        self.blocks = [] # (block name, {key: value}) in header order
+
+    def open_block(self, name):
+        fields = {}
+        self.blocks.append((name, fields))
+        return fields
+
+    def block(self, name):
+        '''
+        Fields of the first block called name, empty if there is none.
+        '''
+        for block_name, fields in self.blocks:
+            if block_name == name:
+                return fields
+        return {}
+
+    def blocks_named(self, name):
+        return [fields for block_name, fields in self.blocks if block_name == name]
+
+    def field(self, key, block=None):
+        '''
+        Value of key in the given block, or in the first block that has it. None if missing or empty.
+        '''
+        for block_name, fields in self.blocks:
+            if (block is None or block_name == block) and fields.get(key):
+                return fields[key]
+        return None
+
+class SecHeader:
+    '''
+    Tokenized SEC header: top-level fields (key -> list of values, some like ITEM INFORMATION repeat) and entities in order.
+    '''
+
+    def __init__(self):
+        self.fields = {}
+        self.entities = []
+
+    def get(self, key):
+        values = self.fields.get(key)
+        return values[0] if values else None
+
+    def entities_with_role(self, role):
+        return [entity for entity in self.entities if entity.role == role]
+
+    def first_entity(self, *roles):
+        '''
+        First entity with the first of roles present in the header, e.g. first_entity('FILED BY', 'FILER').
+        '''
+        for role in roles:
+            entities = self.entities_with_role(role)
+            if entities:
+                return entities[0]
+        return None
+
+def parse_header(header_text):
+    '''
+    Tokenizes the text of a <SEC-HEADER> block (tags included or not) in one pass over its lines. Returns a SecHeader.
+    '''
+    header = SecHeader()
+    entity = None
+    block = None
+
+    for line in header_text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('<'): # Blank lines and <SEC-HEADER> / <ACCEPTANCE-DATETIME> style tags
+            continue
+        key, sep, value = stripped.partition(':')
+        if not sep:
+            continue
+        key = key.strip().upper()
+        value = value.strip()
+        indent = len(line) - len(line.lstrip())
+
+        if indent == 0:
+            if value:
+                header.fields.setdefault(key, []).append(value)
+            else:
+                entity = HeaderEntity(key)
+                header.entities.append(entity)
+                block = None
+        elif not value and (key in BLOCK_NAMES or indent == 1):
+            if entity is None: # Block outside of any entity, i.e. an old style header without FILER:
+                entity = HeaderEntity(None)
+                header.entities.append(entity)
+            block = entity.open_block(key)
+        elif block is not None:
+            block.setdefault(key, value)
+        elif entity is not None:
+            block = entity.open_block(None)
+            block.setdefault(key, value)
+        else:
+            header.fields.setdefault(key, []).append(value)
+
+    return header
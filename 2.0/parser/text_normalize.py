@@ -0,0 +1,76 @@
+import re
+import sys
+import random
+import unicodedata
+
+'''
+Unicode normalization of extracted filing text (MasterParserClass.normalize_unicode): NFKD, then control characters (except
+newline and tab) and space-like characters (except a normal space) become a normal space, other characters, dashes included, are kept.
+
+The characters to replace are worked out once at import from the same per-character rules, instead of calling
+unicodedata.category up to twice per character of every section. Pure ASCII text (most of a filing, NFKD leaves it unchanged)
+goes through bytes.translate; other text through one precompiled character class, as str.translate with a dict table is a
+dict miss per character.
+
+Usage (equivalence check against the per-character rules): python -m parser.text_normalize
+'''
+
+def _replaced_with_space(ch):
+    # The original per-character rules
+    if ch == '\n':
+        return False
+    if ch == '\xa0':
+        return True
+    category = unicodedata.category(ch)
+    if category == 'Cc' and ch != '\t':
+        return True
+    return category.startswith('Z') and ch != ' '
+
+# Control (Cc) and separator (Z*) characters are all in the Basic Multilingual Plane
+SPACE_CHARS = ''.join(chr(cp) for cp in range(0x10000) if _replaced_with_space(chr(cp)))
+
+_ASCII_TABLE = bytes.maketrans(
+    bytes(ord(ch) for ch in SPACE_CHARS if ord(ch) < 128),
+    b' ' * sum(1 for ch in SPACE_CHARS if ord(ch) < 128)
+)
+_SPACE_CHARS_PATTERN = re.compile('[' + re.escape(SPACE_CHARS) + ']')
+
+def normalize_unicode(text: str) -> str:
+    '''
+    Normalize Unicode text while preserving meaningful punctuation like dashes.
+    '''
+    if text.isascii():
+        return text.encode('ascii').translate(_ASCII_TABLE).decode('ascii')
+
+    text = unicodedata.normalize('NFKD', text)
+    return _SPACE_CHARS_PATTERN.sub(' ', text)
+
+def _reference_normalize_unicode(text):
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(' ' if _replaced_with_space(ch) else ch for ch in text)
+
+def check_equivalence(samples=2000, seed=0):
+    '''
+    Compares normalize_unicode with the per-character rules for every code point on its own, with ASCII around it, and for random
+    mixed strings. Returns the list of differing inputs.
+    '''
+    failures = []
+    for cp in range(sys.maxunicode + 1):
+        if 0xD800 <= cp <= 0xDFFF: # Surrogates
+            continue
+        for text in (chr(cp), f'a{chr(cp)}\n\t b'):
+            if normalize_unicode(text) != _reference_normalize_unicode(text):
+                failures.append(text)
+
+    rng = random.Random(seed)
+    alphabet = [chr(cp) for cp in range(0x300)] + list(SPACE_CHARS) + list('–—’“”ﬁ½①Ａ')
+    for _ in range(samples):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 200)))
+        if normalize_unicode(text) != _reference_normalize_unicode(text):
+            failures.append(text)
+    return failures
+
+if __name__ == '__main__':
+    failures = check_equivalence()
+    print(f'{len(failures)} differing inputs' + (f', first: {failures[0]!r}' if failures else ''))
+    sys.exit(1 if failures else 0)
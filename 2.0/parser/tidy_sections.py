@@ -0,0 +1,100 @@
+import re
+from functools import lru_cache
+
+'''
+Compiled section header patterns for tidy filing types, and a single-pass scanner splitting text on them.
+
+The section regexes used to be of the form (?P<header>\\n\\nHEADER.*?\\n\\n)(?P<text>.*?)(?=\\n\\nHEADER.*?\\n\\n|$), compiled on
+every call, where every lazy step of the text group re-tries the header lookahead. The scanner finds each header once, then
+slices the text between consecutive headers, yielding exactly what finditer over those regexes yields:
+- A header is a match of the header start pattern followed by the first \\n\\n at or after its end (the lazy .*?\\n\\n).
+  A start with no \\n\\n after it can't match, and neither can any later one.
+- A section's text runs from the end of its header to the start of the next header beginning at or after that point.
+'''
+
+# Start of an item header (up to where the lazy .*?\n\n of the original patterns begins) per tidy form type
+_ITEM_HEADER_STARTS = {
+    ('10-k', '10-k/a', '10-q', '10-q/a'): r'\n\n(ITEM|Item)\s+\d+[A-Z]?\.*',
+    ('8-k', '8-k/a'): r'\n\n(ITEM|Item)\s+\d+\.\d+\.*',
+    ('sc 13d', 'sc 13d/a'): r'\n\n(ITEM|Item)\s+\d+\.*',
+    ('sc 13g', 'sc 13g/a'): r'\n\n(ITEM|Item)\s+\d+(?:\([a-z]\))?'
+}
+ITEM_HEADER_PATTERNS = {form_type: re.compile(pattern) for form_types, pattern in _ITEM_HEADER_STARTS.items() for form_type in form_types}
+
+# Named (S-1 / S-3) headers are whole lines, matched case insensitively
+NAMED_HEADER_FORM_TYPES = ('s-1', 's-1/a', 's-3', 's-3/a')
+
+# 10-Q parts: PART <roman numeral>, at the start of the text or after a blank line
+PART_HEADER_PATTERN = re.compile(r'(^PART|^Part|\n\nPART|\n\nPart) [IVXLCDM]+')
+
+# Canonical section names for tidy_sections_to_df, searched in the lowercased "part header + section header"
+PROCESSED_HEADER_PATTERNS = {}
+for _form_types, _pattern in {
+    ('10-q', '10-q/a'): r'part\s+[ivxlcdm]+\s+item\s+\d+[a-z]*',
+    ('10-k', '10-k/a'): r'item\s+\d+[a-z]*',
+    ('8-k', '8-k/a'): r'item\s+\d+\.\d+',
+    ('sc 13d', 'sc 13d/a'): r'item\s+\d+',
+    ('sc 13g', 'sc 13g/a'): r'item\s+\d+(?:\([a-z]\))?'
+}.items():
+    for _form_type in _form_types:
+        PROCESSED_HEADER_PATTERNS[_form_type] = re.compile(_pattern)
+
+@lru_cache(maxsize=16)
+def named_header_pattern(expected_sections):
+    '''
+    Compiled whole-header pattern for a tuple of expected section names. The trailing \\s*\\n\\n is part of the header.
+    '''
+    return re.compile(rf'\n\n(?:{"|".join(re.escape(h) for h in expected_sections)})\s*\n\n', re.IGNORECASE)
+
+def header_pattern_for(form_type, expected_sections):
+    '''
+    Returns (compiled header pattern, whether a match is the whole header) for a tidy form type, or (None, False) if unsupported.
+    '''
+    if form_type in NAMED_HEADER_FORM_TYPES:
+        return named_header_pattern(tuple(expected_sections)), True
+    return ITEM_HEADER_PATTERNS.get(form_type), False
+
+def find_headers(pattern, text, whole_header, start=0):
+    '''
+    Returns the (start, end) spans of consecutive headers in text, each searched for from the end of the previous one.
+    For start patterns (whole_header False) the header extends through the next \\n\\n.
+    '''
+    spans = []
+    match = pattern.search(text, start)
+    while match:
+        if whole_header:
+            end = match.end()
+        else:
+            close = text.find('\n\n', match.end())
+            if close == -1:
+                break
+            end = close + 2
+        spans.append((match.start(), end))
+        match = pattern.search(text, end)
+    return spans
+
+def split_sections(pattern, text, whole_header):
+    '''
+    Yields (header, text) for every section, both stripped.
+    '''
+    spans = find_headers(pattern, text, whole_header)
+    for i, (start, end) in enumerate(spans):
+        next_start = spans[i + 1][0] if i + 1 < len(spans) else len(text)
+        yield text[start:end].strip(), text[end:next_start].strip()
+
+def split_parts(text):
+    '''
+    Yields (part header, part text) for every PART <roman numeral> of a form. The part text keeps its leading \\n\\n and,
+    like the original $ anchored pattern, the last part stops before a final newline.
+    '''
+    spans = find_headers(PART_HEADER_PATTERN, text, False)
+    for i, (start, end) in enumerate(spans):
+        header_match = PART_HEADER_PATTERN.match(text, start)
+        close = end - 2 # The text starts at the \n\n closing the header line
+        if i + 1 < len(spans):
+            text_end = spans[i + 1][0]
+        elif text.endswith('\n') and len(text) - 1 >= end:
+            text_end = len(text) - 1
+        else:
+            text_end = len(text)
+        yield header_match.group(0).strip(), text[close:text_end]
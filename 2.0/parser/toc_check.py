@@ -0,0 +1,153 @@
+import sys
+import random
+import logging
+import argparse
+from bs4 import BeautifulSoup, NavigableString
+
+from parser.filing_parser import MasterParserClass
+from parser.html_document import HtmlDocument
+
+'''
+Equivalence check of MasterParserClass.find_sections_with_toc (one indexed walk of the document) against the previous implementation
+kept here for reference: every destination anchor scanned for every TOC link, and each section's text collected by walking
+next_element from its destination to the next one (text_between_tags / text_starting_at_tag).
+Both run on the same soup and TOC tag, for generated documents mixing a[id], a[name], div[id] and div[name] destinations, phantom
+anchors, page number links, repeated and missing destinations and nested markup, and for any saved HTML documents given, whose TOC
+is located with linked_toc_exists as get_toc_sections does.
+
+Usage (from the project root): python -m parser.toc_check [data/samples/*.htm] [--samples 500]
+'''
+
+def _reference_text_between_tags(parser, start, end):
+    cur = start
+    found_text = ""
+    while cur and cur != end:
+        if isinstance(cur, NavigableString):
+            text = cur.strip()
+            if len(text):
+                found_text += "{} ".format(text)
+        cur = cur.next_element
+    return parser.normalize_extracted_text(found_text.strip(), False)
+
+def _reference_text_starting_at_tag(parser, start):
+    cur = start
+    found_text = ""
+    while cur:
+        if isinstance(cur, NavigableString):
+            text = cur.strip()
+            if len(text):
+                found_text += "{} ".format(text)
+        cur = cur.next_element
+    return parser.normalize_extracted_text(found_text.strip(), False)
+
+def _reference_find_sections_with_toc(parser, document_soup, toc_soup):
+    # Previous find_sections_with_toc, comments dropped
+    section_list = []
+    link_dict = {}
+    for link_tag in toc_soup.find_all('a', attrs = { 'href' : True }):
+        if parser.is_text_page_number(link_tag.text.strip()):
+            continue
+        link_dict[link_tag.get('href').replace('#', '')] = parser.normalize_extracted_text(link_tag.text.strip(), True)
+
+    link_dests = document_soup.find_all('a', attrs = { 'id' : True }) + document_soup.find_all('a', attrs = { 'name' : True })\
+    + document_soup.find_all('div', attrs = { 'id' : True }) + document_soup.find_all('div', attrs = { 'name' : True })
+    link_dests = [anchor for anchor in link_dests if (anchor.get('id') in link_dict.keys() or anchor.get('name') in link_dict.keys())]
+
+    for target_href, target_name in link_dict.items():
+        num_destinations = len(link_dests)
+        for dest_index, link_dest in enumerate(link_dests):
+            if (link_dest.get('id') == target_href or link_dest.get('name') == target_href):
+                if dest_index + 1 < num_destinations:
+                    section_text = _reference_text_between_tags(parser, link_dest, link_dests[dest_index + 1])
+                else:
+                    section_text = _reference_text_starting_at_tag(parser, link_dest)
+                if section_text:
+                    section_list.append({ 'section_name': target_name, 'section_raw_text': None, 'section_parsed_text': section_text })
+    return section_list
+
+_WORDS = ['revenue', 'risk', 'factors', 'Item', 'Part', 'II', 'net', 'income', '—', 'café', ' ', 'Management’s', '12', 'x']
+
+def _text(rng):
+    return ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(0, 8))) + rng.choice(['', ' ', '\n', '  \n '])
+
+def _destination(rng, href):
+    kind = rng.choice(['a id', 'a name', 'div id', 'div name', 'a both', 'div wrap'])
+    if kind == 'a both':
+        return f'<a id="{href}" name="{href}"></a>', ''
+    if kind == 'div wrap': # Section content nested inside its destination
+        return f'<div id="{href}"><p>{_text(rng)}</p>', '</div>'
+    tag, attr = kind.split()
+    return f'<{tag} {attr}="{href}">{_text(rng) if rng.random() < 0.3 else ""}</{tag}>', ''
+
+def synthetic_document(rng):
+    '''
+    Returns the HTML of a generated document with a linked TOC table.
+    '''
+    hrefs = [f'item{i}' for i in range(rng.randint(1, 12))]
+    toc, body = [], []
+    for i, href in enumerate(hrefs):
+        if rng.random() < 0.3:
+            toc.append(f'<a href="#{href}">{rng.choice([str(i + 3), "iv", "ii"])}</a>')
+        toc.append(f'<a href="#{href}">Item {i + 1}. {_text(rng)}</a>')
+        if rng.random() < 0.1: # Second link to the same destination
+            toc.append(f'<a href="#{href}">{_text(rng)}</a>')
+    if rng.random() < 0.2:
+        toc.append('<a href="#missing">Exhibits</a>')
+
+    order = hrefs[:]
+    if rng.random() < 0.2:
+        rng.shuffle(order)
+    for href in order:
+        if rng.random() < 0.1:
+            continue # Linked, no destination
+        for _ in range(2 if rng.random() < 0.1 else 1):
+            opening, closing = _destination(rng, href)
+            body.append(opening)
+            for _ in range(rng.randint(0, 4)):
+                body.append(rng.choice([f'<p>{_text(rng)}</p>', f'<p><b>{_text(rng)}</b>{_text(rng)}</p>', _text(rng),
+                                        '<a id="phantom"></a>', f'<div name="unlinked">{_text(rng)}</div>', '<br>']))
+            body.append(closing)
+    return f'<html><body><div><table><tr><td>{"</td></tr><tr><td>".join(toc)}</td></tr></table></div>{"".join(body)}</body></html>'
+
+def check_document(parser, soup, toc_tag):
+    return parser.find_sections_with_toc(soup, toc_tag) == _reference_find_sections_with_toc(parser, soup, toc_tag)
+
+def run(paths, samples, seed=0):
+    '''
+    Returns the number of documents whose TOC sections differ from the reference.
+    '''
+    failures = 0
+    logging.disable(logging.CRITICAL)
+    try:
+        parser = MasterParserClass('', '10-k') # No SEC header needed, only the HTML document methods are used
+        rng = random.Random(seed)
+        for i in range(samples):
+            html = synthetic_document(rng)
+            soup = BeautifulSoup(html, 'lxml')
+            if not check_document(parser, soup, soup.find('table')):
+                failures += 1
+                print(f'DIFF generated document {i}: {html[:200]}...')
+
+        checked = 0
+        for path in paths:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                soup = HtmlDocument(f.read()).soup
+            toc_tag = parser.linked_toc_exists(soup)
+            if not toc_tag:
+                continue
+            checked += 1
+            if not check_document(parser, soup, toc_tag):
+                failures += 1
+                print(f'DIFF {path}')
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f'{samples} generated and {checked} saved documents with a linked TOC checked, {failures} differ from the reference.')
+    return failures
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Check find_sections_with_toc against the previous next_element walk.')
+    arg_parser.add_argument('paths', nargs='*', help='Saved HTML documents, those without a linked TOC are skipped')
+    arg_parser.add_argument('--samples', type=int, default=500, help='Generated documents to check')
+    args = arg_parser.parse_args()
+    sys.exit(1 if run(args.paths, args.samples) else 0)